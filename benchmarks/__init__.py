@@ -0,0 +1,14 @@
+"""
+Benchmarks do adapter contra um DynamoDB local (moto, em processo) e
+contra o InMemoryBackend (casos memory/...).
+
+    python -m benchmarks            # compara com benchmarks/baseline.json
+    python -m benchmarks --update   # regrava os baselines
+
+Os tempos do baseline são os da máquina em que foram medidos. A
+comparação desconta o fator da máquina (a mediana de resultado / baseline
+entre todos os casos), então só acusa casos que pioraram em relação aos
+outros; ainda assim, regrave o baseline inteiro (apague baseline.json e
+rode --update) ao trocar de ambiente. Ao adicionar um caso, grave o seu
+baseline no mesmo commit: casos sem baseline fazem a comparação falhar.
+"""
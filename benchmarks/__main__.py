@@ -0,0 +1,87 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from statistics import median
+
+from .suite import run
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def machine_factor(results, baseline):
+    """
+    :return: Mediana de resultado / baseline nos casos em comum, ou seja,
+        quão mais lenta esta máquina (ou este momento) está que a do
+        baseline
+    """
+    ratios = [seconds / baseline[name] for name, seconds in results.items()
+              if name in baseline]
+    return median(ratios) if ratios else 1.0
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara cada caso com o baseline descontando o fator da máquina, de
+    modo que só contam as pioras em relação aos outros casos.
+    :param tolerance: Fração de piora aceita em relação ao baseline
+    :return: Nomes dos casos mais lentos que o baseline além da tolerância
+    """
+    factor = machine_factor(results, baseline)
+    return [name for name, seconds in results.items()
+            if name in baseline and
+            seconds > baseline[name] * factor * (1 + tolerance)]
+
+
+def missing(results, baseline):
+    """
+    :return: Nomes dos casos sem baseline, que não seriam comparados
+    """
+    return [name for name in results if name not in baseline]
+
+
+def report(results, baseline):
+    factor = machine_factor(results, baseline)
+    print(f'Fator da máquina em relação ao baseline: {factor:.2f}')
+    print(f'{"caso":<32} {"ops/s":>12} {"baseline":>12} {"Δ relativo":>11}')
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        change = f'{seconds / (reference * factor) - 1:+.0%}' \
+            if reference else '-'
+        expected = f'{1 / reference:12.1f}' if reference else f'{"-":>12}'
+        print(f'{name:<32} {1 / seconds:12.1f} {expected} {change:>11}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('cases', nargs='*',
+                        help='prefixos dos casos a rodar (default: todos)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='piora aceita em relação ao baseline')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--update', action='store_true',
+                        help='regrava o baseline com os resultados')
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) \
+        if args.baseline.exists() else {}
+    results = run(args.repeats, args.cases)
+    report(results, baseline)
+    if args.update:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2,
+                                            sort_keys=True) + '\n')
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for name in regressions:
+        print(f'Regressão em {name}', file=sys.stderr)
+    not_found = missing(results, baseline)
+    for name in not_found:
+        print(f'Sem baseline para {name}: rode com --update nesta máquina',
+              file=sys.stderr)
+    return 1 if regressions or not_found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
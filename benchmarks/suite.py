@@ -0,0 +1,175 @@
+import logging
+import os
+from contextlib import contextmanager
+from itertools import count
+from timeit import repeat
+from typing import Optional
+
+from clean_architecture_basic_classes import BasicEntity
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    ConnectionPool, InMemoryBackend
+from clean_architecture_dynamodb_adapter.codec import ItemCodec
+from marshmallow import fields, post_load
+
+TABLE_NAME = 'benchmark'
+REGION = 'us-east-1'
+TABLE_SIZE = 200
+DOCUMENT_SIZES = (10, 100, 1000)
+DOCUMENT_DEPTHS = (1, 5)
+# Cases run against moto; the others don't need it installed.
+LOCAL_CASES = ('adapter_construction', 'save', 'get_by_id', 'list_all',
+               'filter')
+
+
+class BenchmarkEntity(BasicEntity):
+    def __init__(self, name: str, value: float, tags: list,
+                 entity_id: Optional[str] = None):
+        super().__init__(entity_id=entity_id)
+        self.name = name
+        self.value = value
+        self.tags = tags
+
+    class Schema(BasicEntity.Schema):
+        name = fields.String(required=True)
+        value = fields.Float(required=True)
+        tags = fields.List(fields.String())
+
+        @post_load
+        def on_load(self, data, many, partial):
+            return BenchmarkEntity(**data)
+
+
+def document(size, depth):
+    """
+    :param size: Número de atributos em cada nível
+    :param depth: Níveis de aninhamento
+    :return: Documento com floats, strings, listas e valores vazios
+    """
+    node = {}
+    for level in range(depth):
+        node = dict({f'float_{i}': i + 0.5 for i in range(size // 2)},
+                    **{f'text_{i}': f'valor {i}' for i in range(size // 4)},
+                    **{f'list_{i}': [i + 0.25, '', 'x']
+                       for i in range(size // 4)},
+                    empty='', child=node)
+    return node
+
+
+def item(entity_id):
+    return dict(entity_id=entity_id, name=f'nome {entity_id}',
+                value=float(entity_id) + 0.5, tags=['a', 'b'])
+
+
+@contextmanager
+def local_dynamodb():
+    """
+    DynamoDB em processo (moto), com credenciais falsas.
+    """
+    from moto import mock_aws
+
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        os.environ.setdefault(name, 'benchmark')
+    with mock_aws():
+        yield ConnectionPool()
+
+
+def build_adapter(pool, **kwargs):
+    return BasicDynamodbAdapter(TABLE_NAME, None, BenchmarkEntity,
+                                logging.getLogger('benchmarks'),
+                                region_name=REGION, connection_pool=pool,
+                                **kwargs)
+
+
+def measure(func, number, repeats):
+    """
+    :return: Menor tempo por chamada, em segundos, entre as repetições
+    """
+    return min(repeat(func, number=number, repeat=repeats)) / number
+
+
+def codec_cases():
+    """
+    Codificação dos itens: o caminho genérico e o ItemCodec compilado, que
+    é o que save() e list_all() usam por default.
+    """
+    entity_codec = ItemCodec.for_class(BenchmarkEntity)
+    data = item('1')
+    encoded = entity_codec.encode(data)
+    yield 'normalize_nodes[entity]', \
+        lambda: BasicDynamodbAdapter._normalize_nodes(data), 2000
+    yield 'codec_encode[entity]', lambda: entity_codec.encode(data), 2000
+    yield 'denormalize_floats[entity]', \
+        lambda: BasicDynamodbAdapter._denormalize_floats(encoded), 2000
+    yield 'codec_decode[entity]', lambda: entity_codec.decode(encoded), 2000
+    for size in DOCUMENT_SIZES:
+        for depth in DOCUMENT_DEPTHS:
+            yield from document_cases(size, depth)
+
+
+def document_cases(size, depth):
+    data = document(size, depth)
+    codec = ItemCodec.from_sample(data)
+    encoded = BasicDynamodbAdapter._normalize_nodes(data)
+    number = max(1, 2000 // size)
+    yield (f'normalize_nodes[{size}x{depth}]',
+           lambda: BasicDynamodbAdapter._normalize_nodes(data), number)
+    yield f'codec_encode[{size}x{depth}]', lambda: codec.encode(data), number
+    yield (f'denormalize_floats[{size}x{depth}]',
+           lambda: BasicDynamodbAdapter._denormalize_floats(encoded), number)
+    yield f'codec_decode[{size}x{depth}]', lambda: codec.decode(encoded), \
+        number
+
+
+def adapter_cases(pool, prefix=''):
+    """
+    :param prefix: Prefixo dos nomes dos casos
+    """
+    adapter = build_adapter(pool)
+    adapter.save_many([item(str(i)) for i in range(TABLE_SIZE)])
+    ids = count(TABLE_SIZE)
+    yield f'{prefix}adapter_construction', lambda: build_adapter(pool), 200
+    yield f'{prefix}save', lambda: adapter.save(item(str(next(ids)))), 100
+    yield f'{prefix}get_by_id', lambda: adapter.get_by_id('7'), 100
+    yield f'{prefix}list_all[{TABLE_SIZE}]', adapter.list_all, 5
+    yield f'{prefix}filter[{TABLE_SIZE}]', \
+        lambda: adapter.filter(name__begins_with='nome 1'), 5
+
+
+def is_selected(name, selected):
+    return not selected or name.startswith(tuple(selected))
+
+
+def any_selected(names, selected):
+    """
+    :return: Se algum caso cujo nome começa por um de names pode ser
+        selecionado
+    """
+    return not selected or any(name.startswith(prefix) or
+                               prefix.startswith(name)
+                               for name in names for prefix in selected)
+
+
+def measure_cases(cases, repeats, selected):
+    return {name: measure(func, number, repeats)
+            for name, func, number in cases
+            if is_selected(name, selected)}
+
+
+def run(repeats=5, selected=None):
+    """
+    Roda os benchmarks. O moto só é usado (e precisa estar instalado) se
+    algum caso contra ele for selecionado.
+    :param repeats: Repetições de cada caso; vale a menor
+    :param selected: Prefixos dos casos a rodar; None roda todos
+    :return: {caso: segundos por chamada}
+    """
+    results = measure_cases(codec_cases(), repeats, selected)
+    if any_selected(LOCAL_CASES, selected):
+        with local_dynamodb() as pool:
+            results.update(measure_cases(adapter_cases(pool), repeats,
+                                         selected))
+    if any_selected(('memory/',), selected):
+        results.update(measure_cases(adapter_cases(InMemoryBackend(),
+                                                   'memory/'),
+                                     repeats, selected))
+    return results
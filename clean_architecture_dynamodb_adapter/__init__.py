@@ -3,6 +3,23 @@
 __author__ = """Anselmo Lira"""
 __version__ = '0.1.0'
 
+from .async_dynamodb_adapter import AsyncDynamodbAdapter
 from .basic_dynamodb_adapter import BasicDynamodbAdapter
+from .cache import EntityCache
+from .connection_pool import ConnectionPool
+from .indexes import GlobalSecondaryIndex, LocalSecondaryIndex
+from .lazy import LazyEntity
+from .memory import InMemoryBackend
+from .metrics import InMemoryCollector
+from .query import Q
 
-__all__ = ['BasicDynamodbAdapter']
+__all__ = ['AsyncDynamodbAdapter',
+           'BasicDynamodbAdapter',
+           'ConnectionPool',
+           'EntityCache',
+           'GlobalSecondaryIndex',
+           'InMemoryBackend',
+           'InMemoryCollector',
+           'LazyEntity',
+           'LocalSecondaryIndex',
+           'Q']
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from .codec import _decode_decimal
+
+AGGREGATES = {
+    'sum': sum,
+    'min': lambda values: min(values, default=None),
+    'max': lambda values: max(values, default=None),
+    'distinct': set,
+}
+
+
+def _value(value):
+    # Numbers come back as Decimal, and floats stored as 'Float(...)' as
+    # float; Decimal and float can't be added or compared with each other.
+    return _decode_decimal(value) if type(value) is Decimal else value
+
+
+def aggregate(op, attribute, items):
+    """
+    Agrega os valores de um atributo consumindo os itens um a um, sem
+    guardá-los; itens sem o atributo são ignorados. Números lidos como
+    Decimal viram int (se inteiros) ou float, e podem ser agregados com
+    floats.
+    :param op: 'sum', 'min', 'max' ou 'distinct'
+    :return: O resultado da agregação (0 na soma e None em min/max se não
+        houver valores; um set em distinct)
+    """
+    if op not in AGGREGATES:
+        raise ValueError(f'Agregação inválida: {op}')
+    return AGGREGATES[op](_value(item[attribute]) for item in items
+                          if item.get(attribute) is not None)
@@ -0,0 +1,205 @@
+import asyncio
+from uuid import uuid4
+
+# noinspection PyPackageRequirements
+from botocore.exceptions import ClientError
+from clean_architecture_basic_classes.basic_persist_adapter import \
+    BasicPersistAdapter
+
+from .basic_dynamodb_adapter import BasicDynamodbAdapter
+from .logs import log_fields
+from .pagination import ScanIterator
+
+try:
+    import aioboto3
+except ImportError:  # pragma: no cover
+    aioboto3 = None
+
+
+class AsyncScanIterator(ScanIterator):
+    """
+    Versão assíncrona do ScanIterator: use com ``async for``. O scan
+    informado deve ser uma coroutine function (ex.: table.scan do aioboto3).
+    """
+    async def pages(self):
+        start_key = self._start_key
+        while True:
+            response = await self._scan(**self._page_kwargs(start_key))
+            yield response
+            start_key = response.get('LastEvaluatedKey')
+            self.last_evaluated_key = start_key
+            if not start_key:
+                return
+
+    def __iter__(self):
+        raise TypeError('Use "async for" com AsyncScanIterator.')
+
+    async def __aiter__(self):
+        if self._max_items == 0:
+            return
+        delivered = 0
+        async for response in self.pages():
+            for item in self._page_items(response,
+                                         self._remaining(delivered)):
+                delivered += 1
+                yield item
+            if delivered == self._max_items:
+                return
+
+
+class AsyncDynamodbAdapter(BasicPersistAdapter):
+    def __init__(self, table_name, db_endpoint, adapted_class, logger=None,
+                 region_name=None, max_concurrency=16, resource=None,
+                 float_storage='string', codec=True):
+        """
+        Adapter assíncrono (asyncio) para persistencia de um entity, com a
+        mesma interface do BasicDynamodbAdapter, mas cujos métodos são
+        coroutines. As requisições usam o aioboto3 e não bloqueiam o event
+        loop. A tabela não é criada por este adapter.
+        Use como context manager assíncrono, ou chame open() e close():
+            async with AsyncDynamodbAdapter(...) as adapter:
+                obj = await adapter.get_by_id(entity_id)
+        :param table_name: Nome da tabela à ser usada
+        :param max_concurrency: Requisições simultâneas por adapter
+        :param resource: Resource assíncrono já aberto (ex.: um fake em
+            testes); None abre um resource do aioboto3 em open()
+        :param float_storage: 'string' ou 'decimal', como no
+            BasicDynamodbAdapter
+        :param codec: True, False ou um ItemCodec, como no
+            BasicDynamodbAdapter
+        """
+        super().__init__(adapted_class, logger)
+        if float_storage not in BasicDynamodbAdapter.FLOAT_STORAGE_MODES:
+            raise ValueError(f'float_storage inválido: {float_storage}')
+        self._table_name = table_name
+        self._db_endpoint = db_endpoint
+        self._region_name = region_name
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._resource = resource
+        self._resource_context = None
+        self._table = None
+        self._float_storage = float_storage
+        self._codec = self._build_codec(codec)
+
+    # Items are encoded and decoded exactly as in the synchronous adapter.
+    _decimals = BasicDynamodbAdapter._decimals
+    _build_codec = BasicDynamodbAdapter._build_codec
+    _encode = BasicDynamodbAdapter._encode
+    _decode = BasicDynamodbAdapter._decode
+    _hydrate = BasicDynamodbAdapter._hydrate
+    _encode_conditions = BasicDynamodbAdapter._encode_conditions
+    _encode_condition_value = staticmethod(
+        BasicDynamodbAdapter._encode_condition_value)
+
+    async def _open_resource(self):
+        if aioboto3 is None:
+            raise ImportError('AsyncDynamodbAdapter requer o pacote '
+                              'aioboto3 (pip install '
+                              'clean_architecture_dynamodb_adapter[async])')
+        session = aioboto3.Session(region_name=self._region_name)
+        self._resource_context = session.resource(
+            'dynamodb', endpoint_url=self._db_endpoint)
+        return await self._resource_context.__aenter__()
+
+    async def open(self):
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        if self._resource is None:
+            self._resource = await self._open_resource()
+        self._table = await self._resource.Table(self._table_name)
+        return self
+
+    async def close(self):
+        if self._resource_context is not None:
+            await self._resource_context.__aexit__(None, None, None)
+            self._resource_context = None
+            self._resource = None
+        self._table = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _call(self, operation, **kwargs):
+        if self._table is None:
+            raise RuntimeError('AsyncDynamodbAdapter não está aberto: use '
+                               '"async with adapter" ou chame open().')
+        async with self._semaphore:
+            return await getattr(self._table, operation)(**kwargs)
+
+    def _instantiate_object(self, x):
+        return self._hydrate(self._decode(x))
+
+    async def _scan(self, **kwargs):
+        return await self._call('scan', **kwargs)
+
+    def iter_all(self, page_size=None, max_items=None, start_key=None):
+        """
+        Percorre a tabela inteira de forma preguiçosa, como em
+        BasicDynamodbAdapter.iter_all().
+        :return: AsyncScanIterator de entidades
+        """
+        return AsyncScanIterator(self._scan,
+                                 transform=self._instantiate_object,
+                                 page_size=page_size,
+                                 max_items=max_items,
+                                 start_key=start_key)
+
+    async def list_all(self):
+        return [x async for x in self.iter_all()]
+
+    async def get_by_id(self, item_id):
+        response = await self._call('get_item',
+                                    Key=dict(entity_id=item_id),
+                                    ConsistentRead=True)
+        if 'Item' in response:
+            return self._instantiate_object(response['Item'])
+        else:
+            return None
+
+    async def save(self, json_data):
+        entity_id = json_data.get('entity_id', str(uuid4()))
+        json_data.update(dict(entity_id=entity_id))
+        await self._call('put_item', Item=self._encode(json_data))
+        return entity_id
+
+    async def delete(self, entity_id):
+        try:
+            await self._call('delete_item', Key=dict(entity_id=entity_id))
+        except ClientError as e:
+            error = e.response['Error']['Message']
+            self._logger.error('Erro deletando de %s: %s',
+                               self._class.__name__, error,
+                               **log_fields('delete_item', self._table_name,
+                                            entity_id=entity_id))
+            return None
+        return entity_id
+
+    def iter_filter(self, page_size=None, max_items=None, start_key=None,
+                    **kwargs):
+        """
+        Versão assíncrona de BasicDynamodbAdapter.iter_filter(), com a
+        mesma sintaxe de critérios.
+        :return: AsyncScanIterator de objetos (ou de dicts, com projeção)
+        """
+        have_projection, conditions = \
+            BasicDynamodbAdapter._get_contitions(
+                self._encode_conditions(kwargs))
+        scan_kwargs = BasicDynamodbAdapter._get_scan_kwargs(conditions,
+                                                            kwargs)
+        transform = None if have_projection else self._instantiate_object
+        return AsyncScanIterator(self._scan,
+                                 scan_kwargs=scan_kwargs,
+                                 transform=transform,
+                                 page_size=page_size,
+                                 max_items=max_items,
+                                 start_key=start_key)
+
+    async def filter(self, **kwargs):
+        """
+        Versão assíncrona de BasicDynamodbAdapter.filter().
+        :return: Lista de objetos
+        """
+        return [x async for x in self.iter_filter(**kwargs)]
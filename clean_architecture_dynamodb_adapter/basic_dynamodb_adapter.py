@@ -1,183 +1,999 @@
-from functools import reduce
+from decimal import Decimal
+from functools import partial, reduce
+from operator import and_, or_
+from time import perf_counter
 from uuid import uuid4
 
-import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
 # noinspection PyPackageRequirements
 from botocore.exceptions import ClientError
 from clean_architecture_basic_classes.basic_persist_adapter import BasicPersistAdapter
 
+from .aggregates import aggregate
+from .batch import chunked, run_chunks, retry_unprocessed
+from .cache import EntityCache
+from .coalescing import BatchCoalescer, SingleFlight
+from .codec import ItemCodec, _decode_decimal, _decode_string, \
+    _float_to_decimal, _float_to_string
+from .connection_pool import default_pool
+from .cursor import CursorCodec, Page
+from .indexes import attribute_definitions, plan_query, table_definition, \
+    wait_for_index
+from .lazy import LazyEntity
+from .logs import PAYLOAD_LIMIT, Payload, debug_enabled, log_fields
+from .metrics import call_metrics
+from .pagination import ScanIterator
+from .query import FILTER_MODES, Q, compile_filter
+from .retry import RetryPolicy, error_code, is_throttling
+from .parallel_scan import ParallelScanIterator
+from .results import RESULT_MODES, compose, row_factory
+from .updates import diff_items, update_kwargs
+from .wire import client_kwargs, decode_item, decode_key
+
 
 class BasicDynamodbAdapter(BasicPersistAdapter):
-    def __init__(self, table_name, db_endpoint, adapted_class, logger=None):
+    BATCH_WRITE_SIZE = 25
+    BATCH_GET_SIZE = 100
+    BATCH_MAX_ATTEMPTS = 8
+    TABLE_CHECK_MODES = ('eager', 'lazy', 'off')
+    FLOAT_STORAGE_MODES = ('string', 'decimal')
+    INDEXES = ()
+    BILLING_MODE = 'PROVISIONED'
+    READ_CAPACITY = 5
+    WRITE_CAPACITY = 5
+
+    def __init__(self, table_name, db_endpoint, adapted_class, logger=None,
+                 scan_segments=None, scan_executor=None, region_name=None,
+                 connection_pool=None, table_check='eager', cache=None,
+                 cache_consistent_read=True, coalesce=False,
+                 batch_window=None, float_storage='string', codec=True,
+                 fast_reads=False, lazy=False, indexes=None,
+                 cursor_secret=None, retry_policy=None, rate_limiter=None,
+                 metrics=None, log_payload_limit=PAYLOAD_LIMIT,
+                 log_sample_rate=1.0, snapshot_size=0):
         """
         Adapter para persistencia de um entity
         :param table_name: Nome da tabela à ser usada
+        :param scan_segments: Segmentos usados por default nos scans
+            (list_all/filter); None faz scans sequenciais
+        :param scan_executor: Pool de threads compartilhado pelos scans
+            paralelos; None cria um pool por scan
+        :param region_name: Região da AWS; None usa a configuração do boto3
+        :param connection_pool: ConnectionPool de onde vêm resource e client;
+            None usa o pool compartilhado pelo processo
+        :param table_check: Quando verificar (e criar) a tabela: 'eager' no
+            construtor, 'lazy' no primeiro uso ou 'off' para nunca. A
+            verificação é feita uma vez por tabela em cada processo.
+        :param cache: EntityCache usado por get_by_id. As entidades em cache
+            são compartilhadas entre as chamadas e invalidadas pelos save e
+            delete deste adapter.
+        :param cache_consistent_read: Usa leitura fortemente consistente ao
+            preencher o cache
+        :param coalesce: Faz chamadas concorrentes de get_by_id para o mesmo
+            id compartilharem uma única requisição (e a mesma entidade)
+        :param batch_window: Janela, em segundos, em que chamadas
+            concorrentes de get_by_id são agrupadas em um BatchGetItem
+        :param float_storage: Como os floats são gravados: 'string' (como
+            'Float(...)') ou 'decimal' (como números do DynamoDB, o que
+            permite filtros numéricos). Em 'decimal' os dois formatos são
+            lidos; use rewrite_float_storage() para migrar a tabela.
+        :param codec: True compila um ItemCodec a partir do Schema da classe
+            adaptada (ou usa o caminho genérico, se não houver Schema);
+            False usa sempre o caminho genérico; também aceita um ItemCodec
+            (ex.: ItemCodec.from_sample)
+        :param fast_reads: Faz get_by_id e os scans pelo client de baixo
+            nível, convertendo o formato do DynamoDB direto para o formato
+            de from_json em uma única passada
+        :param lazy: Scans, get_many e _desserialize devolvem proxies
+            (LazyEntity) que só chamam from_json no primeiro acesso a um
+            atributo; get_by_id continua devolvendo a entidade
+        :param indexes: Índices da tabela (GlobalSecondaryIndex e
+            LocalSecondaryIndex), criados junto com ela e usados por
+            filter() para trocar o scan por um Query; None usa INDEXES.
+            O modo de cobrança vem de BILLING_MODE ('PROVISIONED', com
+            READ_CAPACITY e WRITE_CAPACITY, ou 'PAY_PER_REQUEST').
+        :param cursor_secret: Chave que assina os cursores de page(); deve
+            ser a mesma em todos os processos que servem a listagem. None
+            usa uma chave aleatória, válida só neste processo.
+        :param retry_policy: RetryPolicy aplicada a todas as chamadas ao
+            DynamoDB; None usa RetryPolicy()
+        :param rate_limiter: AdaptiveRateLimiter que controla o ritmo das
+            chamadas pela capacidade consumida; True usa o limitador da
+            tabela compartilhado pelo processo (via connection_pool);
+            None não limita
+        :param metrics: MetricsHook (ex.: InMemoryCollector) que recebe a
+            latência, a capacidade consumida, os itens e as novas
+            tentativas de cada chamada ao DynamoDB; None não mede nada
+        :param log_payload_limit: Tamanho máximo, em caracteres, dos itens
+            incluídos nas mensagens de debug; None não trunca
+        :param log_sample_rate: Fração das gravações que geram mensagens de
+            debug (itens e duração), quando o nível DEBUG está ativo
+        :param snapshot_size: Número máximo de objetos cujo último estado
+            lido (ou gravado) é guardado para save(partial=True); com 0,
+            o default, não há rastreamento de alterações e o save parcial
+            grava o objeto inteiro
         """
+        if table_check not in self.TABLE_CHECK_MODES:
+            raise ValueError(f'table_check inválido: {table_check}')
+        if float_storage not in self.FLOAT_STORAGE_MODES:
+            raise ValueError(f'float_storage inválido: {float_storage}')
         super().__init__(adapted_class, logger)
         self._table_name = table_name
         self._db_endpoint = db_endpoint
+        self._region_name = region_name
+        self._pool = connection_pool or default_pool
+        self._scan_segments = scan_segments
+        self._scan_executor = scan_executor
+        self._table_ready = table_check == 'off'
+        self._float_storage = float_storage
+        self._codec = self._build_codec(codec)
+        self._fast_reads = fast_reads
+        self._lazy = lazy
+        self._indexes = tuple(self.INDEXES if indexes is None else indexes)
+        self._cursors = CursorCodec(cursor_secret)
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._rate_limiter = self._build_rate_limiter(rate_limiter)
+        self._metrics = metrics
+        self._log_payload_limit = log_payload_limit
+        self._log_sample_rate = log_sample_rate
+        self._cache = cache
+        self._snapshots = EntityCache(snapshot_size, ttl=None) \
+            if snapshot_size else None
+        self._cache_consistent_read = cache_consistent_read
+        self._single_flight = SingleFlight() if coalesce else None
+        self._batchers = self._build_batchers(batch_window)
         self._db = self.get_db()
         self._table = self.get_table()
+        self._client = self._db.meta.client
+
+        if table_check == 'eager':
+            self._ensure_table()
 
-        self._create_table_if_dont_exists()
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+        location = (self._table_name, self._db_endpoint, self._region_name)
+        if not self._pool.is_known_table(*location):
+            self._create_table_if_dont_exists()
+            self._pool.add_known_table(*location)
+        self._table_ready = True
 
     def _do_table_exists(self):
-        existing_tables = boto3.client(
-            'dynamodb', endpoint_url=self._db_endpoint).list_tables()
-        return self._table_name in existing_tables['TableNames']
+        client = self._pool.client(self._db_endpoint, self._region_name)
+        try:
+            client.describe_table(TableName=self._table_name)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                return False
+            raise
+        return True
 
     def _create_table_if_dont_exists(self):
         if not self._do_table_exists():
-            self.logger.info(f'Creating not existent table {self._table_name}')
-
-            table = self._db.create_table(
-                TableName=self._table_name,
-                KeySchema=[
-                    {
-                        'AttributeName': 'entity_id',
-                        'KeyType': 'HASH'
-                    }
-                ],
-                AttributeDefinitions=[
-                    {
-                        'AttributeName': 'entity_id',
-                        'AttributeType': 'S'
-                    }
-                ],
-                ProvisionedThroughput={
-                    'ReadCapacityUnits': 5,
-                    'WriteCapacityUnits': 5
-                }
-            )
+            self.logger.info('Creating not existent table %s',
+                             self._table_name,
+                             **log_fields('create_table', self._table_name))
+            try:
+                self._create_table()
+            except ClientError as e:
+                # Another process created it in the meantime.
+                if e.response['Error']['Code'] != 'ResourceInUseException':
+                    raise
 
             # Wait until the table exists.
-            table.meta.client.get_waiter('table_exists').wait(
+            self._db.meta.client.get_waiter('table_exists').wait(
                 TableName=self._table_name)
 
+    def _throughput(self):
+        return {
+            'ReadCapacityUnits': self.READ_CAPACITY,
+            'WriteCapacityUnits': self.WRITE_CAPACITY
+        }
+
+    def _create_table(self):
+        self._db.create_table(**table_definition(self._table_name,
+                                                 self._indexes,
+                                                 self.BILLING_MODE,
+                                                 self._throughput()))
+
+    def _describe_table(self):
+        return self._client.describe_table(
+            TableName=self._table_name)['Table']
+
+    def _missing_indexes(self, table):
+        existing = {x['IndexName']
+                    for kind in ('GlobalSecondaryIndexes',
+                                 'LocalSecondaryIndexes')
+                    for x in table.get(kind, [])}
+        missing = [x for x in self._indexes if x.name not in existing]
+        for index in missing:
+            if index.local:
+                self.logger.warning('LSI %s não existe em %s e só pode ser '
+                                    'criado junto com a tabela', index.name,
+                                    self._table_name)
+        return [x for x in missing if not x.local]
+
+    def _wait_for_index(self, index_name, poll_interval, timeout):
+        if not wait_for_index(self._client, self._table_name, index_name,
+                              poll_interval, timeout):
+            raise self.DynamodbAdapterIndexException(
+                f'Índice {index_name} de {self._table_name} não ficou '
+                f'ACTIVE em {timeout}s')
+
+    def _add_index(self, index, table):
+        billing = table.get('BillingModeSummary', {}).get(
+            'BillingMode', 'PROVISIONED')
+        throughput = self._throughput() if billing == 'PROVISIONED' else None
+        self.logger.info('Creating index %s on %s', index.name,
+                         self._table_name,
+                         **log_fields('update_table', self._table_name))
+        self._client.update_table(
+            TableName=self._table_name,
+            AttributeDefinitions=attribute_definitions([index]),
+            GlobalSecondaryIndexUpdates=[
+                dict(Create=index.definition(throughput))])
+
+    def reconcile_indexes(self, wait=True, poll_interval=5.0, timeout=None):
+        """
+        Cria na tabela os GSIs declarados que ainda não existem, um de cada
+        vez (o DynamoDB só cria um índice por UpdateTable), esperando cada
+        um ficar ACTIVE antes do próximo. LSIs ausentes só geram um aviso,
+        pois não podem ser adicionados a uma tabela existente.
+        :param wait: Espera também o último índice criado ficar ACTIVE
+        :param poll_interval: Intervalo, em segundos, entre as verificações
+        :param timeout: Espera máxima por índice; None espera indefinidamente
+        :raises DynamodbAdapterIndexException: se o tempo acabar
+        :return: Nomes dos índices criados
+        """
+        self._ensure_table()
+        table = self._describe_table()
+        created = []
+        for index in self._missing_indexes(table):
+            if created:
+                self._wait_for_index(created[-1], poll_interval, timeout)
+            self._add_index(index, table)
+            created.append(index.name)
+        if wait and created:
+            self._wait_for_index(created[-1], poll_interval, timeout)
+        return created
+
+    def _build_rate_limiter(self, rate_limiter):
+        if rate_limiter is True:
+            return self._pool.rate_limiter(self._table_name,
+                                           self._db_endpoint,
+                                           self._region_name)
+        return rate_limiter or None
+
+    def _call(self, func, **kwargs):
+        """
+        Executa uma chamada ao DynamoDB com a política de novas tentativas
+        e, se houver, o limitador de taxa e a coleta de métricas. Com o
+        nível DEBUG ativo, registra a duração de cada chamada (duration_ms).
+        """
+        if debug_enabled(self.logger, self._log_sample_rate):
+            return self._timed_call(func, **kwargs)
+        return self._run_call(func, **kwargs)
+
+    def _timed_call(self, func, **kwargs):
+        operation = getattr(func, '__name__', 'call')
+        start = perf_counter()
+        try:
+            return self._run_call(func, **kwargs)
+        finally:
+            duration = (perf_counter() - start) * 1000
+            self.logger.debug('Called %s on %s in %.1f ms', operation,
+                              self._table_name, duration,
+                              **log_fields(operation, self._table_name,
+                                           duration_ms=duration))
+
+    def _run_call(self, func, **kwargs):
+        if self._metrics is not None:
+            return self._measured_call(func, **kwargs)
+        if self._rate_limiter is not None:
+            func = partial(self._rate_limiter.call, func)
+        return self._retry_policy.run(func, **kwargs)
+
+    def _measured_call(self, func, **kwargs):
+        operation = getattr(func, '__name__', 'call')
+        kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        if self._rate_limiter is not None:
+            func = partial(self._rate_limiter.call, func)
+        retries = []
+        start = perf_counter()
+        try:
+            response = self._retry_policy.run(
+                func, on_retry=lambda e, attempt: retries.append(attempt),
+                **kwargs)
+        except ClientError as e:
+            self._metrics.record(call_metrics(
+                operation, self._table_name, perf_counter() - start,
+                retries=len(retries), error=error_code(e)))
+            raise
+        self._metrics.record(call_metrics(
+            operation, self._table_name, perf_counter() - start, response,
+            len(retries)))
+        return response
+
     def get_db(self):
-        return boto3.resource('dynamodb', endpoint_url=self._db_endpoint)
+        return self._pool.resource(self._db_endpoint, self._region_name)
 
     def get_table(self):
         return self._db.Table(self._table_name)
 
-    def _instantiate_object(self, x):
-        denormed = BasicDynamodbAdapter._denormalize_floats(x)
-        obj = self._class.from_json(denormed)
+    def _hydrate(self, x):
+        obj = self._class.from_json(x)
         obj.set_adapter(self)
         return obj
 
-    def list_all(self):
-        response = self._table.scan()
-        objects = [self._instantiate_object(x) for x in response['Items']]
-        return objects
+    def _instantiate_object(self, x):
+        self._remember(x)
+        return self._hydrate(self._decode(x))
 
-    def get_by_id(self, item_id):
-        response = self._table.get_item(Key=dict(entity_id=item_id),
-                                        ConsistentRead=True)
+    def _hydrate_decoded(self, x):
+        self._remember(x, decoded=True)
+        return self._hydrate(x)
+
+    def _entity_factory(self, decoded=False):
+        """
+        :param decoded: Se os itens já chegam decodificados (fast_reads)
+        :return: Função que cria a entidade (ou o proxy, no modo lazy)
+        """
+        hydrate = self._hydrate_decoded if decoded \
+            else self._instantiate_object
+        if not self._lazy:
+            return hydrate
+        return lambda item: LazyEntity(self._class, item, hydrate)
+
+    def _client_call(self, operation, **kwargs):
+        response = self._call(getattr(self._client, operation),
+                              **client_kwargs(self._table_name, kwargs))
+        if 'Items' in response:
+            response['Items'] = [decode_item(x, self._decimals)
+                                 for x in response['Items']]
+        if 'Item' in response:
+            response['Item'] = decode_item(response['Item'], self._decimals)
+        if 'LastEvaluatedKey' in response:
+            response['LastEvaluatedKey'] = decode_key(
+                response['LastEvaluatedKey'])
+        return response
+
+    def _read_source(self, result='entity', fields=None, operation='scan'):
+        """
+        :param result: Formato dos resultados (veja RESULT_MODES)
+        :param fields: Atributos das linhas nos modos namedtuple e row
+        :param operation: 'scan' ou 'query'
+        :return: (scan, transform) de acordo com o modo de leitura; no modo
+            fast_reads os itens já chegam decodificados
+        """
+        if result not in RESULT_MODES:
+            raise ValueError(f'result inválido: {result}')
+        scan = partial(self._client_call, operation) if self._fast_reads \
+            else partial(self._call, getattr(self._table, operation))
+        if result == 'entity':
+            return scan, self._entity_factory(decoded=self._fast_reads)
+        decode = self._restore_floats if self._fast_reads else self._decode
+        return scan, compose(decode, row_factory(result, fields))
+
+    @staticmethod
+    def _projection_kwargs(projection):
+        """
+        :param projection: Lista de atributos ou uma ProjectionExpression
+        :return: (argumentos do scan, atributos de cada linha); os atributos
+            são None se não puderem ser deduzidos da expressão
+        """
+        if not projection:
+            return {}, None
+        if isinstance(projection, str):
+            names = [x.strip() for x in projection.split(',')]
+            fields = None if '#' in projection else \
+                [x.split('.')[0].split('[')[0] for x in names]
+            return dict(ProjectionExpression=projection), fields
+        names = {f'#p{i}': name for i, name in enumerate(projection)}
+        return dict(ProjectionExpression=', '.join(names),
+                    ExpressionAttributeNames=names), list(projection)
+
+    def _parallel_scan_iterator(self, scan, scan_kwargs, transform,
+                                page_size, max_items, segments, ordered):
+        return ParallelScanIterator(scan,
+                                    total_segments=segments,
+                                    scan_kwargs=scan_kwargs,
+                                    transform=transform,
+                                    page_size=page_size,
+                                    max_items=max_items,
+                                    ordered=ordered,
+                                    executor=self._scan_executor)
+
+    def _scan_iterator(self, scan, scan_kwargs, transform, page_size,
+                       max_items, start_key, segments=None, ordered=False):
+        self._ensure_table()
+        segments = segments or self._scan_segments
+        if segments and start_key:
+            raise ValueError('start_key não é suportado em scans paralelos.')
+        if segments:
+            return self._parallel_scan_iterator(scan, scan_kwargs,
+                                                transform, page_size,
+                                                max_items, segments, ordered)
+        return ScanIterator(scan,
+                            scan_kwargs=scan_kwargs,
+                            transform=transform,
+                            page_size=page_size,
+                            max_items=max_items,
+                            start_key=start_key)
+
+    def _query_iterator(self, query, query_kwargs, transform, page_size,
+                        max_items, start_key, index):
+        self._ensure_table()
+        return ScanIterator(query,
+                            scan_kwargs=query_kwargs,
+                            transform=transform,
+                            page_size=page_size,
+                            max_items=max_items,
+                            start_key=start_key,
+                            key_attributes=index.key_attributes)
+
+    def iter_all(self, page_size=None, max_items=None, start_key=None,
+                 segments=None, ordered=False, result=None, projection=None):
+        """
+        Percorre a tabela inteira de forma preguiçosa, seguindo o
+        LastEvaluatedKey e instanciando as entidades à medida que cada
+        página chega.
+        :param page_size: Quantidade de itens lidos por requisição
+        :param max_items: Número máximo de entidades retornadas
+        :param start_key: Chave (last_evaluated_key) de onde retomar
+        :param segments: Número de segmentos para um scan paralelo
+        :param ordered: No scan paralelo, entrega os segmentos em ordem
+        :param result: 'entity' (default), ou 'dict', 'namedtuple' e 'row'
+            para pular a criação das entidades; os floats são convertidos
+            em todos os modos. Com projeção, o default é 'dict'.
+        :param projection: Lista de atributos lidos (ou uma
+            ProjectionExpression); namedtuple e row terão esses atributos
+        :return: Iterador de entidades (ou do formato pedido em result)
+        """
+        scan, scan_kwargs, transform, _ = self._prepare_read(
+            (), 'or', projection, result, {}, filtered=False)
+        return self._scan_iterator(scan, scan_kwargs, transform,
+                                   page_size, max_items, start_key,
+                                   segments, ordered)
+
+    def list_all(self, **kwargs):
+        return list(self.iter_all(**kwargs))
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def _invalidate(self, entity_ids):
+        for store in (self._cache, self._snapshots):
+            if store is not None:
+                for entity_id in entity_ids:
+                    store.invalidate(entity_id)
+
+    def _remember(self, item, decoded=False):
+        """
+        Guarda o último estado conhecido do item, usado por
+        save(partial=True).
+        :param decoded: Se o item está no formato de from_json (fast_reads)
+        """
+        if self._snapshots is not None and isinstance(item, dict) \
+                and 'entity_id' in item:
+            self._snapshots.set(item['entity_id'], (item, decoded))
+
+    def _snapshot(self, entity_id):
+        """
+        :return: Último estado conhecido do item, codificado, ou None
+        """
+        entry = None if self._snapshots is None \
+            else self._snapshots.get(entity_id)
+        if entry is None:
+            return None
+        item, decoded = entry
+        return self._encode(dict(item)) if decoded else item
+
+    def _build_batchers(self, batch_window):
+        if not batch_window:
+            return None
+        return {consistent: BatchCoalescer(
+            partial(self._fetch_many, consistent=consistent), batch_window)
+            for consistent in (True, False)}
+
+    def _fetch_many(self, entity_ids, consistent):
+        # get_by_id returns entities, never LazyEntity proxies.
+        objects = self._get_many(entity_ids, consistent, 4,
+                                 self._instantiate_object)
+        return dict(zip(entity_ids, objects))
+
+    def _fetch_by_id(self, item_id, consistent):
+        if self._batchers is not None:
+            return self._batchers[consistent].get(item_id)
+        if self._single_flight is not None:
+            return self._single_flight.do(
+                (item_id, consistent),
+                partial(self._get_item, item_id, consistent))
+        return self._get_item(item_id, consistent)
+
+    def _get_item(self, item_id, consistent):
+        if self._fast_reads:
+            response = self._client_call('get_item',
+                                         Key=dict(entity_id=item_id),
+                                         ConsistentRead=consistent)
+            return self._hydrate_decoded(response['Item']) \
+                if 'Item' in response else None
+        response = self._call(self._table.get_item,
+                              Key=dict(entity_id=item_id),
+                              ConsistentRead=consistent)
         if 'Item' in response:
             return self._instantiate_object(response['Item'])
         else:
             return None
 
+    def _get_cached(self, item_id):
+        obj = self._cache.get(item_id)
+        if obj is not None:
+            return obj
+        generation = self._cache.begin_fill(item_id)
+        try:
+            obj = self._fetch_by_id(item_id, self._cache_consistent_read)
+        finally:
+            self._cache.end_fill(item_id, generation, obj)
+        return obj
+
+    def get_by_id(self, item_id):
+        self._ensure_table()
+        if self._cache is not None:
+            return self._get_cached(item_id)
+        return self._fetch_by_id(item_id, consistent=True)
+
+    def _get_chunk(self, entity_ids, consistent):
+        found = []
+        request = dict(Keys=[dict(entity_id=x) for x in entity_ids],
+                       ConsistentRead=consistent)
+        unprocessed = retry_unprocessed(
+            partial(self._call, self._db.batch_get_item),
+            {self._table_name: request},
+            'UnprocessedKeys',
+            self.BATCH_MAX_ATTEMPTS,
+            on_response=lambda r: found.extend(
+                r.get('Responses', {}).get(self._table_name, [])))
+        if unprocessed:
+            count = len(unprocessed[self._table_name]['Keys'])
+            raise self.DynamodbAdapterBatchException(
+                f'{count} chaves não processadas em {self._table_name}')
+        return found
+
+    def get_many(self, entity_ids, consistent=True, max_workers=4):
+        """
+        Busca vários objetos com BatchGetItem, em lotes de até 100 chaves
+        únicas lidos em paralelo.
+        :param entity_ids: Iterável de ids
+        :param consistent: Usa leitura fortemente consistente
+        :param max_workers: Lotes lidos simultaneamente
+        :raises DynamodbAdapterBatchException: se alguma chave continuar não
+            processada depois de BATCH_MAX_ATTEMPTS tentativas
+        :return: Lista de objetos na ordem de entity_ids, com None para os
+            ids não encontrados
+        """
+        return self._get_many(entity_ids, consistent, max_workers,
+                              self._entity_factory())
+
+    def _get_many(self, entity_ids, consistent, max_workers, factory):
+        self._ensure_table()
+        entity_ids = list(entity_ids)
+        chunks = chunked(dict.fromkeys(entity_ids), self.BATCH_GET_SIZE)
+        results = run_chunks(partial(self._get_chunk, consistent=consistent),
+                             chunks, max_workers)
+        objects = {item['entity_id']: factory(item)
+                   for found in results for item in found}
+        return [objects.get(x) for x in entity_ids]
+
     @staticmethod
-    def _denormalize_floats_on_set(arg):
-        return {BasicDynamodbAdapter._denormalize_floats(x) for x in arg}
+    def _denormalize_floats_on_set(arg, decimals=False):
+        return {BasicDynamodbAdapter._denormalize_floats(x, decimals)
+                for x in arg}
 
     @staticmethod
-    def _denormalize_floats_on_list(arg):
-        return [BasicDynamodbAdapter._denormalize_floats(x) for x in arg]
+    def _denormalize_floats_on_list(arg, decimals=False):
+        return [BasicDynamodbAdapter._denormalize_floats(x, decimals)
+                for x in arg]
 
     @staticmethod
-    def _denormalize_floats_on_dict(arg):
-        return {k: BasicDynamodbAdapter._denormalize_floats(v)
+    def _denormalize_floats_on_dict(arg, decimals=False):
+        return {k: BasicDynamodbAdapter._denormalize_floats(v, decimals)
                 for k, v in arg.items()}
 
     @staticmethod
     def _denormalize_float(arg):
         if not isinstance(arg, str):
             return arg
-        if arg.startswith('Float(') and arg.endswith(')'):
-            return float(arg[6:-1])
-        else:
-            return arg
+        return _decode_string(arg)
+
+    _denormalize_decimal = staticmethod(_decode_decimal)
 
     @staticmethod
-    def _denormalize_floats(arg):
+    def _denormalize_floats(arg, decimals=False):
+        """
+        Desfaz a codificação de floats feita por _normalize_nodes. Strings
+        'Float(...)' são sempre convertidas; com decimals=True, os números
+        (Decimal) também viram int ou float, de modo que os dois formatos
+        de armazenamento são aceitos.
+        """
         cleaners = {set: BasicDynamodbAdapter._denormalize_floats_on_set,
                     list: BasicDynamodbAdapter._denormalize_floats_on_list,
-                    dict: BasicDynamodbAdapter._denormalize_floats_on_dict,
-                    float: BasicDynamodbAdapter._denormalize_float}
+                    dict: BasicDynamodbAdapter._denormalize_floats_on_dict}
 
         arg_type = type(arg)
         if arg_type in cleaners:
-            return cleaners[arg_type](arg)
-        else:
-            return BasicDynamodbAdapter._denormalize_float(arg)
+            return cleaners[arg_type](arg, decimals)
+        if decimals and arg_type is Decimal:
+            return BasicDynamodbAdapter._denormalize_decimal(arg)
+        return BasicDynamodbAdapter._denormalize_float(arg)
 
     @staticmethod
-    def _clean_set_empty_elements(arg):
+    def _clean_set_empty_elements(arg, decimals=False):
         arg = set(x for x in arg if not hasattr(x, '__len__') or
                   len(x) > 0)
         return arg
 
     @staticmethod
-    def _clean_list_empty_elements(arg):
+    def _clean_list_empty_elements(arg, decimals=False):
         result = []
         for value in arg:
-            clean_value = BasicDynamodbAdapter._normalize_nodes(value)
+            clean_value = BasicDynamodbAdapter._normalize_nodes(value,
+                                                                decimals)
             if clean_value:
                 result.append(clean_value)
         return result
 
     @staticmethod
-    def _clean_dict_empty_elements(arg):
+    def _clean_dict_empty_elements(arg, decimals=False):
         result = {}
         for key, value in arg.items():
-            clean_value = BasicDynamodbAdapter._normalize_nodes(value)
+            clean_value = BasicDynamodbAdapter._normalize_nodes(value,
+                                                                decimals)
             if clean_value:
                 result.update({key: clean_value})
         return result
 
+    _clean_float_value = staticmethod(_float_to_string)
+    _clean_float_decimal = staticmethod(_float_to_decimal)
+
     @staticmethod
-    def _clean_float_value(arg):
-        return f'Float({arg})'
+    def _clean_float(arg, decimals=False):
+        if decimals:
+            return BasicDynamodbAdapter._clean_float_decimal(arg)
+        return BasicDynamodbAdapter._clean_float_value(arg)
 
     @staticmethod
-    def _normalize_nodes(arg):
+    def _normalize_nodes(arg, decimals=False):
+        """
+        Remove os valores vazios (não aceitos pelo DynamoDB) e codifica os
+        floats: como strings 'Float(...)' ou, com decimals=True, como
+        números (Decimal).
+        """
         cleaners = {set: BasicDynamodbAdapter._clean_set_empty_elements,
                     list: BasicDynamodbAdapter._clean_list_empty_elements,
                     dict: BasicDynamodbAdapter._clean_dict_empty_elements,
-                    float: BasicDynamodbAdapter._clean_float_value}
+                    float: BasicDynamodbAdapter._clean_float}
 
         arg_type = type(arg)
         if arg_type in cleaners:
-            return cleaners[arg_type](arg)
+            return cleaners[arg_type](arg, decimals)
 
         if not hasattr(arg, '__len__') or len(arg) != 0:
             return arg
         else:
             return None
 
-    def save(self, json_data):
+    @staticmethod
+    def _string_floats_to_decimals(arg):
+        arg_type = type(arg)
+        if arg_type is dict:
+            return {k: BasicDynamodbAdapter._string_floats_to_decimals(v)
+                    for k, v in arg.items()}
+        if arg_type is list:
+            return [BasicDynamodbAdapter._string_floats_to_decimals(x)
+                    for x in arg]
+        if arg_type is str:
+            value = BasicDynamodbAdapter._denormalize_float(arg)
+            return arg if value is arg else \
+                BasicDynamodbAdapter._clean_float_decimal(value)
+        # Sets keep their strings: a set can't mix numbers and strings.
+        return arg
+
+    @property
+    def _decimals(self):
+        return self._float_storage == 'decimal'
+
+    def _build_codec(self, codec):
+        if codec is True:
+            return ItemCodec.for_class(self._class, self._decimals)
+        return codec or None
+
+    def _encode(self, json_data):
+        if self._codec is not None:
+            return self._codec.encode(json_data)
+        return BasicDynamodbAdapter._normalize_nodes(json_data, self._decimals)
+
+    def _decode(self, item):
+        if self._codec is not None:
+            return self._codec.decode(item)
+        return BasicDynamodbAdapter._denormalize_floats(item, self._decimals)
+
+    @property
+    def _restore_floats(self):
+        # fast_reads decodes numbers without knowing the field types, so in
+        # decimal mode a float saved as 2.0 arrives as int 2.
+        if self._codec is None or not self._decimals:
+            return None
+        return self._codec.restore_floats
+
+    @staticmethod
+    def _encode_condition_value(value):
+        if type(value) is float:
+            return BasicDynamodbAdapter._clean_float_decimal(value)
+        if isinstance(value, (list, tuple)):
+            return [BasicDynamodbAdapter._encode_condition_value(x)
+                    for x in value]
+        return value
+
+    def _encode_conditions(self, kwargs):
+        if not self._decimals:
+            return kwargs
+        return {k: self._encode_condition_value(v) for k, v in kwargs.items()}
+
+    def _float_changes(self, item):
+        changed = {}
+        for key, value in item.items():
+            new_value = self._string_floats_to_decimals(value)
+            if new_value != value:
+                changed[key] = new_value
+        return changed
+
+    @staticmethod
+    def _conditional_set_kwargs(item, changed):
+        names = {f'#a{i}': key for i, key in enumerate(changed)}
+        values = {}
+        for i, key in enumerate(changed):
+            values.update({f':n{i}': changed[key], f':o{i}': item[key]})
+        return dict(
+            Key=dict(entity_id=item['entity_id']),
+            UpdateExpression='SET ' + ', '.join(
+                f'{name} = :n{i}' for i, name in enumerate(names)),
+            # Skip items changed (or deleted) since they were read.
+            ConditionExpression=' AND '.join(
+                f'{name} = :o{i}' for i, name in enumerate(names)),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values)
+
+    def _rewrite_item(self, item):
+        changed = self._float_changes(item)
+        if not changed:
+            return 0
+        try:
+            self._call(self._table.update_item,
+                       **self._conditional_set_kwargs(item, changed))
+        except ClientError as e:
+            if e.response['Error']['Code'] != \
+                    'ConditionalCheckFailedException':
+                raise
+            self.logger.warning('%s mudou durante a migração; rode de novo '
+                                'para migrá-lo', item['entity_id'],
+                                **log_fields('update_item',
+                                             self._table_name,
+                                             entity_id=item['entity_id']))
+            return 0
+        return 1
+
+    def _rewrite_chunk(self, chunk):
+        return sum(self._rewrite_item(item) for item in chunk)
+
+    def rewrite_float_storage(self, segments=None, max_workers=4):
+        """
+        Migra a tabela do formato 'string' para o 'decimal': regrava como
+        números os floats gravados como 'Float(...)'. Cada item é
+        atualizado com UpdateItem condicionado aos valores lidos, de modo
+        que escritas concorrentes não são sobrescritas; a migração pode
+        rodar com a aplicação no ar (com float_storage='decimal', que lê os
+        dois formatos) e ser repetida até não restar nada a migrar.
+        Floats dentro de sets continuam como strings.
+        :param segments: Segmentos para ler a tabela com scan paralelo
+        :param max_workers: Lotes de itens atualizados simultaneamente
+        :return: Número de itens regravados
+        """
+        if not self._decimals:
+            raise ValueError('rewrite_float_storage requer '
+                             'float_storage="decimal".')
+        items = self._scan_iterator(partial(self._call, self._table.scan),
+                                    {}, None, None, None,
+                                    None, segments)
+        chunks = chunked(items, self.BATCH_WRITE_SIZE)
+        return sum(run_chunks(self._rewrite_chunk, chunks, max_workers))
+
+    def _log_item(self, message, entity_id, data):
+        self.logger.debug(message, entity_id,
+                          Payload(data, self._log_payload_limit),
+                          **log_fields('save', self._table_name,
+                                       entity_id=entity_id))
+
+    def _prepare_item(self, json_data, debug=None):
+        """
+        :param debug: Se gera as mensagens de debug; None decide pelo nível
+            do logger (e por log_sample_rate)
+        """
+        if debug is None:
+            debug = debug_enabled(self.logger, self._log_sample_rate)
         entity_id = json_data.get('entity_id', str(uuid4()))
         json_data.update(dict(entity_id=entity_id))
-        self.logger.debug(f'Data received to save: {json_data}')
-        cleaned_data = BasicDynamodbAdapter._normalize_nodes(json_data)
-        self.logger.debug(f'Saving after remove empties: {json_data}')
-        self._table.put_item(Item=cleaned_data)
+        if debug:
+            self._log_item('Data received to save %s: %s', entity_id,
+                           json_data)
+        cleaned_data = self._encode(json_data)
+        if debug:
+            self._log_item('Saving %s after remove empties: %s', entity_id,
+                           cleaned_data)
+        return entity_id, cleaned_data
+
+    def _update_existing(self, entity_id, kwargs):
+        """
+        Executa o UpdateItem só se o item existir.
+        :return: False se o item não existir
+        """
+        kwargs['ExpressionAttributeNames']['#id'] = 'entity_id'
+        try:
+            self._call(self._table.update_item, Key=dict(entity_id=entity_id),
+                       ConditionExpression='attribute_exists(#id)', **kwargs)
+        except ClientError as e:
+            if error_code(e) != 'ConditionalCheckFailedException':
+                raise
+            return False
+        return True
+
+    def update(self, entity_id, changes=None, add=None):
+        """
+        Altera atributos de um objeto com um único UpdateItem, sem lê-lo.
+        Valores vazios removem o atributo, como no save.
+        :param changes: {atributo: valor} gravados com SET
+        :param add: {atributo: valor} somados (números) ou unidos (sets)
+            com ADD
+        :return: entity_id, ou None se o objeto não existir
+        """
+        changes = changes or {}
+        if 'entity_id' in changes or 'entity_id' in (add or {}):
+            raise ValueError('entity_id não pode ser alterado')
+        self._ensure_table()
+        changed = self._encode(dict(changes))
+        kwargs = update_kwargs(changed, [k for k in changes
+                                         if k not in changed],
+                               self._encode(dict(add or {})))
+        if kwargs is None:
+            return entity_id
+        try:
+            found = self._update_existing(entity_id, kwargs)
+        finally:
+            self._invalidate([entity_id])
+        return entity_id if found else None
+
+    def _save_changes(self, entity_id, cleaned_data):
+        """
+        Grava só a diferença entre o último estado conhecido do item e
+        cleaned_data.
+        :return: False se não houver estado conhecido ou se o item não
+            existir mais
+        """
+        snapshot = self._snapshot(entity_id)
+        if snapshot is None:
+            return False
+        kwargs = update_kwargs(*diff_items(snapshot, cleaned_data))
+        return kwargs is None or self._update_existing(entity_id, kwargs)
+
+    def save(self, json_data, partial=False):
+        """
+        Salva um objeto.
+        :param partial: Grava, com um único UpdateItem, só os atributos
+            alterados desde a última leitura (ou gravação) do objeto por
+            este adapter (veja snapshot_size); sem alterações nada é
+            gravado. Sem esse estado, ou se o item não existir mais, grava
+            o objeto inteiro.
+        :return: entity_id
+        """
+        self._ensure_table()
+        debug = debug_enabled(self.logger, self._log_sample_rate)
+        start = perf_counter() if debug else None
+        entity_id, cleaned_data = self._prepare_item(json_data, debug)
+        if not (partial and self._save_changes(entity_id, cleaned_data)):
+            self._call(self._table.put_item, Item=cleaned_data)
+        self._invalidate([entity_id])
+        self._remember(cleaned_data)
+        if debug:
+            duration = (perf_counter() - start) * 1000
+            self.logger.debug('Saved %s in %.1f ms', entity_id, duration,
+                              **log_fields('save', self._table_name,
+                                           entity_id=entity_id,
+                                           duration_ms=duration))
         return entity_id
 
+    def _batch_write(self, requests):
+        self._ensure_table()
+        unprocessed = retry_unprocessed(
+            partial(self._call, self._db.batch_write_item),
+            {self._table_name: requests},
+            'UnprocessedItems',
+            self.BATCH_MAX_ATTEMPTS)
+        if unprocessed:
+            count = len(unprocessed[self._table_name])
+            raise self.DynamodbAdapterBatchException(
+                f'{count} itens não processados em {self._table_name}')
+
+    def _save_chunk(self, chunk):
+        # Repeated ids in the same request are rejected; the last one wins.
+        items = {entity_id: item for entity_id, item in chunk}
+        self._batch_write([dict(PutRequest=dict(Item=item))
+                           for item in items.values()])
+        self._invalidate(items)
+        for item in items.values():
+            self._remember(item)
+        return [entity_id for entity_id, _ in chunk]
+
+    def save_many(self, json_list, max_workers=4):
+        """
+        Salva vários objetos com BatchWriteItem, em lotes de 25 itens
+        enviados em paralelo. Cada objeto é normalizado como em save().
+        :param json_list: Iterável de objetos serializados
+        :param max_workers: Lotes enviados simultaneamente
+        :raises DynamodbAdapterBatchException: se algum item continuar não
+            processado depois de BATCH_MAX_ATTEMPTS tentativas
+        :return: Lista com os ids salvos, na ordem de json_list
+        """
+        chunks = chunked(map(self._prepare_item, json_list),
+                         self.BATCH_WRITE_SIZE)
+        results = run_chunks(self._save_chunk, chunks, max_workers)
+        return [entity_id for ids in results for entity_id in ids]
+
     def delete(self, entity_id):
+        """
+        Remove um objeto. Erros do DynamoDB são registrados no log e
+        devolvem None, exceto throttling que persista depois das novas
+        tentativas da retry_policy, que sobe para quem chamou.
+        :return: entity_id, ou None em caso de erro
+        """
+        self._ensure_table()
         try:
-            self._table.delete_item(Key=dict(entity_id=entity_id))
+            self._call(self._table.delete_item, Key=dict(entity_id=entity_id))
         except ClientError as e:
+            if is_throttling(e):
+                raise
             error = e.response['Error']['Message']
-            self._logger.error(f'Erro deletando de {self._class.__name__}: '
-                               f'{error}')
+            self._logger.error('Erro deletando de %s: %s',
+                               self._class.__name__, error,
+                               **log_fields('delete_item', self._table_name,
+                                            entity_id=entity_id))
             return None
+        finally:
+            # Cleared after the write, so a concurrent read can't refill it
+            # with the deleted entity.
+            self._invalidate([entity_id])
         return entity_id
 
+    def _delete_chunk(self, chunk):
+        keys = dict.fromkeys(chunk)
+        self._batch_write([dict(DeleteRequest=dict(Key=dict(entity_id=x)))
+                           for x in keys])
+        self._invalidate(keys)
+        return chunk
+
+    def delete_many(self, entity_ids, max_workers=4):
+        """
+        Remove vários objetos com BatchWriteItem, em lotes de 25 ids
+        enviados em paralelo.
+        :param entity_ids: Iterável de ids
+        :param max_workers: Lotes enviados simultaneamente
+        :raises DynamodbAdapterBatchException: se algum id continuar não
+            processado depois de BATCH_MAX_ATTEMPTS tentativas
+        :return: Lista com os ids removidos, na ordem de entity_ids
+        """
+        chunks = chunked(entity_ids, self.BATCH_WRITE_SIZE)
+        results = run_chunks(self._delete_chunk, chunks, max_workers)
+        return [entity_id for ids in results for entity_id in ids]
+
     @staticmethod
     def _get_ops():
         return {'begins_with': 1,
@@ -227,37 +1043,248 @@ class BasicDynamodbAdapter(BasicPersistAdapter):
             raise ValueError(f'Comparador inválido: {op}')
 
     @staticmethod
-    def _get_contitions(kwargs):
-        ops = BasicDynamodbAdapter._get_ops()
-        have_projection = False
-        conditions = []
-
-        for k, v in kwargs.items():
-            if k == 'ProjectionExpression':
-                have_projection = True
-                continue
+    def _parse_condition(k, v):
+        """
+        :return: Condição (campo, operador, argumentos) de um critério
+        """
+        field, op = k.split('__')
+        arg_count = BasicDynamodbAdapter._get_argcount(
+            op, BasicDynamodbAdapter._get_ops())
 
-            field, op = k.split('__')
-            arg_count = BasicDynamodbAdapter._get_argcount(op, ops)
+        args = BasicDynamodbAdapter._args_from_value(v, arg_count)
+        return field.replace('_dot_', '.'), op, args
 
-            args = BasicDynamodbAdapter._args_from_value(v, arg_count)
-            field = field.replace('_dot_', '.')
-            conditions.append(getattr(Attr(field), op)(*args))
+    @staticmethod
+    def _parse_conditions(kwargs):
+        """
+        :return: Lista de condições (campo, operador, argumentos)
+        """
+        conditions = [BasicDynamodbAdapter._parse_condition(k, v)
+                      for k, v in kwargs.items()
+                      if k != 'ProjectionExpression']
 
         if not conditions:
             raise ValueError('Nenhuma condição no filtro.')
 
-        return (have_projection,
-                reduce(lambda accum, curr: accum | curr, conditions),)
+        return conditions
+
+    def _parse_term(self, k, v):
+        if self._decimals:
+            v = self._encode_condition_value(v)
+        return self._parse_condition(k, v)
+
+    def _filter_terms(self, where, mode, kwargs):
+        """
+        :param where: Critérios compostos (Q), combinados com E entre si e
+            com os critérios em kwargs
+        :param mode: Como os critérios em kwargs são combinados: 'or' ou
+            'and'
+        :return: (termos, se são combinados com E)
+        """
+        if mode not in FILTER_MODES:
+            raise ValueError(f'mode inválido: {mode}')
+        if not where:
+            return (self._parse_conditions(self._encode_conditions(kwargs)),
+                    mode == 'and')
+        grouped = [Q._node(mode.upper(), list(kwargs.items()))] \
+            if kwargs else []
+        terms = Q(*where, *grouped).resolve(self._parse_term).conjuncts()
+        if not terms:
+            raise ValueError('Nenhuma condição no filtro.')
+        return terms, True
+
+    @staticmethod
+    def _build_condition(conditions, key=False, conjunctive=False):
+        builder = Key if key else Attr
+        built = [getattr(builder(field), op)(*args)
+                 for field, op, args in conditions]
+        return reduce(and_ if conjunctive else or_, built)
+
+    @staticmethod
+    def _get_contitions(kwargs):
+        conditions = BasicDynamodbAdapter._parse_conditions(kwargs)
+        return ('ProjectionExpression' in kwargs,
+                BasicDynamodbAdapter._build_condition(conditions),)
+
+    def _plan_filter(self, where, mode, projection, kwargs, keys_only=False):
+        """
+        :param keys_only: Se nenhum atributo é lido (count), o que permite
+            usar índices KEYS_ONLY
+        :return: (QueryPlan, argumentos da projeção, atributos lidos)
+        """
+        terms, conjunctive = self._filter_terms(where, mode, kwargs)
+        projection_kwargs, fields = self._projection_kwargs(projection)
+        plan = plan_query(terms, self._indexes, conjunctive,
+                          () if keys_only else fields)
+        return plan, projection_kwargs, fields
+
+    def _plan_kwargs(self, plan, projection_kwargs):
+        kwargs = dict(projection_kwargs or {'Select': 'ALL_ATTRIBUTES'})
+        if plan.filter_conditions:
+            filter_kwargs = compile_filter(plan.filter_conditions,
+                                           plan.conjunctive)
+            filter_kwargs['ExpressionAttributeNames'].update(
+                kwargs.get('ExpressionAttributeNames', {}))
+            kwargs.update(filter_kwargs)
+        if plan.is_query:
+            kwargs.update(KeyConditionExpression=self._build_condition(
+                plan.key_conditions, key=True, conjunctive=True))
+        if plan.index_name:
+            kwargs.update(IndexName=plan.index_name)
+        return kwargs
+
+    def _prepare_read(self, where, mode, projection, result, kwargs,
+                      filtered=True):
+        """
+        :param filtered: Se há critérios; sem eles a tabela toda é lida
+        :return: (scan, argumentos do scan, transform, QueryPlan); o plano
+            é None sem critérios
+        """
+        plan, operation = None, 'scan'
+        if filtered:
+            plan, projection_kwargs, fields = self._plan_filter(
+                where, mode, projection, kwargs)
+            scan_kwargs = self._plan_kwargs(plan, projection_kwargs)
+            operation = 'query' if plan.is_query else 'scan'
+        else:
+            scan_kwargs, fields = self._projection_kwargs(projection)
+        scan, transform = self._read_source(
+            result or ('dict' if projection else 'entity'), fields,
+            operation)
+        return scan, scan_kwargs, transform, plan
+
+    def _cursor_context(self, plan):
+        index_name = plan.index_name if plan is not None else None
+        return f'{self._table_name}/{index_name or ""}'
+
+    def page(self, limit, *where, cursor=None, result=None, projection=None,
+             mode='or', **kwargs):
+        """
+        Lê uma única página, com uma única requisição limitada a limit
+        itens avaliados, para listagens paginadas (ex.: endpoints REST).
+        Os critérios seguem a sintaxe de filter(); sem critérios a tabela
+        toda é paginada. Com critérios, uma página pode ter menos de limit
+        itens (até nenhum) e ainda assim não ser a última.
+            page = adapter.page(50, status__eq='ativo', cursor=cursor)
+        :param limit: Número máximo de itens avaliados na página
+        :param cursor: Cursor devolvido pela página anterior; None começa
+            do início
+        :param result: Formato dos resultados, como em iter_all()
+        :param projection: Atributos lidos, como em iter_all()
+        :param mode: Combina os critérios com 'or' (default) ou 'and'
+        :raises ValueError: se o cursor for inválido ou adulterado
+        :return: Page(items, cursor), com cursor None na última página
+        """
+        self._ensure_table()
+        projection = projection or kwargs.pop('ProjectionExpression', None)
+        scan, scan_kwargs, transform, plan = self._prepare_read(
+            where, mode, projection, result, kwargs,
+            filtered=bool(where or kwargs))
+        context = self._cursor_context(plan)
+        start_key = self._cursors.decode(cursor, context)
+        scan_kwargs.update(Limit=limit)
+        if start_key:
+            scan_kwargs.update(ExclusiveStartKey=start_key)
+        response = scan(**scan_kwargs)
+        items = response['Items'] if transform is None else \
+            [transform(x) for x in response['Items']]
+        return Page(items, self._cursors.encode(
+            response.get('LastEvaluatedKey'), context))
+
+    def explain(self, *where, projection=None, mode='or', **kwargs):
+        """
+        Mostra como filter() executaria os critérios informados, sem
+        executá-los.
+        :return: dict com operation ('Query' ou 'Scan'), index_name (None
+            para a tabela), key_conditions, filter_conditions e reason
+        """
+        projection = projection or kwargs.pop('ProjectionExpression', None)
+        return self._plan_filter(where, mode, projection,
+                                 kwargs)[0].describe()
+
+    @staticmethod
+    def _count_pages(scan, scan_kwargs):
+        return sum(response['Count']
+                   for response in ScanIterator(scan, scan_kwargs).pages())
+
+    def _count_segments(self, scan, scan_kwargs, segments):
+        return sum(run_chunks(
+            lambda segment: self._count_pages(scan, dict(
+                scan_kwargs, Segment=segment, TotalSegments=segments)),
+            range(segments), segments))
+
+    def count(self, *where, segments=None, mode='or', **kwargs):
+        """
+        Conta os objetos que atendem aos critérios (com a mesma sintaxe de
+        filter()), ou todos os objetos se não houver critérios, usando
+        Select='COUNT': os itens não são transferidos.
+        :param segments: Número de segmentos para um scan paralelo
+        :return: Número de objetos
+        """
+        self._ensure_table()
+        scan_kwargs, operation = {'Select': 'COUNT'}, 'scan'
+        if where or kwargs:
+            plan = self._plan_filter(where, mode, None, kwargs,
+                                     keys_only=True)[0]
+            scan_kwargs = self._plan_kwargs(plan, scan_kwargs)
+            operation = 'query' if plan.is_query else 'scan'
+        scan = partial(self._call, getattr(self._table, operation))
+        segments = segments or self._scan_segments
+        if segments and operation == 'scan':
+            return self._count_segments(scan, scan_kwargs, segments)
+        return self._count_pages(scan, scan_kwargs)
+
+    def aggregate(self, op, attribute, *where, segments=None, mode='or',
+                  **kwargs):
+        """
+        Agrega um atributo dos objetos que atendem aos critérios (ou de
+        todos os objetos), página por página: só o atributo é lido e os
+        itens não são guardados nem instanciados.
+            total = adapter.aggregate('sum', 'valor', status__eq='pago')
+        :param op: 'sum', 'min', 'max' ou 'distinct'
+        :param attribute: Nome do atributo agregado
+        :param segments: Número de segmentos para um scan paralelo
+        :return: Resultado da agregação; veja aggregates.aggregate()
+        """
+        read_kwargs = dict(segments=segments, result='dict',
+                           projection=[attribute])
+        items = self.iter_filter(*where, mode=mode, **kwargs, **read_kwargs) \
+            if where or kwargs else self.iter_all(**read_kwargs)
+        return aggregate(op, attribute, items)
 
     def _desserialize(self, result):
-        objects = [self._class.from_json(x) for x in result]
-        for obj in objects:
-            obj.set_adapter(self)
+        return list(map(self._entity_factory(), result))
 
-        return objects
+    def iter_filter(self, *where, page_size=None, max_items=None,
+                    start_key=None, segments=None, ordered=False,
+                    result=None, projection=None, mode='or', **kwargs):
+        """
+        Versão preguiçosa de filter(): segue o LastEvaluatedKey e entrega os
+        objetos à medida que cada página chega. Os critérios seguem a mesma
+        sintaxe de filter().
+        :param page_size: Quantidade de itens avaliados por requisição
+        :param max_items: Número máximo de objetos retornados
+        :param start_key: Chave (last_evaluated_key) de onde retomar
+        :param segments: Número de segmentos para um scan paralelo
+        :param ordered: No scan paralelo, entrega os segmentos em ordem
+        :param result: Formato dos resultados, como em iter_all()
+        :param projection: Atributos lidos, como em iter_all(); também
+            aceita o critério ProjectionExpression
+        :param mode: Combina os critérios com 'or' (default) ou 'and'
+        :return: Iterador de objetos (ou do formato pedido em result)
+        """
+        projection = projection or kwargs.pop('ProjectionExpression', None)
+        scan, scan_kwargs, transform, plan = self._prepare_read(
+            where, mode, projection, result, kwargs)
+        if plan.is_query:
+            return self._query_iterator(scan, scan_kwargs, transform,
+                                        page_size, max_items, start_key,
+                                        plan.index)
+        return self._scan_iterator(scan, scan_kwargs, transform,
+                                   page_size, max_items, start_key,
+                                   segments, ordered)
 
-    def filter(self, **kwargs):
+    def filter(self, *where, **kwargs):
         """
         Filtra objetos de acordo com o critério especificado.
         Para especificar o critérios, que por default são concatenados
@@ -266,6 +1293,19 @@ class BasicDynamodbAdapter(BasicPersistAdapter):
         Exemplo: Para filtrar todos os objetos em que o campo email seja
         igual à "nome@dom.com", o filtro deverá ser chamado assim:
             result = adapter.filter(email__eq="nome@dom.com")
+        Use mode='and' para combinar os critérios com *e*, ou critérios
+        compostos (Q) com & (e), | (ou) e ~ (não), que são combinados com
+        *e* entre si e com os demais critérios:
+            result = adapter.filter(Q(email__eq=email) &
+                                    ~Q(status__eq='inativo'))
+        Os critérios são enviados em um único FilterExpression.
+        Os parâmetros de iter_filter() (ex.: segments=8 para um scan
+        paralelo, ou result='row' para linhas leves em vez de entidades)
+        também são aceitos.
+        Quando os critérios permitem (uma igualdade na chave de partição da
+        tabela ou de um dos índices declarados), o filtro é feito com um
+        Query em vez de um scan; nesse caso segments é ignorado. Use
+        explain() para ver o plano escolhido.
 
         :raises ValueError(Comparador inválido): se o comparador especificado
             não for um dos seguintes:
@@ -274,14 +1314,13 @@ class BasicDynamodbAdapter(BasicPersistAdapter):
 
         :return: Lista de objetos
         """
-        have_projection, conditions = self._get_contitions(kwargs)
-        scan_kwargs = self._get_scan_kwargs(conditions, kwargs)
-        result = self._table.scan(**scan_kwargs)['Items']
+        return list(self.iter_filter(*where, **kwargs))
 
-        if have_projection:
-            return result
+    class DynamodbAdapterScanException(BaseException):
+        pass
 
-        return self._desserialize(result)
+    class DynamodbAdapterBatchException(Exception):
+        pass
 
-    class DynamodbAdapterScanException(BaseException):
+    class DynamodbAdapterIndexException(Exception):
         pass
@@ -0,0 +1,63 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from time import sleep
+
+from .retry import backoff_delay
+
+
+def chunked(iterable, size):
+    """
+    Divide um iterável em listas de até size elementos, sem consumi-lo
+    inteiro de uma vez.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunks(func, chunks, max_workers):
+    """
+    Aplica func a cada chunk, com até max_workers chunks em paralelo, e
+    devolve os resultados na ordem dos chunks. Só mantém em voo o dobro de
+    max_workers chunks, para não materializar iteráveis grandes.
+    """
+    if max_workers <= 1:
+        return [func(chunk) for chunk in chunks]
+
+    results = []
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= 2 * max_workers:
+                results.append(pending.popleft().result())
+            pending.append(executor.submit(func, chunk))
+        results.extend(future.result() for future in pending)
+    return results
+
+
+def retry_unprocessed(call, request_items, unprocessed_key, max_attempts,
+                      on_response=None):
+    """
+    Executa uma operação batch e reenvia o que voltar em unprocessed_key
+    (UnprocessedItems/UnprocessedKeys), com backoff exponencial e jitter.
+    :param call: Operação batch (ex.: resource.batch_write_item)
+    :param request_items: RequestItems da primeira chamada
+    :param unprocessed_key: Chave da resposta com o que não foi processado
+    :param max_attempts: Número máximo de chamadas
+    :param on_response: Callable chamado com cada resposta
+    :return: O que continuou sem processar depois da última tentativa
+    """
+    for attempt in range(max_attempts):
+        if attempt:
+            sleep(backoff_delay(attempt - 1))
+        response = call(RequestItems=request_items)
+        if on_response is not None:
+            on_response(response)
+        request_items = response.get(unprocessed_key)
+        if not request_items:
+            return {}
+    return request_items
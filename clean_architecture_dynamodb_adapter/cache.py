@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class EntityCache:
+    def __init__(self, max_size=1024, ttl=60.0, clock=monotonic):
+        """
+        Cache LRU limitado, com tempo de vida por entrada, seguro para uso
+        por várias threads.
+        :param max_size: Número máximo de entradas
+        :param ttl: Tempo de vida de cada entrada, em segundos; None para
+            não expirar
+        :param clock: Relógio usado para o ttl
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._fills = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, expires_at):
+        return expires_at is not None and expires_at <= self._clock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _store(self, key, value):
+        expires_at = None if self._ttl is None else self._clock() + self._ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def begin_fill(self, key):
+        """
+        Marca o início da leitura de key na origem.
+        :return: Geração de key, a ser passada para end_fill
+        """
+        with self._lock:
+            fill = self._fills.setdefault(key, [0, 0])
+            fill[0] += 1
+            return fill[1]
+
+    def end_fill(self, key, generation, value):
+        """
+        Encerra uma leitura iniciada por begin_fill, guardando value (se não
+        for None) só se key não tiver sido invalidada nesse meio tempo: uma
+        leitura anterior a uma gravação não repõe o valor antigo.
+        """
+        with self._lock:
+            fill = self._fills[key]
+            fill[0] -= 1
+            if not fill[0]:
+                del self._fills[key]
+            if value is not None and fill[1] == generation:
+                self._store(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if key in self._fills:
+                self._fills[key][1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for fill in self._fills.values():
+                fill[1] += 1
+
+    def stats(self):
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    evictions=self.evictions,
+                    expirations=self.expirations,
+                    size=len(self._entries))
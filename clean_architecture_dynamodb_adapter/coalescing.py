@@ -0,0 +1,79 @@
+from concurrent.futures import Future
+from threading import Lock
+from time import sleep
+
+
+def _resolve(futures, func):
+    try:
+        results = func()
+    except BaseException as e:
+        for future in futures.values():
+            future.set_exception(e)
+        return
+    for key, future in futures.items():
+        future.set_result(results.get(key))
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Faz com que chamadas concorrentes para a mesma chave compartilhem
+        uma única execução e o seu resultado.
+        """
+        self._lock = Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if leader:
+            try:
+                _resolve({key: future}, lambda: {key: func()})
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result()
+
+
+class BatchCoalescer:
+    def __init__(self, fetch_many, window=0.002):
+        """
+        Agrupa buscas concorrentes feitas dentro de uma janela de tempo em
+        uma única chamada de fetch_many. A primeira thread de cada janela
+        espera window segundos e busca todas as chaves pedidas até então;
+        chaves repetidas na mesma janela são buscadas uma vez só.
+        :param fetch_many: Callable que recebe uma lista de chaves e devolve
+            um dict chave -> valor (chaves ausentes resultam em None)
+        :param window: Duração da janela, em segundos
+        """
+        self._fetch_many = fetch_many
+        self._window = window
+        self._lock = Lock()
+        self._pending = {}
+        self._collecting = False
+
+    def _enqueue(self, key):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = Future()
+            leader = not self._collecting
+            self._collecting = True
+        return future, leader
+
+    def _take_batch(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._collecting = False
+        return batch
+
+    def get(self, key):
+        future, leader = self._enqueue(key)
+        if leader:
+            sleep(self._window)
+            batch = self._take_batch()
+            _resolve(batch, lambda: self._fetch_many(list(batch)))
+        return future.result()
@@ -0,0 +1,265 @@
+from decimal import Decimal
+from functools import partial
+from math import isfinite
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from marshmallow import Schema, fields
+
+ANY = 'any'
+FLOAT = 'float'
+STRING = 'string'
+SCALAR = 'scalar'
+
+# Magnitudes a DynamoDB number can hold (besides zero).
+_NUMBER_MIN = Decimal('1E-130')
+_NUMBER_MAX = Decimal('1E+126')
+
+_SCALAR_TYPES = (int, bool)
+_SAMPLE_SHAPES = {float: FLOAT, str: STRING, int: SCALAR, bool: SCALAR}
+_FIELD_SHAPES = ((fields.Float, FLOAT),
+                 (fields.String, STRING),
+                 (fields.Boolean, SCALAR),
+                 (fields.Integer, SCALAR))
+
+
+def _float_to_string(arg):
+    return f'Float({arg})'
+
+
+def _float_to_decimal(arg):
+    # repr() is the shortest exact round trip. DynamoDB has no inf/nan and
+    # no numbers outside its range, which are kept as strings instead.
+    if isfinite(arg):
+        value = Decimal(repr(arg))
+        if not value or _NUMBER_MIN <= abs(value) < _NUMBER_MAX:
+            return value
+    return _float_to_string(arg)
+
+
+def _decode_string(arg):
+    if arg.startswith('Float(') and arg.endswith(')'):
+        return float(arg[6:-1])
+    return arg
+
+
+def _decode_decimal(arg):
+    if arg == arg.to_integral_value():
+        return int(arg)
+    return float(arg)
+
+
+def _restore_float(arg):
+    return float(arg) if type(arg) is int else arg
+
+
+def shape_from_schema(schema):
+    """
+    Descreve o formato dos dados serializados por um Schema do
+    marshmallow: um dict {chave: formato}, uma lista [formato] ou um dos
+    formatos simples (FLOAT, STRING, SCALAR, ANY).
+    """
+    return {field.data_key or name: _shape_from_field(field)
+            for name, field in schema.fields.items()}
+
+
+def _shape_from_field(field):
+    if isinstance(field, fields.Nested):
+        shape = shape_from_schema(field.schema)
+        return [shape] if field.many else shape
+    if isinstance(field, fields.List):
+        return [_shape_from_field(field.inner)]
+    for field_type, shape in _FIELD_SHAPES:
+        if isinstance(field, field_type):
+            return shape
+    return ANY
+
+
+def shape_from_sample(sample):
+    """
+    Descreve o formato de um objeto serializado a partir de um exemplo;
+    listas assumem o formato do seu primeiro elemento.
+    """
+    if type(sample) is dict:
+        return {k: shape_from_sample(v) for k, v in sample.items()}
+    if type(sample) is list:
+        return [shape_from_sample(sample[0])] if sample else ANY
+    return _SAMPLE_SHAPES.get(type(sample), ANY)
+
+
+class ItemCodec:
+    # Keyed weakly by class, so dynamically created entity classes can
+    # still be collected; each entry maps decimals -> codec.
+    _cache = WeakKeyDictionary()
+    _cache_lock = Lock()
+
+    def __init__(self, shape, decimals=False):
+        """
+        Codificador de itens compilado a partir do formato dos dados (veja
+        shape_from_schema). Produz o mesmo resultado de
+        BasicDynamodbAdapter._normalize_nodes e _denormalize_floats, mas
+        com funções especializadas por campo, montadas uma única vez.
+        Valores fora do formato esperado caem no caminho genérico. A única
+        diferença: com decimals=True, campos declarados como float voltam
+        sempre como float (2.0, e não 2).
+        :param shape: Formato dos dados
+        :param decimals: Grava floats como números em vez de 'Float(...)'
+        """
+        # The generic path lives in the adapter, which imports this module.
+        from .basic_dynamodb_adapter import BasicDynamodbAdapter as adapter
+        self._decimals = decimals
+        self._generic_encode = partial(adapter._normalize_nodes,
+                                       decimals=decimals)
+        self._generic_decode = partial(adapter._denormalize_floats,
+                                       decimals=decimals)
+        self._encode_float = _float_to_decimal if decimals \
+            else _float_to_string
+        self.encode = self._compile_encoder(shape)
+        self.decode = self._compile_decoder(shape)
+        self.restore_floats = self._compile_restorer(shape)
+
+    @classmethod
+    def from_sample(cls, sample, decimals=False):
+        return cls(shape_from_sample(sample), decimals)
+
+    @classmethod
+    def for_class(cls, adapted_class, decimals=False):
+        """
+        Codec compilado a partir do Schema de adapted_class, em cache por
+        classe. Devolve None se a classe não tiver um Schema do marshmallow.
+        """
+        with cls._cache_lock:
+            codecs = cls._cache.setdefault(adapted_class, {})
+            if decimals not in codecs:
+                codecs[decimals] = cls._from_class(adapted_class, decimals)
+            return codecs[decimals]
+
+    @classmethod
+    def _from_class(cls, adapted_class, decimals):
+        schema_class = getattr(adapted_class, 'Schema', None)
+        if not isinstance(schema_class, type) or \
+                not issubclass(schema_class, Schema):
+            return None
+        return cls(shape_from_schema(schema_class()), decimals)
+
+    def _compile_encoder(self, shape):
+        if type(shape) is dict:
+            return self._dict_encoder({k: self._compile_encoder(v)
+                                       for k, v in shape.items()})
+        if type(shape) is list:
+            return self._list_encoder(self._compile_encoder(shape[0]))
+        return getattr(self, f'_{shape}_encoder')()
+
+    def _compile_decoder(self, shape):
+        if type(shape) is dict:
+            return self._dict_decoder({k: self._compile_decoder(v)
+                                       for k, v in shape.items()})
+        if type(shape) is list:
+            return self._list_decoder(self._compile_decoder(shape[0]))
+        return getattr(self, f'_{shape}_decoder')()
+
+    def _compile_restorer(self, shape):
+        """
+        :param shape: Formato dos dados
+        :return: Função que converte em float os int dos campos declarados
+            como float (itens já decodificados, como em fast_reads), ou None
+            se o formato não tiver floats
+        """
+        if type(shape) is dict:
+            restorers = {k: self._compile_restorer(v)
+                         for k, v in shape.items()}
+            restorers = {k: v for k, v in restorers.items() if v}
+            return self._dict_restorer(restorers) if restorers else None
+        if type(shape) is list:
+            restorer = self._compile_restorer(shape[0])
+            return restorer and (lambda v: [restorer(x) for x in v]
+                                 if type(v) is list else v)
+        return _restore_float if shape == FLOAT else None
+
+    @staticmethod
+    def _dict_restorer(restorers):
+        def restore(arg):
+            if type(arg) is not dict:
+                return arg
+            return {k: restorers[k](v) if k in restorers else v
+                    for k, v in arg.items()}
+        return restore
+
+    def _any_encoder(self):
+        return self._generic_encode
+
+    def _any_decoder(self):
+        return self._generic_decode
+
+    def _dict_encoder(self, encoders):
+        any_encoder = self._generic_encode
+
+        def encode(arg):
+            if type(arg) is not dict:
+                return any_encoder(arg)
+            result = {}
+            for key, value in arg.items():
+                clean_value = encoders.get(key, any_encoder)(value)
+                if clean_value:
+                    result[key] = clean_value
+            return result
+        return encode
+
+    def _list_encoder(self, encoder):
+        any_encoder = self._generic_encode
+
+        def encode(arg):
+            if type(arg) is not list:
+                return any_encoder(arg)
+            return [x for x in map(encoder, arg) if x]
+        return encode
+
+    def _float_encoder(self):
+        any_encoder, encode_float = self._generic_encode, self._encode_float
+        return lambda v: encode_float(v) if type(v) is float \
+            else any_encoder(v)
+
+    def _string_encoder(self):
+        any_encoder = self._generic_encode
+        return lambda v: (v or None) if type(v) is str else any_encoder(v)
+
+    def _scalar_encoder(self):
+        any_encoder = self._generic_encode
+        return lambda v: v if type(v) in _SCALAR_TYPES else any_encoder(v)
+
+    def _dict_decoder(self, decoders):
+        any_decoder = self._generic_decode
+
+        def decode(arg):
+            if type(arg) is not dict:
+                return any_decoder(arg)
+            return {k: decoders.get(k, any_decoder)(v)
+                    for k, v in arg.items()}
+        return decode
+
+    def _list_decoder(self, decoder):
+        any_decoder = self._generic_decode
+        return lambda v: [decoder(x) for x in v] if type(v) is list \
+            else any_decoder(v)
+
+    def _float_decoder(self):
+        if not self._decimals:
+            return self._string_decoder()
+        any_decoder = self._generic_decode
+
+        def decode(v):
+            if type(v) is Decimal:
+                return float(v)
+            if type(v) is str:
+                return _decode_string(v)
+            return any_decoder(v)
+        return decode
+
+    def _string_decoder(self):
+        any_decoder = self._generic_decode
+        return lambda v: _decode_string(v) if type(v) is str \
+            else any_decoder(v)
+
+    def _scalar_decoder(self):
+        any_decoder = self._generic_decode
+        return lambda v: v if type(v) in _SCALAR_TYPES else any_decoder(v)
@@ -0,0 +1,141 @@
+import os
+from threading import RLock, local
+
+import boto3
+from botocore.config import Config
+
+from .rate_limiter import AdaptiveRateLimiter
+
+
+class ConnectionPool:
+    def __init__(self, max_pool_connections=50, tcp_keepalive=None,
+                 max_attempts=None, retry_mode=None, connect_timeout=None,
+                 read_timeout=None):
+        """
+        Registro de sessions, clients e resources do boto3, compartilhado
+        entre os adapters de um processo e seguro para uso por várias
+        threads. Há um client por endpoint e região, usado por todas as
+        threads (os clients do boto3 são thread-safe), de modo que o pool de
+        conexões HTTP também é compartilhado. Sessions e resources não são
+        thread-safe: cada thread recebe o seu resource, montado sobre o
+        client compartilhado.
+        Depois de um fork o registro é descartado, já que sessions do boto3
+        não podem ser usadas em mais de um processo.
+        :param max_pool_connections: Conexões HTTP mantidas por resource
+        :param tcp_keepalive: Ativa o keep-alive TCP (botocore >= 1.27)
+        :param max_attempts: Tentativas do retry do botocore
+        :param retry_mode: Modo de retry do botocore (legacy, standard ou
+            adaptive)
+        :param connect_timeout: Timeout de conexão, em segundos
+        :param read_timeout: Timeout de leitura, em segundos
+        """
+        self._config = self._build_config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=tcp_keepalive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries=self._build_retries(max_attempts, retry_mode))
+        self._lock = RLock()
+        self._pid = os.getpid()
+        self._sessions = {}
+        self._resources = {}
+        self._local = local()
+        self._known_tables = set()
+        self._rate_limiters = {}
+
+    @staticmethod
+    def _build_retries(max_attempts, retry_mode):
+        retries = dict(max_attempts=max_attempts, mode=retry_mode)
+        return {k: v for k, v in retries.items() if v is not None} or None
+
+    @staticmethod
+    def _build_config(**kwargs):
+        return Config(**{k: v for k, v in kwargs.items() if v is not None})
+
+    @property
+    def config(self):
+        return self._config
+
+    def _check_fork(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self.clear()
+                self._pid = os.getpid()
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._resources.clear()
+            self._local = local()
+            self._known_tables.clear()
+            self._rate_limiters.clear()
+
+    def session(self, region_name=None):
+        self._check_fork()
+        with self._lock:
+            if region_name not in self._sessions:
+                self._sessions[region_name] = boto3.session.Session(
+                    region_name=region_name)
+            return self._sessions[region_name]
+
+    def _thread_resources(self):
+        return self._local.__dict__.setdefault('resources', {})
+
+    def _shared_resource(self, endpoint_url, region_name):
+        """
+        Resource criado uma vez por endpoint e região, que dá o client
+        compartilhado. Ele fica com a thread que o criou; as outras montam
+        o seu sobre o mesmo client.
+        """
+        key = (endpoint_url, region_name)
+        with self._lock:
+            if key not in self._resources:
+                self._resources[key] = self.session(region_name).resource(
+                    'dynamodb', endpoint_url=endpoint_url, config=self._config)
+                self._thread_resources()[key] = self._resources[key]
+            return self._resources[key]
+
+    def resource(self, endpoint_url=None, region_name=None):
+        """
+        :return: Resource da thread atual, sobre o client compartilhado
+        """
+        self._check_fork()
+        key = (endpoint_url, region_name)
+        resources = self._thread_resources()
+        if key not in resources:
+            shared = self._shared_resource(endpoint_url, region_name)
+            if key not in resources:
+                # Resources are cheap to build over an existing client.
+                resources[key] = type(shared)(client=shared.meta.client)
+        return resources[key]
+
+    def client(self, endpoint_url=None, region_name=None):
+        self._check_fork()
+        return self._shared_resource(endpoint_url, region_name).meta.client
+
+    def is_known_table(self, table_name, endpoint_url=None,
+                       region_name=None):
+        self._check_fork()
+        with self._lock:
+            return (endpoint_url, region_name, table_name) in \
+                self._known_tables
+
+    def add_known_table(self, table_name, endpoint_url=None,
+                        region_name=None):
+        with self._lock:
+            self._known_tables.add((endpoint_url, region_name, table_name))
+
+    def rate_limiter(self, table_name, endpoint_url=None, region_name=None):
+        """
+        AdaptiveRateLimiter da tabela, compartilhado por todos os adapters
+        (e threads) do processo que usam este pool.
+        """
+        self._check_fork()
+        key = (endpoint_url, region_name, table_name)
+        with self._lock:
+            if key not in self._rate_limiters:
+                self._rate_limiters[key] = AdaptiveRateLimiter()
+            return self._rate_limiters[key]
+
+
+default_pool = ConnectionPool()
@@ -0,0 +1,75 @@
+import hmac
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from hashlib import sha256
+from secrets import token_bytes
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from .wire import encode_item
+
+Page = namedtuple('Page', ['items', 'cursor'])
+
+# Cursors signed with this secret are only valid inside this process.
+_PROCESS_SECRET = token_bytes(32)
+_SIGNATURE_SIZE = 16
+_deserializer = TypeDeserializer()
+
+
+def _b64encode(data):
+    return urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class CursorCodec:
+    def __init__(self, secret=None):
+        """
+        Codifica o LastEvaluatedKey de uma página em um cursor opaco,
+        seguro para URLs e assinado com HMAC-SHA256, para que um cursor
+        alterado pelo cliente seja recusado.
+        :param secret: Chave da assinatura (str ou bytes). Deve ser a
+            mesma em todos os processos que atendem as requisições; None
+            usa uma chave aleatória, válida só neste processo.
+        """
+        if isinstance(secret, str):
+            secret = secret.encode()
+        self._secret = secret or _PROCESS_SECRET
+
+    def _sign(self, payload, context):
+        message = context.encode() + b'|' + payload
+        return hmac.new(self._secret, message,
+                        sha256).digest()[:_SIGNATURE_SIZE]
+
+    def encode(self, key, context=''):
+        """
+        :param key: LastEvaluatedKey; None ao fim da leitura
+        :param context: Identifica a leitura (tabela, índice); um cursor só
+            é aceito no mesmo contexto
+        :return: Cursor, ou None se key for None
+        """
+        if not key:
+            return None
+        payload = json.dumps(encode_item(key), sort_keys=True,
+                             separators=(',', ':')).encode()
+        signature = self._sign(payload, context)
+        return f'{_b64encode(payload)}.{_b64encode(signature)}'
+
+    def decode(self, cursor, context=''):
+        """
+        :raises ValueError: se o cursor for inválido ou tiver sido alterado
+        :return: ExclusiveStartKey, ou None se cursor for None
+        """
+        if not cursor:
+            return None
+        try:
+            payload, signature = map(_b64decode, cursor.split('.'))
+        except ValueError:
+            raise ValueError('Cursor inválido')
+        if not hmac.compare_digest(signature, self._sign(payload, context)):
+            raise ValueError('Cursor inválido')
+        return {k: _deserializer.deserialize(v)
+                for k, v in json.loads(payload).items()}
@@ -0,0 +1,523 @@
+import re
+from decimal import Decimal
+from functools import lru_cache, partial
+from operator import ge, gt, le, lt
+
+from boto3.dynamodb.types import Binary
+
+MISSING = object()
+
+_TOKENS = re.compile(r'\s*(<>|<=|>=|[=<>(),.\[\]+-]|[#:]?\w+)')
+_NAME = re.compile(r'#\w+|[A-Za-z_]\w*')
+_TYPE_TAGS = ((type(None), 'NULL'), (str, 'S'), ((int, Decimal), 'N'),
+              ((bytes, bytearray, Binary), 'B'), (dict, 'M'), (list, 'L'))
+_SETS = (set, frozenset)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def tokenize(expression):
+    expression = expression.rstrip()
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKENS.match(expression, position)
+        if match is None:
+            raise ExpressionError(f'Expressão inválida: {expression}')
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def type_tag(value):
+    """
+    :return: Tipo do valor no DynamoDB ('S', 'N', 'M', 'SS', ...), ou None
+    """
+    if isinstance(value, bool):
+        return 'BOOL'
+    if isinstance(value, _SETS):
+        return type_tag(next(iter(value))) + 'S' if value else None
+    for types, tag in _TYPE_TAGS:
+        if isinstance(value, types):
+            return tag
+    return None
+
+
+def _plain(value):
+    return bytes(value.value) if isinstance(value, Binary) else value
+
+
+def sort_key(value):
+    """
+    :return: Chave de ordenação de um valor de chave ('S', 'N' ou 'B')
+    """
+    return type_tag(value) or '', _plain(value)
+
+
+def get_path(item, path):
+    """
+    :param path: Caminho já resolvido (nomes e posições de lista)
+    :return: Valor no caminho, ou MISSING
+    """
+    value = item
+    for part in path:
+        container = dict if isinstance(part, str) else list
+        if not isinstance(value, container):
+            return MISSING
+        try:
+            value = value[part]
+        except (KeyError, IndexError):
+            return MISSING
+    return value
+
+
+def _equal(a, b):
+    return a is not MISSING and b is not MISSING and \
+        type_tag(a) == type_tag(b) and _plain(a) == _plain(b)
+
+
+def _not_equal(a, b):
+    return not _equal(a, b)
+
+
+def _comparable(a, b):
+    return a is not MISSING and b is not MISSING and \
+        type_tag(a) in ('S', 'N', 'B') and type_tag(a) == type_tag(b)
+
+
+def _ordering(compare):
+    return lambda a, b: _comparable(a, b) and compare(_plain(a), _plain(b))
+
+
+_COMPARATORS = {'=': _equal, '<>': _not_equal, '<': _ordering(lt),
+                '<=': _ordering(le), '>': _ordering(gt), '>=': _ordering(ge)}
+
+
+def _between(value, low, high):
+    return _COMPARATORS['>='](value, low) and _COMPARATORS['<='](value, high)
+
+
+def _is_in(value, options):
+    return any(_equal(value, x) for x in options)
+
+
+def _size(value):
+    if type_tag(value) in (None, 'N', 'BOOL', 'NULL'):
+        return MISSING
+    return len(_plain(value))
+
+
+def _begins_with(value, prefix):
+    return _comparable(value, prefix) and type_tag(value) != 'N' and \
+        _plain(value).startswith(_plain(prefix))
+
+
+def _contains(value, member):
+    if isinstance(value, str):
+        return isinstance(member, str) and member in value
+    if isinstance(value, _SETS + (list,)):
+        return any(_equal(x, member) for x in value)
+    return False
+
+
+# The only function allowed as an operand.
+_SIZE = 'size'
+
+_PREDICATES = {
+    'attribute_exists': (lambda value: value is not MISSING, 0),
+    'attribute_not_exists': (lambda value: value is MISSING, 0),
+    'attribute_type': (lambda value, tag: type_tag(value) == tag, 1),
+    'begins_with': (_begins_with, 1),
+    'contains': (_contains, 1),
+}
+
+
+def _attribute(part, names):
+    if not isinstance(part, str) or not part.startswith('#'):
+        return part
+    if part not in names:
+        raise ExpressionError(f'ExpressionAttributeName não definido: {part}')
+    return names[part]
+
+
+class _Context:
+    __slots__ = ('item', 'names', 'values')
+
+    def __init__(self, item, names, values):
+        self.item = item
+        self.names = names or {}
+        self.values = values or {}
+
+    def resolve(self, path):
+        return tuple(_attribute(x, self.names) for x in path)
+
+    def get(self, path):
+        return get_path(self.item, self.resolve(path))
+
+    def value(self, token):
+        if token not in self.values:
+            raise ExpressionError(
+                f'ExpressionAttributeValue não definido: {token}')
+        return self.values[token]
+
+
+def _either(left, right):
+    return lambda ctx: left(ctx) or right(ctx)
+
+
+def _both(left, right):
+    return lambda ctx: left(ctx) and right(ctx)
+
+
+def _negate(condition):
+    return lambda ctx: not condition(ctx)
+
+
+class _Parser:
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = tokenize(expression)
+        self.position = 0
+
+    def error(self):
+        return ExpressionError(f'Expressão inválida: {self.expression}')
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def keyword(self):
+        token = self.peek()
+        return token.upper() if token else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise self.error()
+        self.position += 1
+        return token
+
+    def accept(self, *keywords):
+        return self.next() if self.keyword() in keywords else None
+
+    def expect(self, keyword):
+        if self.accept(keyword) is None:
+            raise self.error()
+
+    def done(self):
+        if self.peek() is not None:
+            raise self.error()
+
+    def name(self):
+        token = self.next()
+        if not _NAME.fullmatch(token):
+            raise self.error()
+        return token
+
+    def index(self):
+        token = self.next()
+        if not token.isdigit():
+            raise self.error()
+        self.expect(']')
+        return int(token)
+
+    def path(self):
+        parts = [self.name()]
+        while self.peek() in ('.', '['):
+            parts.append(self.name() if self.next() == '.' else self.index())
+        return tuple(parts)
+
+    def separated(self, parse):
+        items = [parse()]
+        while self.accept(','):
+            items.append(parse())
+        return items
+
+    # Conditions
+
+    def condition(self):
+        left = self.conjunction()
+        while self.accept('OR'):
+            left = _either(left, self.conjunction())
+        return left
+
+    def conjunction(self):
+        left = self.negation()
+        while self.accept('AND'):
+            left = _both(left, self.negation())
+        return left
+
+    def negation(self):
+        if self.accept('NOT'):
+            return _negate(self.negation())
+        if self.accept('('):
+            inner = self.condition()
+            self.expect(')')
+            return inner
+        if self.peek() in _PREDICATES:
+            return self.predicate()
+        return self.comparison(self.operand())
+
+    def predicate(self):
+        function, arity = _PREDICATES[self.next()]
+        self.expect('(')
+        path = self.path()
+        args = [self.operand() for _ in range(arity) if self.accept(',')]
+        if len(args) != arity:
+            raise self.error()
+        self.expect(')')
+        return lambda ctx: function(ctx.get(path), *[x(ctx) for x in args])
+
+    def comparison(self, left):
+        special = dict(BETWEEN=self.between, IN=self.is_in).get(
+            self.keyword())
+        if special is not None:
+            self.next()
+            return special(left)
+        comparator = _COMPARATORS.get(self.next())
+        if comparator is None:
+            raise self.error()
+        right = self.operand()
+        return lambda ctx: comparator(left(ctx), right(ctx))
+
+    def between(self, value):
+        low = self.operand()
+        self.expect('AND')
+        high = self.operand()
+        return lambda ctx: _between(value(ctx), low(ctx), high(ctx))
+
+    def is_in(self, value):
+        self.expect('(')
+        options = self.separated(self.operand)
+        self.expect(')')
+        return lambda ctx: _is_in(value(ctx), [x(ctx) for x in options])
+
+    def operand(self):
+        token = self.peek() or ''
+        if token.startswith(':'):
+            self.next()
+            return lambda ctx: ctx.value(token)
+        if token == _SIZE:
+            self.next()
+            self.expect('(')
+            path = self.path()
+            self.expect(')')
+            return lambda ctx: _size(ctx.get(path))
+        path = self.path()
+        return lambda ctx: ctx.get(path)
+
+    # Updates
+
+    def update(self):
+        actions = []
+        while self.peek() is not None:
+            clause = _CLAUSES.get(self.keyword())
+            if clause is None:
+                raise self.error()
+            self.next()
+            actions.extend(self.separated(getattr(self, clause)))
+        if not actions:
+            raise self.error()
+        return tuple(actions)
+
+    def set_action(self):
+        path = self.path()
+        self.expect('=')
+        value = self.update_value()
+        return lambda ctx: partial(_assign, ctx.resolve(path), value(ctx))
+
+    def remove_action(self):
+        path = self.path()
+        return lambda ctx: partial(_remove, ctx.resolve(path))
+
+    def add_action(self):
+        path = self.path()
+        value = self.operand()
+        return lambda ctx: partial(_assign, ctx.resolve(path),
+                                   _added(ctx.get(path), value(ctx)))
+
+    def delete_action(self):
+        path = self.path()
+        value = self.operand()
+        return lambda ctx: _deletion(ctx.resolve(path),
+                                     _deleted(ctx.get(path), value(ctx)))
+
+    def update_value(self):
+        left = self.update_operand()
+        sign = self.accept('+', '-')
+        if sign is None:
+            return left
+        right = self.update_operand()
+        return lambda ctx: _arithmetic(sign, left(ctx), right(ctx))
+
+    def update_operand(self):
+        function = _UPDATE_FUNCTIONS.get(self.peek())
+        if function is None:
+            return self.operand()
+        self.next()
+        self.expect('(')
+        # if_not_exists takes a path, which is also a valid operand.
+        first = self.update_operand()
+        self.expect(',')
+        second = self.update_operand()
+        self.expect(')')
+        return lambda ctx: function(first(ctx), second(ctx))
+
+
+_CLAUSES = {'SET': 'set_action', 'REMOVE': 'remove_action',
+            'ADD': 'add_action', 'DELETE': 'delete_action'}
+
+
+def _if_not_exists(value, default):
+    return default if value is MISSING else value
+
+
+def _list_append(first, second):
+    if not isinstance(first, list) or not isinstance(second, list):
+        raise ExpressionError('list_append requer duas listas')
+    return first + second
+
+
+_UPDATE_FUNCTIONS = {'if_not_exists': _if_not_exists,
+                     'list_append': _list_append}
+
+
+def _arithmetic(sign, left, right):
+    if type_tag(left) != 'N' or type_tag(right) != 'N':
+        raise ExpressionError('Operação aritmética requer números')
+    return left + right if sign == '+' else left - right
+
+
+def _added(current, value):
+    if current is MISSING:
+        return value
+    if type_tag(current) == 'N' and type_tag(value) == 'N':
+        return current + value
+    if type_tag(current) == type_tag(value) and isinstance(value, _SETS):
+        return current | value
+    raise ExpressionError('ADD requer um número ou um set do mesmo tipo')
+
+
+def _deleted(current, value):
+    if current is MISSING:
+        return MISSING
+    if type_tag(current) != type_tag(value) or \
+            not isinstance(value, _SETS):
+        raise ExpressionError('DELETE requer um set do mesmo tipo')
+    return current - value
+
+
+def _deletion(path, remaining):
+    if remaining is MISSING or not remaining:
+        return partial(_remove, path)
+    return partial(_assign, path, remaining)
+
+
+def _assign(path, value, item):
+    parent = get_path(item, path[:-1])
+    last = path[-1]
+    if isinstance(last, int) and isinstance(parent, list):
+        if last < len(parent):
+            parent[last] = value
+        else:
+            parent.append(value)
+    elif isinstance(last, str) and isinstance(parent, dict):
+        parent[last] = value
+    else:
+        raise ExpressionError(
+            'O caminho do documento é inválido para o update')
+
+
+def _remove(path, item):
+    parent = get_path(item, path[:-1])
+    last = path[-1]
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+    elif isinstance(parent, list) and last < len(parent):
+        del parent[last]
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expression):
+    parser = _Parser(expression)
+    condition = parser.condition()
+    parser.done()
+    return condition
+
+
+@lru_cache(maxsize=1024)
+def compile_projection(expression):
+    parser = _Parser(expression)
+    paths = parser.separated(parser.path)
+    parser.done()
+    return tuple(paths)
+
+
+@lru_cache(maxsize=1024)
+def compile_update(expression):
+    return _Parser(expression).update()
+
+
+def matches(expression, item, names=None, values=None):
+    """
+    Avalia uma ConditionExpression (ou FilterExpression e
+    KeyConditionExpression) em texto sobre um item.
+    :raises ExpressionError: se a expressão for inválida
+    """
+    return compile_condition(expression)(_Context(item, names, values))
+
+
+def _place(node, path, value):
+    for part in path[:-1]:
+        node = node.setdefault(part, {})
+    node[path[-1]] = value
+
+
+def _compact(node):
+    # Positions of projected lists are placed as int keys.
+    if not isinstance(node, dict):
+        return node
+    values = {k: _compact(v) for k, v in node.items()}
+    if values and all(isinstance(k, int) for k in values):
+        return [values[k] for k in sorted(values)]
+    return values
+
+
+def project(expression, item, names=None):
+    """
+    :return: Os atributos do item indicados pela ProjectionExpression
+    """
+    context = _Context(item, names, None)
+    projected = {}
+    for path in compile_projection(expression):
+        path = context.resolve(path)
+        value = get_path(item, path)
+        if value is not MISSING:
+            _place(projected, path, value)
+    return _compact(projected)
+
+
+def _check_overlaps(paths):
+    for i, path in enumerate(paths):
+        for other in paths[i + 1:]:
+            if path[:len(other)] == other[:len(path)]:
+                raise ExpressionError(f'Caminhos sobrepostos no update: '
+                                      f'{path} e {other}')
+
+
+def apply_update(expression, item, names=None, values=None):
+    """
+    Aplica uma UpdateExpression (SET, REMOVE, ADD e DELETE) ao item, que é
+    alterado no lugar. Todos os valores são calculados sobre o item
+    original, antes de qualquer alteração.
+    :raises ExpressionError: se a expressão for inválida
+    """
+    context = _Context(item, names, values)
+    changes = [action(context) for action in compile_update(expression)]
+    _check_overlaps([change.args[0] for change in changes])
+    for change in changes:
+        change(item)
+    return item
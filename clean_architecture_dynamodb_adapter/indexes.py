@@ -0,0 +1,323 @@
+from time import monotonic, sleep
+
+KEY_OPERATORS = ('eq', 'lt', 'lte', 'gt', 'gte', 'between', 'begins_with')
+BILLING_MODES = ('PROVISIONED', 'PAY_PER_REQUEST')
+
+
+class GlobalSecondaryIndex:
+    local = False
+
+    def __init__(self, name, hash_key, range_key=None, projection='ALL',
+                 non_key_attributes=(), hash_key_type='S',
+                 range_key_type='S', read_capacity=None,
+                 write_capacity=None):
+        """
+        Declaração de um GSI da tabela, criado junto com a tabela (ou por
+        reconcile_indexes()) e usado por filter() para trocar o scan por
+        um Query.
+        :param name: Nome do índice (IndexName)
+        :param hash_key: Atributo de partição do índice
+        :param range_key: Atributo de ordenação do índice, se houver
+        :param projection: 'ALL', 'KEYS_ONLY' ou 'INCLUDE'
+        :param non_key_attributes: Atributos projetados em 'INCLUDE'
+        :param hash_key_type: Tipo do atributo de partição ('S', 'N', 'B')
+        :param range_key_type: Tipo do atributo de ordenação
+        :param read_capacity: Capacidade de leitura no modo PROVISIONED;
+            None usa a da tabela
+        :param write_capacity: Capacidade de escrita no modo PROVISIONED
+        """
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.projection = projection
+        self.non_key_attributes = tuple(non_key_attributes)
+        self.hash_key_type = hash_key_type
+        self.range_key_type = range_key_type
+        self.read_capacity = read_capacity
+        self.write_capacity = write_capacity
+
+    @property
+    def key_attributes(self):
+        keys = ('entity_id', self.hash_key, self.range_key)
+        return tuple(dict.fromkeys(x for x in keys if x))
+
+    def covers(self, fields):
+        """
+        :param fields: Atributos lidos; None para o item inteiro
+        :return: Se uma leitura desses atributos pode usar o índice
+        """
+        if self.local or self.projection == 'ALL':
+            return True
+        projected = set(self.key_attributes) | set(self.non_key_attributes)
+        return fields is not None and set(fields) <= projected
+
+    def key_schema(self):
+        schema = [dict(AttributeName=self.hash_key, KeyType='HASH')]
+        if self.range_key:
+            schema.append(dict(AttributeName=self.range_key,
+                               KeyType='RANGE'))
+        return schema
+
+    def attribute_types(self):
+        types = {self.hash_key: self.hash_key_type}
+        if self.range_key:
+            types[self.range_key] = self.range_key_type
+        return types
+
+    def _projection_spec(self):
+        projection = dict(ProjectionType=self.projection)
+        if self.non_key_attributes:
+            projection.update(NonKeyAttributes=list(self.non_key_attributes))
+        return projection
+
+    def definition(self, throughput=None):
+        """
+        :param throughput: ProvisionedThroughput da tabela; None no modo
+            PAY_PER_REQUEST
+        :return: Definição do índice no formato de CreateTable/UpdateTable
+        """
+        definition = dict(IndexName=self.name,
+                          KeySchema=self.key_schema(),
+                          Projection=self._projection_spec())
+        if throughput is not None and not self.local:
+            definition.update(ProvisionedThroughput=dict(
+                ReadCapacityUnits=(self.read_capacity or
+                                   throughput['ReadCapacityUnits']),
+                WriteCapacityUnits=(self.write_capacity or
+                                    throughput['WriteCapacityUnits'])))
+        return definition
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.name!r})'
+
+
+class LocalSecondaryIndex(GlobalSecondaryIndex):
+    local = True
+
+    def __init__(self, name, range_key, projection='ALL',
+                 non_key_attributes=(), range_key_type='S'):
+        """
+        Declaração de um LSI: mesma partição da tabela (entity_id), com
+        outro atributo de ordenação. Atributos fora da projeção são
+        buscados na tabela pelo próprio DynamoDB. LSIs só podem ser
+        criados junto com a tabela.
+        """
+        super().__init__(name, 'entity_id', range_key, projection,
+                         non_key_attributes, range_key_type=range_key_type)
+
+
+TABLE_KEY = GlobalSecondaryIndex(None, 'entity_id')
+
+
+def attribute_definitions(indexes):
+    """
+    :return: AttributeDefinitions da chave da tabela e dos índices
+    :raises ValueError: se um atributo for declarado com tipos diferentes
+    """
+    types = TABLE_KEY.attribute_types()
+    for index in indexes:
+        for name, attribute_type in index.attribute_types().items():
+            if types.setdefault(name, attribute_type) != attribute_type:
+                raise ValueError(f'Tipos diferentes para o atributo {name}')
+    return [dict(AttributeName=name, AttributeType=attribute_type)
+            for name, attribute_type in types.items()]
+
+
+def table_definition(table_name, indexes, billing_mode, throughput):
+    """
+    :param billing_mode: 'PROVISIONED' ou 'PAY_PER_REQUEST'
+    :param throughput: ProvisionedThroughput usado no modo PROVISIONED
+    :return: Argumentos do CreateTable da tabela e dos seus índices
+    """
+    if billing_mode not in BILLING_MODES:
+        raise ValueError(f'billing_mode inválido: {billing_mode}')
+    if billing_mode != 'PROVISIONED':
+        throughput = None
+    definition = dict(TableName=table_name,
+                      KeySchema=TABLE_KEY.key_schema(),
+                      AttributeDefinitions=attribute_definitions(indexes),
+                      BillingMode=billing_mode)
+    if throughput is not None:
+        definition.update(ProvisionedThroughput=throughput)
+    definition.update(_index_definitions(indexes, throughput))
+    return definition
+
+
+def _index_definitions(indexes, throughput):
+    definitions = {}
+    for kind, local in (('GlobalSecondaryIndexes', False),
+                        ('LocalSecondaryIndexes', True)):
+        declared = [x.definition(throughput)
+                    for x in indexes if x.local == local]
+        if declared:
+            definitions[kind] = declared
+    return definitions
+
+
+def index_status(table_description, index_name):
+    for index in table_description.get('GlobalSecondaryIndexes', []):
+        if index['IndexName'] == index_name:
+            return index['IndexStatus']
+    return None
+
+
+def wait_for_index(client, table_name, index_name, poll_interval=5.0,
+                   timeout=None):
+    """
+    Espera um GSI (e a tabela) ficarem ACTIVE.
+    :param timeout: Tempo máximo de espera, em segundos; None espera
+        indefinidamente
+    :return: False se o tempo acabar antes
+    """
+    deadline = None if timeout is None else monotonic() + timeout
+    while True:
+        table = client.describe_table(TableName=table_name)['Table']
+        if table['TableStatus'] == 'ACTIVE' and \
+                index_status(table, index_name) == 'ACTIVE':
+            return True
+        if deadline is not None and monotonic() >= deadline:
+            return False
+        sleep(poll_interval)
+
+
+class QueryPlan:
+    def __init__(self, conditions, index=None, key_conditions=(),
+                 reason='', conjunctive=False, consumed=None):
+        """
+        Plano de execução de um filtro: um Query em index (None para a
+        própria tabela) ou, sem key_conditions, um scan.
+        :param conditions: Termos do filtro: condições (campo, operador,
+            argumentos) ou critérios compostos (Q)
+        :param key_conditions: Condições usadas no KeyConditionExpression
+        :param conjunctive: Se os termos são combinados com E
+        :param consumed: Termos de conditions substituídos pelas
+            key_conditions (default: as próprias key_conditions); os
+            demais vão para o FilterExpression
+        """
+        self.index = index
+        self.conjunctive = conjunctive
+        self.key_conditions = list(key_conditions)
+        consumed = self.key_conditions if consumed is None else consumed
+        self.filter_conditions = [
+            x for x in conditions if not any(x is key for key in consumed)]
+        self.reason = reason
+
+    @property
+    def is_query(self):
+        return bool(self.key_conditions)
+
+    @property
+    def index_name(self):
+        return self.index.name if self.index is not None else None
+
+    def describe(self):
+        return dict(
+            operation='Query' if self.is_query else 'Scan',
+            index_name=self.index_name,
+            key_conditions=list(map(_describe, self.key_conditions)),
+            filter_conditions=list(map(_describe, self.filter_conditions)),
+            reason=self.reason)
+
+
+def _describe(term):
+    if isinstance(term, tuple):
+        return f'{term[0]}__{term[1]}'
+    return repr(term)
+
+
+def _find(conditions, field, ops):
+    for condition in conditions:
+        if isinstance(condition, tuple) and condition[0] == field and \
+                condition[1] in ops:
+            return condition
+    return None
+
+
+def _attributes(terms):
+    """
+    :return: Atributos (de primeiro nível) usados pelos termos
+    """
+    result = set()
+    for term in terms:
+        if isinstance(term, tuple):
+            result.add(term[0].split('.')[0].split('[')[0])
+        else:
+            result |= _attributes(term.children)
+    return result
+
+
+def _needed_fields(conditions, fields):
+    # A filter on an attribute the index doesn't project would see it as
+    # missing, so the conditions' attributes must be covered too.
+    return None if fields is None else set(fields) | _attributes(conditions)
+
+
+def _range_condition(index, conditions):
+    """
+    :return: (condição na chave de ordenação, termos que ela substitui);
+        gte e lte no mesmo atributo viram um único between
+    """
+    condition = _find(conditions, index.range_key, KEY_OPERATORS)
+    if condition is None or condition[1] not in ('gte', 'lte'):
+        return condition, [condition] if condition else []
+    other = _find(conditions, index.range_key,
+                  ('lte',) if condition[1] == 'gte' else ('gte',))
+    if other is None:
+        return condition, [condition]
+    low, high = (condition, other) if condition[1] == 'gte' \
+        else (other, condition)
+    return (index.range_key, 'between', (low[2][0], high[2][0])), \
+        [condition, other]
+
+
+def _key_conditions(index, conditions):
+    """
+    :return: (condições do KeyConditionExpression, termos que elas
+        substituem); nada se o índice não puder ser usado. O
+        FilterExpression de um Query não pode usar a chave do índice, então
+        qualquer outro termo sobre ela descarta o índice.
+    """
+    hash_condition = _find(conditions, index.hash_key, ('eq',))
+    if hash_condition is None:
+        return [], []
+    others = [x for x in conditions if x is not hash_condition]
+    range_condition, consumed = _range_condition(index, others)
+    consumed = [hash_condition] + consumed
+    leftover = [x for x in conditions if not any(x is y for y in consumed)]
+    keys = {index.hash_key, index.range_key}
+    if _attributes(leftover) & keys:
+        return [], []
+    key_conditions = [x for x in (hash_condition, range_condition)
+                      if x is not None]
+    return key_conditions, consumed
+
+
+def plan_query(conditions, indexes=(), conjunctive=False, fields=None):
+    """
+    Escolhe entre um Query (na tabela ou em um dos índices) e um scan.
+    Um Query exige uma igualdade na chave de partição do índice e que as
+    demais condições possam ser aplicadas como filtro sobre o resultado,
+    ou seja, que as condições sejam combinadas com E (ou que haja só uma).
+    :param conditions: Termos do filtro (veja QueryPlan); só condições
+        simples podem ir para o KeyConditionExpression
+    :param indexes: Índices declarados (GlobalSecondaryIndex e
+        LocalSecondaryIndex); a chave da tabela é sempre considerada
+    :param conjunctive: Se as condições são combinadas com E
+    :param fields: Atributos lidos; None para o item inteiro. Os
+        atributos das condições também precisam estar no índice
+    :return: QueryPlan
+    """
+    if len(conditions) > 1 and not conjunctive:
+        return QueryPlan(conditions, reason='condições combinadas com OU')
+    best = QueryPlan(conditions, reason='nenhum índice atende às condições',
+                     conjunctive=conjunctive)
+    fields = _needed_fields(conditions, fields)
+    for index in (TABLE_KEY,) + tuple(indexes):
+        if not index.covers(fields):
+            continue
+        key_conditions, consumed = _key_conditions(index, conditions)
+        if len(key_conditions) > len(best.key_conditions):
+            best = QueryPlan(conditions, index, key_conditions,
+                             'igualdade na chave de partição', conjunctive,
+                             consumed)
+    return best
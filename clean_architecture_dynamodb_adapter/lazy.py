@@ -0,0 +1,72 @@
+class LazyEntity:
+    """
+    Proxy de uma entidade que guarda o item lido do DynamoDB e só chama
+    from_json (e set_adapter) no primeiro acesso a um atributo. Para
+    isinstance() e __class__ o proxy se passa pela classe adaptada; o
+    entity_id é lido direto do item, sem desserializar.
+    Erros de validação do from_json aparecem no primeiro acesso, não na
+    leitura da tabela.
+    """
+    __slots__ = ('_lazy_class', '_lazy_item', '_lazy_hydrate', '_lazy_entity')
+
+    def __init__(self, adapted_class, item, hydrate):
+        """
+        :param adapted_class: Classe da entidade representada
+        :param item: Item lido da tabela
+        :param hydrate: Função que cria a entidade a partir do item
+        """
+        object.__setattr__(self, '_lazy_class', adapted_class)
+        object.__setattr__(self, '_lazy_item', item)
+        object.__setattr__(self, '_lazy_hydrate', hydrate)
+        object.__setattr__(self, '_lazy_entity', None)
+
+    @property
+    def __class__(self):
+        return self._lazy_class
+
+    def _lazy_target(self):
+        # The item is read first: it is cleared only after the entity is set.
+        item = self._lazy_item
+        entity = self._lazy_entity
+        if entity is None:
+            entity = self._lazy_hydrate(item)
+            object.__setattr__(self, '_lazy_entity', entity)
+            object.__setattr__(self, '_lazy_item', None)
+        return entity
+
+    def __getattr__(self, name):
+        item = self._lazy_item
+        if name == 'entity_id' and item is not None and 'entity_id' in item:
+            return item['entity_id']
+        return getattr(self._lazy_target(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._lazy_target(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._lazy_target(), name)
+
+    def __dir__(self):
+        return dir(self._lazy_target())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyEntity):
+            other = other._lazy_target()
+        return self._lazy_target() == other
+
+    def __hash__(self):
+        return hash(self._lazy_target())
+
+    def __repr__(self):
+        return repr(self._lazy_target())
+
+    def __str__(self):
+        return str(self._lazy_target())
+
+
+def is_hydrated(obj):
+    """
+    :return: False se obj for um LazyEntity ainda não desserializado
+    """
+    return not isinstance(obj, LazyEntity) or \
+        object.__getattribute__(obj, '_lazy_entity') is not None
@@ -0,0 +1,44 @@
+import random
+from logging import DEBUG
+
+PAYLOAD_LIMIT = 512
+
+
+class Payload:
+    """
+    Dado incluído em uma mensagem de log (como argumento %s). Ele só é
+    convertido em texto se a mensagem for de fato emitida, e o texto é
+    truncado em limit caracteres.
+    """
+    __slots__ = ('data', 'limit')
+
+    def __init__(self, data, limit=PAYLOAD_LIMIT):
+        """
+        :param limit: Tamanho máximo do texto; None não trunca
+        """
+        self.data = data
+        self.limit = limit
+
+    def __str__(self):
+        text = str(self.data)
+        if self.limit is None or len(text) <= self.limit:
+            return text
+        return f'{text[:self.limit]}... ({len(text)} caracteres)'
+
+    __repr__ = __str__
+
+
+def debug_enabled(logger, sample_rate=1.0):
+    """
+    :param sample_rate: Fração das operações registradas
+    :return: Se a operação deve gerar mensagens de debug
+    """
+    return logger.isEnabledFor(DEBUG) and \
+        (sample_rate >= 1 or random.random() < sample_rate)  # noqa: S311
+
+
+def log_fields(operation, table, **fields):
+    """
+    :return: Campos estruturados da mensagem (argumento extra do logging)
+    """
+    return dict(extra=dict(operation=operation, table=table, **fields))
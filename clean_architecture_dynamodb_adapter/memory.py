@@ -0,0 +1,701 @@
+from threading import RLock
+from types import SimpleNamespace
+from zlib import crc32
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+# noinspection PyPackageRequirements
+from botocore.exceptions import ClientError, WaiterError
+
+from .connection_pool import ConnectionPool
+from .expressions import MISSING, ExpressionError, apply_update, matches, \
+    project, sort_key
+from .wire import compile_conditions, encode_item
+
+INDEX_KINDS = ('GlobalSecondaryIndexes', 'LocalSecondaryIndexes')
+CAPACITY_MODES = ('TOTAL', 'INDEXES')
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+
+_READ_OPTIONS = frozenset((
+    'IndexName', 'FilterExpression', 'ProjectionExpression',
+    'ExpressionAttributeNames', 'ExpressionAttributeValues', 'Limit',
+    'ExclusiveStartKey', 'Select', 'ConsistentRead',
+    'ReturnConsumedCapacity'))
+_SCAN_OPTIONS = _READ_OPTIONS | {'Segment', 'TotalSegments'}
+_QUERY_OPTIONS = _READ_OPTIONS | {'KeyConditionExpression',
+                                  'ScanIndexForward'}
+_PYTHON_FIELDS = ('Key', 'Item', 'ExclusiveStartKey',
+                  'ExpressionAttributeValues')
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+class _Failure(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _copy(item):
+    """
+    Cópia do item, convertida e validada como faria o boto3: números viram
+    Decimal e floats são recusados (TypeError).
+    """
+    return {k: _deserializer.deserialize(_serializer.serialize(v))
+            for k, v in item.items()}
+
+
+def _from_wire(item):
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+
+def _run(operation, func, *args, **kwargs):
+    """
+    Executa uma operação, convertendo as falhas em ClientError, como o
+    boto3.
+    """
+    try:
+        return func(*args, **kwargs)
+    except _Failure as e:
+        code, message = e.code, e.message
+    except ExpressionError as e:
+        code, message = 'ValidationException', str(e)
+    operation_name = ''.join(x.title() for x in operation.split('_'))
+    raise ClientError(dict(Error=dict(Code=code, Message=message)),
+                      operation_name)
+
+
+def _validation(message):
+    return _Failure('ValidationException', message)
+
+
+def _check_options(options, allowed):
+    unknown = set(options) - allowed
+    if unknown:
+        raise _validation(f'Parâmetros não suportados: {sorted(unknown)}')
+
+
+def _consumed(response, mode, table_name, units):
+    if mode in CAPACITY_MODES:
+        response['ConsumedCapacity'] = dict(TableName=table_name,
+                                            CapacityUnits=units)
+    return response
+
+
+def _read_units(items, consistent):
+    # Approximate: one unit per item read (half if eventually consistent).
+    return max(items, 1) * (1.0 if consistent else 0.5)
+
+
+def _changed(attributes, other):
+    return {k: v for k, v in attributes.items()
+            if other.get(k, MISSING) != v}
+
+
+_RETURN_VALUES = {
+    'ALL_OLD': lambda old, new: old,
+    'ALL_NEW': lambda old, new: new,
+    'UPDATED_OLD': _changed,
+    'UPDATED_NEW': lambda old, new: _changed(new, old),
+}
+
+
+def _returned(mode, old, new):
+    attributes = _RETURN_VALUES.get(mode, lambda *_: None)(old or {}, new)
+    return dict(Attributes=_copy(attributes)) if attributes else {}
+
+
+class _KeySchema:
+    def __init__(self, key_schema):
+        types = {x['KeyType']: x['AttributeName'] for x in key_schema}
+        self.hash_key = types['HASH']
+        self.attributes = tuple(
+            x for x in (self.hash_key, types.get('RANGE')) if x)
+
+    def has_keys(self, item):
+        return all(x in item for x in self.attributes)
+
+    def key(self, item):
+        return tuple(item.get(x) for x in self.attributes)
+
+
+class _Index:
+    def __init__(self, key_schema, table_key, projection=None, local=False):
+        """
+        Ordem e projeção dos itens lidos de um índice (ou da tabela).
+        """
+        self.key = _KeySchema(key_schema)
+        self.table_key = table_key or self.key
+        self.attributes = tuple(dict.fromkeys(self.key.attributes +
+                                              self.table_key.attributes))
+        projection = projection or dict(ProjectionType='ALL')
+        # Attributes outside an LSI projection are fetched from the table.
+        self.projected = None \
+            if local or projection['ProjectionType'] == 'ALL' \
+            else set(self.attributes) | set(
+                projection.get('NonKeyAttributes', ()))
+
+    def contains(self, item):
+        return self.key.has_keys(item)
+
+    def order(self, item):
+        return tuple(sort_key(item.get(x)) for x in self.attributes)
+
+    def last_key(self, item):
+        return {x: item[x] for x in self.attributes}
+
+    def project(self, item):
+        if self.projected is None:
+            return item
+        return {k: v for k, v in item.items() if k in self.projected}
+
+
+def _after(candidates, index, start_key, reverse):
+    if not start_key:
+        return candidates
+    start = index.order(start_key)
+    if reverse:
+        return [x for x in candidates if index.order(x) < start]
+    return [x for x in candidates if index.order(x) > start]
+
+
+def _segment_filter(options, index):
+    total = options.get('TotalSegments')
+    if not total:
+        return lambda item: True
+    segment = options.get('Segment', 0)
+    hash_key = index.table_key.hash_key
+    return lambda item: crc32(repr(sort_key(item[hash_key])).encode()) % \
+        total == segment
+
+
+class MemoryTable:
+    def __init__(self, definition):
+        """
+        Tabela em memória: itens, índices e as operações do DynamoDB sobre
+        valores já no formato do resource (Decimal, set, Binary). Segura
+        entre threads.
+        """
+        self.name = definition['TableName']
+        self.definition = dict(definition)
+        self.key = _KeySchema(definition['KeySchema'])
+        self.table_index = _Index(definition['KeySchema'], None)
+        self.indexes = {}
+        for kind, local in zip(INDEX_KINDS, (False, True)):
+            for index in definition.get(kind, []):
+                self._add_index(index, local)
+        self.items = {}
+        self.lock = RLock()
+
+    def _add_index(self, definition, local=False):
+        self.indexes[definition['IndexName']] = _Index(
+            definition['KeySchema'], self.key, definition.get('Projection'),
+            local)
+
+    def describe(self):
+        description = dict(self.definition, TableStatus='ACTIVE',
+                           ItemCount=len(self.items))
+        description['BillingModeSummary'] = dict(
+            BillingMode=description.pop('BillingMode', 'PROVISIONED'))
+        for kind in INDEX_KINDS:
+            if description.get(kind):
+                description[kind] = [dict(x, IndexStatus='ACTIVE')
+                                     for x in description[kind]]
+        return description
+
+    def _update_index(self, update):
+        if 'Create' in update:
+            definition = update['Create']
+            self.definition.setdefault('GlobalSecondaryIndexes', []).append(
+                definition)
+            self._add_index(definition)
+        if 'Delete' in update:
+            name = update['Delete']['IndexName']
+            self.indexes.pop(name, None)
+            self.definition['GlobalSecondaryIndexes'] = [
+                x for x in self.definition.get('GlobalSecondaryIndexes', [])
+                if x['IndexName'] != name]
+
+    def update(self, AttributeDefinitions=(), GlobalSecondaryIndexUpdates=(),
+               **settings):
+        with self.lock:
+            types = {x['AttributeName']: x for x in
+                     self.definition['AttributeDefinitions']}
+            types.update((x['AttributeName'], x)
+                         for x in AttributeDefinitions)
+            self.definition.update(settings,
+                                   AttributeDefinitions=list(types.values()))
+            for update in GlobalSecondaryIndexUpdates:
+                self._update_index(update)
+
+    def _key(self, key):
+        if set(key) != set(self.key.attributes):
+            raise _validation('The provided key element does not match the '
+                              'schema')
+        return self.key.key(key)
+
+    def _item_key(self, item):
+        if not self.key.has_keys(item):
+            raise _validation('One of the required keys was not given a '
+                              'value')
+        return self.key.key(item)
+
+    def _index(self, name):
+        if name is None:
+            return self.table_index
+        if name not in self.indexes:
+            raise _validation(f'The table does not have the specified '
+                              f'index: {name}')
+        return self.indexes[name]
+
+    @staticmethod
+    def _check(expression, item, names, values):
+        if expression and not matches(expression, item or {}, names, values):
+            raise _Failure('ConditionalCheckFailedException',
+                           'The conditional request failed')
+
+    @staticmethod
+    def _output(item, projection=None, names=None):
+        return _copy(project(projection, item, names) if projection
+                     else item)
+
+    def get_item(self, Key, ConsistentRead=False, ProjectionExpression=None,
+                 ExpressionAttributeNames=None, ReturnConsumedCapacity=None):
+        key = self._key(Key)
+        with self.lock:
+            item = self.items.get(key)
+        response = {} if item is None else dict(Item=self._output(
+            item, ProjectionExpression, ExpressionAttributeNames))
+        return _consumed(response, ReturnConsumedCapacity, self.name,
+                         _read_units(1, ConsistentRead))
+
+    def put_item(self, Item, ConditionExpression=None,
+                 ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, ReturnValues=None,
+                 ReturnConsumedCapacity=None):
+        key = self._item_key(Item)
+        with self.lock:
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, ExpressionAttributeNames,
+                        ExpressionAttributeValues)
+            self.items[key] = Item
+        return _consumed(_returned(ReturnValues, old, Item),
+                         ReturnConsumedCapacity, self.name, 1.0)
+
+    def delete_item(self, Key, ConditionExpression=None,
+                    ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues=None,
+                    ReturnConsumedCapacity=None):
+        key = self._key(Key)
+        with self.lock:
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, ExpressionAttributeNames,
+                        ExpressionAttributeValues)
+            self.items.pop(key, None)
+        return _consumed(_returned(ReturnValues, old, {}),
+                         ReturnConsumedCapacity, self.name, 1.0)
+
+    def _updated(self, key, old, Key, UpdateExpression, names, values):
+        item = _copy(old) if old else dict(Key)
+        if UpdateExpression:
+            apply_update(UpdateExpression, item, names, values)
+        if self.key.key(item) != key:
+            raise _validation('Cannot update attribute: this attribute is '
+                              'part of the key')
+        return item
+
+    def update_item(self, Key, UpdateExpression=None,
+                    ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues=None,
+                    ReturnConsumedCapacity=None):
+        key = self._key(Key)
+        with self.lock:
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, ExpressionAttributeNames,
+                        ExpressionAttributeValues)
+            item = self._updated(key, old, Key, UpdateExpression,
+                                 ExpressionAttributeNames,
+                                 ExpressionAttributeValues)
+            self.items[key] = item
+        return _consumed(_returned(ReturnValues, old, item),
+                         ReturnConsumedCapacity, self.name, 1.0)
+
+    def scan(self, **options):
+        _check_options(options, _SCAN_OPTIONS)
+        index = self._index(options.get('IndexName'))
+        in_segment = _segment_filter(options, index)
+        with self.lock:
+            candidates = [x for x in self.items.values()
+                          if index.contains(x) and in_segment(x)]
+        candidates.sort(key=index.order)
+        return self._read(index, candidates, options, False)
+
+    def query(self, **options):
+        _check_options(options, _QUERY_OPTIONS)
+        if not options.get('KeyConditionExpression'):
+            raise _validation('KeyConditionExpression é obrigatório')
+        index = self._index(options.get('IndexName'))
+        key_condition = options['KeyConditionExpression']
+        names = options.get('ExpressionAttributeNames')
+        values = options.get('ExpressionAttributeValues')
+        with self.lock:
+            candidates = [x for x in self.items.values()
+                          if index.contains(x) and
+                          matches(key_condition, x, names, values)]
+        reverse = not options.get('ScanIndexForward', True)
+        candidates.sort(key=index.order, reverse=reverse)
+        return self._read(index, candidates, options, reverse)
+
+    @staticmethod
+    def _page(index, candidates, options, reverse):
+        candidates = _after(candidates, index,
+                            options.get('ExclusiveStartKey'), reverse)
+        limit = options.get('Limit')
+        if limit is None or len(candidates) <= limit:
+            return candidates, {}
+        if limit < 1:
+            raise _validation('Limit deve ser maior que zero')
+        page = candidates[:limit]
+        return page, dict(LastEvaluatedKey=_copy(index.last_key(page[-1])))
+
+    def _read(self, index, candidates, options, reverse):
+        page, response = self._page(index, candidates, options, reverse)
+        names = options.get('ExpressionAttributeNames')
+        expression = options.get('FilterExpression')
+        found = [x for x in page if not expression or
+                 matches(expression, x, names,
+                         options.get('ExpressionAttributeValues'))]
+        response.update(Count=len(found), ScannedCount=len(page))
+        if options.get('Select') != 'COUNT':
+            projection = options.get('ProjectionExpression')
+            response['Items'] = [
+                self._output(index.project(x), projection, names)
+                for x in found]
+        return _consumed(response, options.get('ReturnConsumedCapacity'),
+                         self.name, _read_units(len(page),
+                                                options.get('ConsistentRead')))
+
+    def batch_get(self, Keys, ProjectionExpression=None,
+                  ExpressionAttributeNames=None, ConsistentRead=False):
+        keys = [self._key(_copy(x)) for x in Keys]
+        if len(set(keys)) < len(keys):
+            raise _validation('Provided list of item keys contains '
+                              'duplicates')
+        with self.lock:
+            found = [self.items[x] for x in keys if x in self.items]
+        return [self._output(x, ProjectionExpression,
+                             ExpressionAttributeNames) for x in found]
+
+    def _write_key(self, request):
+        if 'PutRequest' in request:
+            return self._item_key(request['PutRequest']['Item'])
+        return self._key(request['DeleteRequest']['Key'])
+
+    def batch_write(self, requests):
+        keys = [self._write_key(x) for x in requests]
+        if len(set(keys)) < len(keys):
+            raise _validation('Provided list of item keys contains '
+                              'duplicates')
+        for request in requests:
+            if 'PutRequest' in request:
+                self.put_item(Item=_copy(request['PutRequest']['Item']))
+            else:
+                self.delete_item(Key=_copy(request['DeleteRequest']['Key']))
+
+
+class MemoryDatabase:
+    def __init__(self):
+        """
+        Conjunto de tabelas em memória, com as operações do DynamoDB no
+        formato do resource do boto3.
+        """
+        self._tables = {}
+        self._lock = RLock()
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def _table(self, name):
+        with self._lock:
+            table = self._tables.get(name)
+        if table is None:
+            raise _Failure('ResourceNotFoundException',
+                           f'Requested resource not found: Table: {name} '
+                           f'not found')
+        return table
+
+    def _create_table(self, definition):
+        with self._lock:
+            if definition['TableName'] in self._tables:
+                raise _Failure('ResourceInUseException',
+                               f'Table already exists: '
+                               f'{definition["TableName"]}')
+            table = self._tables[definition['TableName']] = \
+                MemoryTable(definition)
+        return table.describe()
+
+    def create_table(self, definition):
+        return _run('create_table', self._create_table, definition)
+
+    def describe_table(self, name):
+        return _run('describe_table', lambda: self._table(name).describe())
+
+    def _update_table(self, name, kwargs):
+        table = self._table(name)
+        table.update(**kwargs)
+        return table.describe()
+
+    def update_table(self, name, kwargs):
+        return _run('update_table', self._update_table, name, kwargs)
+
+    def _delete_table(self, name):
+        description = self._table(name).describe()
+        with self._lock:
+            self._tables.pop(name, None)
+        return description
+
+    def delete_table(self, name):
+        return _run('delete_table', self._delete_table, name)
+
+    def table_names(self):
+        with self._lock:
+            return sorted(self._tables)
+
+    @staticmethod
+    def _prepare(kwargs):
+        kwargs = dict(kwargs)
+        compile_conditions(kwargs, encode=_copy)
+        for field in _PYTHON_FIELDS:
+            if field in kwargs:
+                kwargs[field] = _copy(kwargs[field])
+        return kwargs
+
+    def _table_operation(self, name, operation, kwargs):
+        table = self._table(name)
+        return getattr(table, operation)(**self._prepare(kwargs))
+
+    def table_operation(self, name, operation, kwargs):
+        """
+        Executa uma operação (get_item, put_item, update_item,
+        delete_item, scan ou query) em uma tabela.
+        :raises ClientError: com o mesmo código de erro do DynamoDB
+        """
+        return _run(operation, self._table_operation, name, operation,
+                    kwargs)
+
+    def _batch_get_item(self, RequestItems, ReturnConsumedCapacity=None):
+        if sum(len(x['Keys']) for x in RequestItems.values()) > \
+                BATCH_GET_LIMIT:
+            raise _validation('Too many items requested for the '
+                              'BatchGetItem call')
+        responses = {name: self._table(name).batch_get(**request)
+                     for name, request in RequestItems.items()}
+        response = dict(Responses=responses, UnprocessedKeys={})
+        if ReturnConsumedCapacity in CAPACITY_MODES:
+            response['ConsumedCapacity'] = [
+                dict(TableName=name, CapacityUnits=_read_units(
+                    len(request['Keys']), request.get('ConsistentRead')))
+                for name, request in RequestItems.items()]
+        return response
+
+    def batch_get_item(self, **kwargs):
+        return _run('batch_get_item', self._batch_get_item, **kwargs)
+
+    def _batch_write_item(self, RequestItems, ReturnConsumedCapacity=None):
+        if sum(map(len, RequestItems.values())) > BATCH_WRITE_LIMIT:
+            raise _validation('Too many items requested for the '
+                              'BatchWriteItem call')
+        for name, requests in RequestItems.items():
+            self._table(name).batch_write(requests)
+        response = dict(UnprocessedItems={})
+        if ReturnConsumedCapacity in CAPACITY_MODES:
+            response['ConsumedCapacity'] = [
+                dict(TableName=name, CapacityUnits=float(len(requests)))
+                for name, requests in RequestItems.items()]
+        return response
+
+    def batch_write_item(self, **kwargs):
+        return _run('batch_write_item', self._batch_write_item, **kwargs)
+
+
+def _operation(operation, call):
+    call.__name__ = operation
+    return call
+
+
+def _table_operation(operation):
+    return _operation(operation, lambda self, **kwargs:
+                      self._database.table_operation(self.name, operation,
+                                                     kwargs))
+
+
+class MemoryTableResource:
+    def __init__(self, database, name, client):
+        """
+        Equivalente em memória do Table do resource do boto3.
+        """
+        self._database = database
+        self.name = self.table_name = name
+        self.meta = SimpleNamespace(client=client)
+
+    get_item = _table_operation('get_item')
+    put_item = _table_operation('put_item')
+    update_item = _table_operation('update_item')
+    delete_item = _table_operation('delete_item')
+    scan = _table_operation('scan')
+    query = _table_operation('query')
+
+
+def _decode_batch_get(request_items):
+    return {name: dict(request, Keys=[_from_wire(x) for x in request['Keys']])
+            for name, request in request_items.items()}
+
+
+def _decode_write_request(request):
+    if 'PutRequest' in request:
+        return dict(PutRequest=dict(
+            Item=_from_wire(request['PutRequest']['Item'])))
+    return dict(DeleteRequest=dict(
+        Key=_from_wire(request['DeleteRequest']['Key'])))
+
+
+def _decode_request(kwargs):
+    return {k: _from_wire(v) if k in _PYTHON_FIELDS else v
+            for k, v in kwargs.items()}
+
+
+def _encode_response(response):
+    for field in ('Item', 'Attributes', 'LastEvaluatedKey'):
+        if field in response:
+            response[field] = encode_item(response[field])
+    if 'Items' in response:
+        response['Items'] = [encode_item(x) for x in response['Items']]
+    if 'Responses' in response:
+        response['Responses'] = {k: [encode_item(x) for x in v]
+                                 for k, v in response['Responses'].items()}
+    return response
+
+
+def _client_operation(operation):
+    return _operation(operation, lambda self, TableName, **kwargs:
+                      _encode_response(self._database.table_operation(
+                          TableName, operation, _decode_request(kwargs))))
+
+
+class _Waiter:
+    def __init__(self, database, name):
+        if name not in ('table_exists', 'table_not_exists'):
+            raise ValueError(f'Waiter não suportado: {name}')
+        self._database = database
+        self._name = name
+
+    def wait(self, TableName, **kwargs):
+        exists = TableName in self._database.table_names()
+        if exists != (self._name == 'table_exists'):
+            raise WaiterError(self._name, 'Max attempts exceeded', {})
+
+
+class MemoryClient:
+    def __init__(self, database):
+        """
+        Equivalente em memória do client de DynamoDB do boto3, com os
+        valores no formato do DynamoDB ({'S': ...}, {'N': ...}, ...).
+        """
+        self._database = database
+
+    get_item = _client_operation('get_item')
+    put_item = _client_operation('put_item')
+    update_item = _client_operation('update_item')
+    delete_item = _client_operation('delete_item')
+    scan = _client_operation('scan')
+    query = _client_operation('query')
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        return _encode_response(self._database.batch_get_item(
+            RequestItems=_decode_batch_get(RequestItems), **kwargs))
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        return self._database.batch_write_item(
+            RequestItems={name: list(map(_decode_write_request, requests))
+                          for name, requests in RequestItems.items()},
+            **kwargs)
+
+    def create_table(self, **definition):
+        return dict(TableDescription=self._database.create_table(definition))
+
+    def describe_table(self, TableName):
+        return dict(Table=self._database.describe_table(TableName))
+
+    def update_table(self, TableName, **kwargs):
+        return dict(TableDescription=self._database.update_table(TableName,
+                                                                 kwargs))
+
+    def delete_table(self, TableName):
+        return dict(TableDescription=self._database.delete_table(TableName))
+
+    def list_tables(self, **kwargs):
+        return dict(TableNames=self._database.table_names())
+
+    def get_waiter(self, name):
+        return _Waiter(self._database, name)
+
+
+class MemoryResource:
+    def __init__(self, database):
+        """
+        Equivalente em memória do resource de DynamoDB do boto3.
+        """
+        self._database = database
+        self.meta = SimpleNamespace(client=MemoryClient(database))
+
+    def Table(self, name):  # noqa: N802
+        return MemoryTableResource(self._database, name, self.meta.client)
+
+    def create_table(self, **definition):
+        self._database.create_table(definition)
+        return self.Table(definition['TableName'])
+
+    def batch_get_item(self, **kwargs):
+        return self._database.batch_get_item(**kwargs)
+
+    def batch_write_item(self, **kwargs):
+        return self._database.batch_write_item(**kwargs)
+
+
+class InMemoryBackend(ConnectionPool):
+    def __init__(self):
+        """
+        Backend em memória compatível com o DynamoDB, para testes e
+        pipelines locais, usado no lugar do ConnectionPool:
+            adapter = MyAdapter(..., connection_pool=InMemoryBackend())
+        Suporta get/put/update/delete (com ConditionExpression e
+        ReturnValues), BatchGetItem e BatchWriteItem, scans e Querys (em
+        índices também) com FilterExpression, ProjectionExpression, Limit,
+        ExclusiveStartKey e segmentos, além de CreateTable, DescribeTable e
+        UpdateTable. Os erros são ClientError com os códigos do DynamoDB.
+        Todos os endpoints e regiões compartilham as mesmas tabelas. A
+        capacidade consumida informada é aproximada (uma unidade por item).
+        """
+        super().__init__()
+        self.database = MemoryDatabase()
+        self._memory_resource = MemoryResource(self.database)
+
+    def _check_fork(self):
+        # A forked process keeps its own copy of the tables.
+        pass
+
+    def clear(self):
+        """
+        Descarta as tabelas, além dos registros do pool.
+        """
+        super().clear()
+        self.database.clear()
+
+    def resource(self, endpoint_url=None, region_name=None):
+        return self._memory_resource
+
+    def client(self, endpoint_url=None, region_name=None):
+        return self._memory_resource.meta.client
@@ -0,0 +1,233 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from threading import Lock
+
+from .rate_limiter import consumed_units
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+READ_OPERATIONS = frozenset(('get_item', 'batch_get_item', 'scan', 'query'))
+PAGED_OPERATIONS = frozenset(('scan', 'query'))
+
+CallMetrics = namedtuple('CallMetrics', (
+    'operation', 'table', 'latency', 'read_units', 'write_units', 'items',
+    'scanned', 'retries', 'error'))
+
+
+def _item_count(response):
+    if 'Items' in response:
+        return len(response['Items'])
+    if 'Responses' in response:
+        return sum(map(len, response['Responses'].values()))
+    if response.get('Item') is not None:
+        return 1
+    return response.get('Count', 0)
+
+
+def call_metrics(operation, table, latency, response=None, retries=0,
+                 error=None):
+    """
+    Monta as métricas de uma chamada ao DynamoDB.
+    :param operation: Nome da operação (ex.: 'scan', 'put_item')
+    :param latency: Duração da chamada, em segundos, com as novas tentativas
+    :param response: Resposta do DynamoDB; None se a chamada falhou
+    :param retries: Número de novas tentativas
+    :param error: Código do erro, se a chamada falhou
+    :return: CallMetrics
+    """
+    response = response or {}
+    units = consumed_units(response)
+    read = operation in READ_OPERATIONS
+    return CallMetrics(operation, table, latency,
+                       units if read else 0, 0 if read else units,
+                       _item_count(response),
+                       response.get('ScannedCount', 0), retries, error)
+
+
+class MetricsHook(ABC):
+    """
+    Destino das métricas do adapter: recebe um CallMetrics por chamada ao
+    DynamoDB. record() é chamado na thread da chamada e deve ser rápido.
+    """
+
+    @abstractmethod
+    def record(self, metrics):
+        """
+        :param metrics: CallMetrics de uma chamada
+        """
+
+
+class CompositeHook(MetricsHook):
+    def __init__(self, *hooks):
+        """
+        Repassa as métricas para vários destinos (ex.: coletor em memória e
+        StatsD).
+        """
+        self.hooks = hooks
+
+    def record(self, metrics):
+        for hook in self.hooks:
+            hook.record(metrics)
+
+
+class OperationStats:
+    __slots__ = ('calls', 'errors', 'retries', 'pages', 'read_units',
+                 'write_units', 'items', 'scanned', 'latency_sum',
+                 'latency_buckets')
+
+    def __init__(self, bucket_count):
+        self.calls = self.errors = self.retries = self.pages = 0
+        self.read_units = self.write_units = 0.0
+        self.items = self.scanned = 0
+        self.latency_sum = 0.0
+        # The last bucket counts the calls above the highest bound.
+        self.latency_buckets = [0] * (bucket_count + 1)
+
+    def add(self, metrics, bucket):
+        self.calls += 1
+        self.errors += metrics.error is not None
+        self.retries += metrics.retries
+        self.pages += metrics.operation in PAGED_OPERATIONS
+        self.read_units += metrics.read_units
+        self.write_units += metrics.write_units
+        self.items += metrics.items
+        self.scanned += metrics.scanned
+        self.latency_sum += metrics.latency
+        self.latency_buckets[bucket] += 1
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__
+                if name != 'latency_buckets'}
+
+
+class InMemoryCollector(MetricsHook):
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Agrega as métricas em memória por (operação, tabela), de forma
+        segura entre threads: chamadas, erros, novas tentativas, páginas
+        (scan e query), capacidade consumida, itens devolvidos, itens
+        lidos pelos scans e um histograma das latências.
+        :param buckets: Limites superiores, em segundos e em ordem
+            crescente, das faixas do histograma de latência
+        """
+        self.buckets = tuple(buckets)
+        self._lock = Lock()
+        self._stats = {}
+
+    def _bucket(self, latency):
+        for i, bound in enumerate(self.buckets):
+            if latency <= bound:
+                return i
+        return len(self.buckets)
+
+    def record(self, metrics):
+        bucket = self._bucket(metrics.latency)
+        key = (metrics.operation, metrics.table)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats(len(self.buckets))
+            stats.add(metrics, bucket)
+
+    def snapshot(self):
+        """
+        :return: {(operação, tabela): métricas}; em 'latency_buckets', a
+            contagem acumulada de chamadas até cada limite (a última chave,
+            float('inf'), tem o total)
+        """
+        with self._lock:
+            return {key: self._describe(stats)
+                    for key, stats in self._stats.items()}
+
+    def _describe(self, stats):
+        described = stats.as_dict()
+        cumulative = 0
+        buckets = {}
+        for bound, calls in zip(self.buckets + (float('inf'),),
+                                stats.latency_buckets):
+            cumulative += calls
+            buckets[bound] = cumulative
+        described.update(latency_buckets=buckets)
+        return described
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+_COUNTERS = (('calls', 'calls_total'),
+             ('errors', 'errors_total'),
+             ('retries', 'retries_total'),
+             ('pages', 'pages_total'),
+             ('read_units', 'consumed_read_units_total'),
+             ('write_units', 'consumed_write_units_total'),
+             ('items', 'items_total'),
+             ('scanned', 'scanned_items_total'))
+
+
+def _labels(operation, table, **extra):
+    labels = dict(operation=operation, table=table, **extra)
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"')
+               for v in labels.values())
+    return ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped))
+
+
+def _bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class PrometheusExporter:
+    def __init__(self, collector, prefix='dynamodb_adapter'):
+        """
+        Exporta um InMemoryCollector no formato texto do Prometheus, para
+        ser servido no endpoint /metrics da aplicação.
+        :param prefix: Prefixo do nome das métricas
+        """
+        self.collector = collector
+        self.prefix = prefix
+
+    def render(self):
+        snapshot = sorted(self.collector.snapshot().items())
+        lines = []
+        for field, name in _COUNTERS:
+            lines.append(f'# TYPE {self.prefix}_{name} counter')
+            lines.extend(f'{self.prefix}_{name}{{{_labels(*key)}}} '
+                         f'{stats[field]}' for key, stats in snapshot)
+        lines.extend(self._histogram(snapshot))
+        return '\n'.join(lines) + '\n'
+
+    def _histogram(self, snapshot):
+        name = f'{self.prefix}_latency_seconds'
+        yield f'# TYPE {name} histogram'
+        for key, stats in snapshot:
+            for bound, calls in stats['latency_buckets'].items():
+                yield (f'{name}_bucket{{{_labels(*key, le=_bound(bound))}}} '
+                       f'{calls}')
+            yield f'{name}_sum{{{_labels(*key)}}} {stats["latency_sum"]}'
+            yield f'{name}_count{{{_labels(*key)}}} {stats["calls"]}'
+
+
+class StatsdExporter(MetricsHook):
+    def __init__(self, send, prefix='dynamodb_adapter'):
+        """
+        Envia cada chamada como métricas StatsD
+        (<prefix>.<tabela>.<operação>.<métrica>).
+        :param send: Função que recebe cada linha (ex.: o envio por UDP do
+            cliente StatsD da aplicação)
+        :param prefix: Prefixo do nome das métricas
+        """
+        self.send = send
+        self.prefix = prefix
+
+    def record(self, metrics):
+        table = metrics.table.replace('.', '_')
+        name = f'{self.prefix}.{table}.{metrics.operation}'
+        self.send(f'{name}.latency:{metrics.latency * 1000:.3f}|ms')
+        self.send(f'{name}.calls:1|c')
+        for field in ('read_units', 'write_units', 'items', 'scanned',
+                      'retries'):
+            value = getattr(metrics, field)
+            if value:
+                self.send(f'{name}.{field}:{value}|c')
+        if metrics.error is not None:
+            self.send(f'{name}.errors:1|c')
@@ -0,0 +1,88 @@
+class ScanIterator:
+    def __init__(self, scan, scan_kwargs=None, transform=None,
+                 page_size=None, max_items=None, start_key=None,
+                 key_attributes=('entity_id',)):
+        """
+        Iterador preguiçoso sobre os itens de um scan, que segue o
+        LastEvaluatedKey página por página sem acumular os resultados.
+        :param scan: Callable que executa uma página (ex.: table.scan)
+        :param scan_kwargs: Argumentos repassados a cada página
+        :param transform: Função aplicada a cada item antes de entregá-lo
+        :param page_size: Limite de itens avaliados por página (Limit)
+        :param max_items: Número máximo de itens entregues
+        :param start_key: ExclusiveStartKey para retomar um scan
+        :param key_attributes: Atributos que compõem a chave de um item
+        """
+        self._scan = scan
+        self._scan_kwargs = dict(scan_kwargs or {})
+        self._transform = transform
+        self._page_size = page_size
+        self._max_items = max_items
+        self._start_key = start_key
+        self._key_attributes = key_attributes
+        self.last_evaluated_key = start_key
+
+    def _page_kwargs(self, start_key):
+        kwargs = dict(self._scan_kwargs)
+        if self._page_size:
+            kwargs.update(Limit=self._page_size)
+        if start_key:
+            kwargs.update(ExclusiveStartKey=start_key)
+        return kwargs
+
+    def pages(self):
+        """
+        Gera as respostas cruas de cada página do scan. last_evaluated_key
+        avança quando a página seguinte é pedida; ao final fica None se a
+        tabela foi percorrida inteira.
+        """
+        start_key = self._start_key
+        while True:
+            response = self._scan(**self._page_kwargs(start_key))
+            yield response
+            start_key = response.get('LastEvaluatedKey')
+            self.last_evaluated_key = start_key
+            if not start_key:
+                return
+
+    def _remaining(self, delivered):
+        if self._max_items is None:
+            return None
+        return self._max_items - delivered
+
+    def _resume_after(self, item):
+        # Without the key attributes (e.g. a projection that leaves them
+        # out) the resume key stays at the start of the page, which is then
+        # read again instead of being skipped.
+        if all(k in item for k in self._key_attributes):
+            self.last_evaluated_key = {k: item[k]
+                                       for k in self._key_attributes}
+
+    def _page_items(self, response, remaining):
+        """
+        Entrega os itens de uma página, no máximo remaining (None para
+        todos), mantendo last_evaluated_key logo depois do último item
+        entregue: quem parar no meio da página retoma dali.
+        """
+        items = response['Items']
+        if remaining is not None:
+            items = items[:remaining]
+        for item in items:
+            result = item if self._transform is None else \
+                self._transform(item)
+            self._resume_after(item)
+            yield result
+        if len(items) == len(response['Items']):
+            self.last_evaluated_key = response.get('LastEvaluatedKey')
+
+    def __iter__(self):
+        if self._max_items == 0:
+            return
+        delivered = 0
+        for response in self.pages():
+            for item in self._page_items(response,
+                                         self._remaining(delivered)):
+                delivered += 1
+                yield item
+            if delivered == self._max_items:
+                return
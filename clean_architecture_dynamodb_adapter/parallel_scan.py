@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+from threading import Event
+
+from .pagination import ScanIterator
+
+_PAGE = 'page'
+_DONE = 'done'
+_ERROR = 'error'
+
+
+class ParallelScanIterator:
+    def __init__(self, scan, total_segments, scan_kwargs=None,
+                 transform=None, page_size=None, max_items=None,
+                 max_workers=None, ordered=False, executor=None,
+                 buffer_pages=2):
+        """
+        Iterador sobre um scan paralelo (Segment/TotalSegments). Cada
+        segmento roda em uma thread do pool e as páginas são unidas em um
+        único iterador, em ordem de segmento (ordered=True) ou de chegada.
+        :param scan: Callable que executa uma página (ex.: table.scan)
+        :param total_segments: Número de segmentos do scan
+        :param scan_kwargs: Argumentos repassados a cada página
+        :param transform: Função aplicada a cada item antes de entregá-lo
+        :param page_size: Limite de itens avaliados por página (Limit)
+        :param max_items: Número máximo de itens entregues
+        :param max_workers: Threads do pool criado pelo iterador
+        :param ordered: Entrega os segmentos em ordem (0, 1, ...)
+        :param executor: Pool externo; se informado, max_workers é ignorado
+        :param buffer_pages: Páginas em espera por fila antes de bloquear
+        """
+        if total_segments < 1:
+            raise ValueError('total_segments deve ser maior que zero.')
+        self._scan = scan
+        self._total_segments = total_segments
+        self._scan_kwargs = dict(scan_kwargs or {})
+        self._transform = transform
+        self._page_size = page_size
+        self._max_items = max_items
+        self._max_workers = max_workers or total_segments
+        self._ordered = ordered
+        self._executor = executor
+        self._buffer_pages = buffer_pages
+        self.last_evaluated_key = None
+
+    def _queues(self):
+        if self._ordered:
+            return [Queue(self._buffer_pages)
+                    for _ in range(self._total_segments)]
+        shared = Queue(self._buffer_pages * self._total_segments)
+        return [shared] * self._total_segments
+
+    @staticmethod
+    def _put(queue, message, stop):
+        while not stop.is_set():
+            try:
+                queue.put(message, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def _scan_segment(self, segment, queue, stop):
+        scan_kwargs = dict(self._scan_kwargs,
+                           Segment=segment,
+                           TotalSegments=self._total_segments)
+        pages = ScanIterator(self._scan, scan_kwargs,
+                             page_size=self._page_size).pages()
+        try:
+            for response in pages:
+                if stop.is_set():
+                    return
+                self._put(queue, (_PAGE, response['Items']), stop)
+        except BaseException as e:
+            self._put(queue, (_ERROR, e), stop)
+            return
+        self._put(queue, (_DONE, None), stop)
+
+    def _submit_all(self, executor, queues, stop):
+        return [executor.submit(self._scan_segment, segment, queue, stop)
+                for segment, queue in enumerate(queues)]
+
+    def __iter__(self):
+        executor = self._executor or ThreadPoolExecutor(self._max_workers)
+        stop = Event()
+        queues = self._queues()
+        futures = self._submit_all(executor, queues, stop)
+        try:
+            yield from self._limited(self._merge(queues))
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            if self._executor is None:
+                executor.shutdown(wait=False)
+
+    def _merge(self, queues):
+        if self._ordered:
+            for queue in queues:
+                yield from self._drain(queue, 1)
+        else:
+            yield from self._drain(queues[0], self._total_segments)
+
+    @staticmethod
+    def _drain(queue, producers):
+        done = 0
+        while done < producers:
+            kind, payload = queue.get()
+            if kind == _ERROR:
+                raise payload
+            if kind == _DONE:
+                done += 1
+            else:
+                yield from payload
+
+    def _limited(self, items):
+        if self._max_items == 0:
+            return
+        delivered = 0
+        for item in items:
+            yield item if self._transform is None else self._transform(item)
+            delivered += 1
+            if delivered == self._max_items:
+                return
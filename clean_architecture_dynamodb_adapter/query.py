@@ -0,0 +1,156 @@
+from functools import lru_cache
+from itertools import count
+
+FILTER_MODES = ('or', 'and')
+
+_COMPARISONS = {'eq': '=', 'ne': '<>', 'lt': '<', 'lte': '<=', 'gt': '>',
+                'gte': '>='}
+
+
+def _comparison(sign):
+    return lambda name, values: f'{name} {sign} {values[0]}'
+
+
+_TEMPLATES = dict(
+    {op: _comparison(sign) for op, sign in _COMPARISONS.items()},
+    between=lambda name, values: (f'{name} BETWEEN {values[0]} '
+                                  f'AND {values[1]}'),
+    begins_with=lambda name, values: f'begins_with({name}, {values[0]})',
+    contains=lambda name, values: f'contains({name}, {values[0]})',
+    exists=lambda name, values: f'attribute_exists({name})',
+    not_exists=lambda name, values: f'attribute_not_exists({name})',
+    is_in=lambda name, values: f'{name} IN ({", ".join(values)})',
+)
+
+
+class Q:
+    def __init__(self, *children, **conditions):
+        """
+        Critério de filtro que pode ser combinado com & (E), | (OU) e
+        ~ (NÃO), gerando um único FilterExpression:
+            adapter.filter(Q(email__eq=email) & ~Q(status__eq='inativo'))
+        Os critérios de um mesmo Q usam a sintaxe de filter() e são
+        combinados com E.
+        :param children: Outros Q, combinados com E
+        """
+        self.connector = 'AND'
+        self.negated = False
+        self.children = list(children) + list(conditions.items())
+
+    @classmethod
+    def _node(cls, connector, children, negated=False):
+        node = cls(*children)
+        node.connector = connector
+        node.negated = negated
+        return node
+
+    def _combine(self, other, connector):
+        if not isinstance(other, Q):
+            return NotImplemented
+        return self._node(connector, [self, other])
+
+    def __and__(self, other):
+        return self._combine(other, 'AND')
+
+    def __or__(self, other):
+        return self._combine(other, 'OR')
+
+    def __invert__(self):
+        return self._node(self.connector, self.children, not self.negated)
+
+    def resolve(self, parse):
+        """
+        :param parse: Função (chave, valor) -> (campo, operador, argumentos)
+        :return: Cópia do Q com as condições já interpretadas
+        """
+        return self._node(self.connector,
+                          [x.resolve(parse) if isinstance(x, Q)
+                           else parse(*x) for x in self.children],
+                          self.negated)
+
+    def conjuncts(self):
+        """
+        :return: Termos que, combinados com E, equivalem a este Q (em um Q
+            já interpretado por resolve())
+        """
+        if self.connector != 'AND' or self.negated:
+            return [self]
+        return [term for child in self.children
+                for term in (child.conjuncts() if isinstance(child, Q)
+                             else [child])]
+
+    def __repr__(self):
+        children = f' {self.connector} '.join(map(repr, self.children))
+        return f'~Q({children})' if self.negated else f'Q({children})'
+
+
+def _flatten(term):
+    """
+    Separa um termo em formato (hashable, sem os valores) e valores.
+    """
+    if isinstance(term, Q):
+        parts = [_flatten(x) for x in term.children]
+        return ((term.connector, term.negated,
+                 tuple(shape for shape, _ in parts)),
+                [value for _, values in parts for value in values])
+    field, op, args = term
+    if op == 'is_in':
+        args = list(args[0])
+    return ('C', field, op, len(args)), list(args)
+
+
+def _name_placeholder(names, name):
+    if name not in names:
+        names[name] = f'#f{len(names)}'
+    return names[name]
+
+
+def _render_condition(shape, names, values):
+    _, field, op, arg_count = shape
+    if op not in _TEMPLATES:
+        raise ValueError(f'Comparador inválido: {op}')
+    path = '.'.join(_name_placeholder(names, x) for x in field.split('.'))
+    return _TEMPLATES[op](path, [f':f{next(values)}'
+                                 for _ in range(arg_count)])
+
+
+def _render(shape, names, values):
+    if shape[0] == 'C':
+        return _render_condition(shape, names, values)
+    connector, negated, children = shape
+    if not children:
+        raise ValueError('Nenhuma condição no filtro.')
+    rendered = [_render(x, names, values) for x in children]
+    expression = rendered[0] if len(rendered) == 1 else \
+        '(' + f' {connector} '.join(rendered) + ')'
+    return f'NOT ({expression})' if negated else expression
+
+
+@lru_cache(maxsize=1024)
+def _compile_shape(shape):
+    names = {}
+    expression = _render(shape, names, count())
+    return expression, {v: k for k, v in names.items()}
+
+
+def compile_filter(terms, conjunctive=False):
+    """
+    Compila os termos de um filtro em um FilterExpression em texto. A
+    expressão é guardada em cache pelo formato dos termos (campos,
+    operadores e número de valores), então consultas repetidas só
+    preenchem os valores.
+    :param terms: Condições (campo, operador, argumentos) e Q interpretados
+    :param conjunctive: Combina os termos com E (ou com OU)
+    :return: Argumentos FilterExpression, ExpressionAttributeNames e
+        ExpressionAttributeValues do scan/query
+    """
+    node = terms[0] if len(terms) == 1 else \
+        Q._node('AND' if conjunctive else 'OR', terms)
+    shape, values = _flatten(node)
+    expression, names = _compile_shape(shape)
+    kwargs = dict(FilterExpression=expression,
+                  ExpressionAttributeNames=dict(names))
+    if values:
+        kwargs.update(ExpressionAttributeValues={
+            f':f{i}': value for i, value in enumerate(values)})
+    return kwargs
@@ -0,0 +1,133 @@
+from collections import deque
+from threading import Lock
+from time import monotonic, sleep
+
+# noinspection PyPackageRequirements
+from botocore.exceptions import ClientError
+
+from .retry import is_throttling
+
+_UNPROCESSED_KEYS = ('UnprocessedItems', 'UnprocessedKeys')
+
+
+def consumed_units(response):
+    """
+    :return: Unidades de capacidade consumidas, somando as tabelas de uma
+        operação batch
+    """
+    consumed = response.get('ConsumedCapacity') or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(x.get('CapacityUnits', 0) for x in consumed)
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, rate=None, max_rate=None, min_rate=1.0,
+                 increase=0.05, decrease=0.5, burst=1.0, clock=monotonic):
+        """
+        Token bucket adaptativo, medido em unidades de capacidade por
+        segundo e seguro entre threads. Cada chamada espera haver saldo e,
+        depois, desconta do saldo a capacidade que de fato consumiu
+        (ReturnConsumedCapacity). Um throttle corta a taxa pela metade;
+        sem throttles ela volta a subir aos poucos (AIMD), mantendo o
+        ritmo logo abaixo da capacidade da tabela.
+        :param rate: Taxa inicial; None não limita até o primeiro
+            throttle, quando a taxa parte do consumo medido
+        :param max_rate: Taxa máxima; None não tem teto
+        :param min_rate: Taxa mínima
+        :param increase: Fração da taxa acrescentada por segundo sem
+            throttles
+        :param decrease: Fator aplicado à taxa a cada throttle
+        :param burst: Segundos de saldo acumulável
+        :param clock: Relógio monotônico, em segundos
+        """
+        self._rate = rate
+        self._max_rate = max_rate
+        self._min_rate = min_rate
+        self._increase = increase
+        self._decrease = decrease
+        self._burst = burst
+        self._clock = clock
+        self._lock = Lock()
+        self._tokens = 0.0
+        self._updated = clock()
+        self._recent = deque()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self._rate is None:
+            return
+        self._rate = min(self._max_rate or float('inf'),
+                         self._rate * (1 + self._increase * elapsed))
+        self._tokens = min(self._rate * self._burst,
+                           self._tokens + self._rate * elapsed)
+
+    def _wait_time(self):
+        with self._lock:
+            self._refill(self._clock())
+            if self._rate is None or self._tokens > 0:
+                return 0
+            return -self._tokens / self._rate
+
+    def acquire(self):
+        """
+        Bloqueia até haver saldo para uma nova chamada.
+        """
+        delay = self._wait_time()
+        while delay > 0:
+            sleep(delay)
+            delay = self._wait_time()
+
+    def _prune(self, now):
+        while self._recent and self._recent[0][0] < now - 1.0:
+            self._recent.popleft()
+
+    def _measured_rate(self, now):
+        self._prune(now)
+        return sum(units for _, units in self._recent)
+
+    def record(self, units):
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= units
+            # The consumption is only measured while there's no rate, and
+            # only over the last second.
+            if self._rate is None:
+                self._recent.append((now, units))
+                self._prune(now)
+
+    def on_throttle(self):
+        with self._lock:
+            now = self._clock()
+            current = self._rate if self._rate is not None \
+                else self._measured_rate(now)
+            self._rate = max(self._min_rate, current * self._decrease)
+            self._tokens = min(self._tokens, 0.0)
+            self._recent.clear()
+
+    def _record_response(self, response):
+        self.record(consumed_units(response))
+        if any(response.get(key) for key in _UNPROCESSED_KEYS):
+            self.on_throttle()
+
+    def call(self, func, **kwargs):
+        """
+        Executa func(**kwargs) respeitando a taxa e pedindo o consumo de
+        capacidade na resposta.
+        """
+        self.acquire()
+        kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        try:
+            response = func(**kwargs)
+        except ClientError as e:
+            if is_throttling(e):
+                self.on_throttle()
+            raise
+        self._record_response(response)
+        return response
@@ -0,0 +1,101 @@
+from collections import namedtuple
+from functools import lru_cache
+from keyword import iskeyword
+
+RESULT_MODES = ('entity', 'dict', 'namedtuple', 'row')
+
+
+class Row:
+    """
+    Linha leve, com __slots__, usada no modo result='row'. Cada conjunto de
+    atributos gera (uma única vez) sua própria subclasse; veja row_class().
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Row):
+            return NotImplemented
+        return self._asdict() == other._asdict()
+
+    def __repr__(self):
+        values = ', '.join(f'{k}={v!r}' for k, v in self._asdict().items())
+        return f'Row({values})'
+
+
+def _identifier(name, index):
+    if name.isidentifier() and not iskeyword(name) and \
+            not name.startswith('_'):
+        return name
+    return f'_{index}'
+
+
+def _identifiers(fields):
+    return tuple(_identifier(name, i) for i, name in enumerate(fields))
+
+
+@lru_cache(maxsize=256)
+def row_class(fields):
+    """
+    Subclasse de Row com __slots__ para os atributos informados. Nomes que
+    não são identificadores válidos viram _<posição>, como no namedtuple.
+    """
+    return type('Row', (Row,), {'__slots__': _identifiers(fields),
+                                '_fields': _identifiers(fields)})
+
+
+@lru_cache(maxsize=256)
+def namedtuple_class(fields):
+    return namedtuple('Row', fields, rename=True)
+
+
+_CLASS_FACTORIES = {'namedtuple': namedtuple_class, 'row': row_class}
+
+
+def row_factory(mode, fields=None):
+    """
+    Função que converte um item (já decodificado) no formato de resultado
+    pedido.
+    :param mode: 'dict', 'namedtuple' ou 'row'
+    :param fields: Atributos de cada linha, na ordem; None usa os atributos
+        de cada item, em ordem alfabética
+    :return: A função, ou None se o item deve ser entregue como está
+    """
+    if mode == 'dict':
+        return None
+    make_class = _CLASS_FACTORIES[mode]
+    if fields is not None:
+        fields = tuple(fields)
+        cls = make_class(fields)
+        return lambda item: cls(*[item.get(name) for name in fields])
+
+    def build(item):
+        names = tuple(sorted(item))
+        return make_class(names)(*[item[name] for name in names])
+    return build
+
+
+def compose(*funcs):
+    """
+    Aplica as funções em sequência, ignorando as que forem None.
+    :return: A função composta, ou None se não houver nenhuma
+    """
+    funcs = [f for f in funcs if f is not None]
+    if len(funcs) < 2:
+        return funcs[0] if funcs else None
+
+    def composed(item):
+        for func in funcs:
+            item = func(item)
+        return item
+    return composed
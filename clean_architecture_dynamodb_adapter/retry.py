@@ -0,0 +1,77 @@
+import random
+from time import sleep
+
+# noinspection PyPackageRequirements
+from botocore.exceptions import ClientError
+
+THROTTLING_ERRORS = ('ProvisionedThroughputExceededException',
+                     'ThrottlingException',
+                     'RequestLimitExceeded')
+RETRYABLE_ERRORS = THROTTLING_ERRORS + ('InternalServerError',
+                                        'ServiceUnavailable')
+
+
+def backoff_delay(attempt, base=0.05, cap=5.0):
+    """
+    Espera (em segundos) antes da tentativa seguinte, com backoff
+    exponencial e jitter completo.
+    :param attempt: Número da tentativa que falhou, começando em zero
+    :param base: Espera base da primeira tentativa
+    :param cap: Espera máxima
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))  # noqa: S311
+
+
+def error_code(error):
+    return error.response.get('Error', {}).get('Code')
+
+
+def is_throttling(error):
+    return isinstance(error, ClientError) and \
+        error_code(error) in THROTTLING_ERRORS
+
+
+def _ignore_retry(error, attempt):
+    pass
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, base=0.05, cap=5.0,
+                 retryable=RETRYABLE_ERRORS):
+        """
+        Política de novas tentativas das chamadas do adapter: erros
+        retryable (throttling e falhas transitórias do serviço) são
+        repetidos com backoff exponencial e jitter completo; os demais
+        sobem na hora. Ela se soma às tentativas do próprio botocore; para
+        deixar só esta política, use ConnectionPool(max_attempts=1).
+        :param max_attempts: Número máximo de chamadas
+        :param base: Espera base, em segundos
+        :param cap: Espera máxima entre duas chamadas
+        :param retryable: Códigos de erro que podem ser repetidos
+        """
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self.retryable = frozenset(retryable)
+
+    def _should_retry(self, error, attempt):
+        return attempt + 1 < self.max_attempts and \
+            error_code(error) in self.retryable
+
+    def run(self, func, on_retry=_ignore_retry, **kwargs):
+        """
+        Chama func(**kwargs), repetindo os erros retryable.
+        :param on_retry: Callable chamado com o erro e o número da
+            tentativa que falhou, antes de cada nova tentativa
+        :raises ClientError: o último erro, se as tentativas acabarem
+        """
+        attempt = 0
+        while True:
+            try:
+                return func(**kwargs)
+            except ClientError as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                on_retry(e, attempt)
+            sleep(backoff_delay(attempt, self.base, self.cap))
+            attempt += 1
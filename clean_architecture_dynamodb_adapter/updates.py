@@ -0,0 +1,64 @@
+_SETS = (set, frozenset)
+
+
+def _grown(old, new):
+    return isinstance(old, _SETS) and isinstance(new, _SETS) and new > old
+
+
+def diff_items(old, new, key='entity_id'):
+    """
+    Compara o último estado lido de um item com o novo, ambos já
+    codificados.
+    :param key: Atributo de chave, que nunca é alterado
+    :return: (changed, removed, added): atributos com valor novo,
+        atributos removidos e sets que só ganharam elementos (com os
+        elementos novos)
+    """
+    changed = {k: v for k, v in new.items()
+               if k != key and (k not in old or old[k] != v)}
+    added = {k: v - old[k] for k, v in changed.items()
+             if _grown(old.get(k), v)}
+    for name in added:
+        del changed[name]
+    removed = [k for k in old if k != key and k not in new]
+    return changed, removed, added
+
+
+def update_kwargs(changed=None, removed=(), added=None):
+    """
+    Monta uma UpdateExpression com SET, REMOVE e ADD.
+    :param changed: {atributo: valor} gravados com SET
+    :param removed: Atributos removidos com REMOVE
+    :param added: {atributo: valor} somados (números) ou unidos (sets)
+        com ADD
+    :return: Argumentos do UpdateItem, ou None se não houver alterações
+    """
+    names = {}
+    values = {}
+
+    def name(attribute):
+        placeholder = f'#u{len(names)}'
+        names[placeholder] = attribute
+        return placeholder
+
+    def value(data):
+        placeholder = f':u{len(values)}'
+        values[placeholder] = data
+        return placeholder
+
+    clauses = [
+        ('SET', [f'{name(k)} = {value(v)}'
+                 for k, v in (changed or {}).items()]),
+        ('REMOVE', [name(k) for k in removed]),
+        ('ADD', [f'{name(k)} {value(v)}'
+                 for k, v in (added or {}).items()]),
+    ]
+    expression = ' '.join(f'{clause} {", ".join(actions)}'
+                          for clause, actions in clauses if actions)
+    if not expression:
+        return None
+    kwargs = dict(UpdateExpression=expression,
+                  ExpressionAttributeNames=names)
+    if values:
+        kwargs.update(ExpressionAttributeValues=values)
+    return kwargs
@@ -0,0 +1,104 @@
+from boto3.dynamodb.conditions import ConditionBase, \
+    ConditionExpressionBuilder
+from boto3.dynamodb.types import Binary, DYNAMODB_CONTEXT, \
+    TypeDeserializer, TypeSerializer
+
+from .codec import _decode_decimal, _decode_string
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _decode_number(data, decimals):
+    number = DYNAMODB_CONTEXT.create_decimal(data)
+    return _decode_decimal(number) if decimals else number
+
+
+_WIRE_DECODERS = {
+    'S': lambda data, decimals: _decode_string(data),
+    'N': _decode_number,
+    'BOOL': lambda data, decimals: data,
+    'NULL': lambda data, decimals: None,
+    'M': lambda data, decimals: decode_item(data, decimals),
+    'L': lambda data, decimals: [decode_value(x, decimals) for x in data],
+    'SS': lambda data, decimals: {_decode_string(x) for x in data},
+    'NS': lambda data, decimals: {_decode_number(x, decimals) for x in data},
+    'B': lambda data, decimals: Binary(data),
+    'BS': lambda data, decimals: {Binary(x) for x in data},
+}
+
+
+def decode_value(value, decimals=False):
+    for tag, data in value.items():
+        return _WIRE_DECODERS[tag](data, decimals)
+
+
+def decode_item(item, decimals=False):
+    """
+    Converte um item no formato do client ({'S': ...}, {'N': ...}, ...)
+    diretamente no formato esperado por from_json, desfazendo a
+    codificação dos floats na mesma passada. Equivale a desserializar com
+    o TypeDeserializer e depois aplicar _denormalize_floats.
+    """
+    return {k: decode_value(v, decimals) for k, v in item.items()}
+
+
+def encode_item(item):
+    return {k: _serializer.serialize(v) for k, v in item.items()}
+
+
+def decode_key(key):
+    """
+    Converte uma chave (ex.: LastEvaluatedKey) do formato do client com os
+    tipos do resource, sem interpretar strings 'Float(...)': a chave volta
+    como ExclusiveStartKey exatamente como veio.
+    """
+    if not key:
+        return key
+    return {k: _deserializer.deserialize(v) for k, v in key.items()}
+
+
+def _expression_kwargs(kwargs, built, encode):
+    names = dict(kwargs.pop('ExpressionAttributeNames', {}),
+                 **built.attribute_name_placeholders)
+    values = dict(kwargs.pop('ExpressionAttributeValues', {}),
+                  **encode(built.attribute_value_placeholders))
+    kwargs.update(ExpressionAttributeNames=names)
+    if values:
+        kwargs.update(ExpressionAttributeValues=values)
+
+
+def compile_conditions(kwargs, encode=encode_item):
+    """
+    Compila, no lugar, as condições do boto3 (Key e Attr) dos argumentos
+    em expressões em texto.
+    :param encode: Conversão dos valores das condições; o default os
+        serializa no formato do client
+    """
+    # One builder for all expressions keeps the placeholders unique.
+    builder = ConditionExpressionBuilder()
+    for name, is_key in (('KeyConditionExpression', True),
+                         ('FilterExpression', False),
+                         ('ConditionExpression', False)):
+        condition = kwargs.get(name)
+        if isinstance(condition, ConditionBase):
+            built = builder.build_expression(condition, is_key)
+            kwargs[name] = built.condition_expression
+            _expression_kwargs(kwargs, built, encode)
+
+
+def client_kwargs(table_name, kwargs):
+    """
+    Traduz os argumentos de uma chamada ao Table (resource) para o client:
+    inclui o TableName, compila as condições do boto3 em expressões e
+    serializa chaves e valores.
+    """
+    kwargs = dict(kwargs, TableName=table_name)
+    if 'ExpressionAttributeValues' in kwargs:
+        kwargs['ExpressionAttributeValues'] = encode_item(
+            kwargs['ExpressionAttributeValues'])
+    compile_conditions(kwargs)
+    for key_name in ('Key', 'ExclusiveStartKey'):
+        if key_name in kwargs:
+            kwargs[key_name] = encode_item(kwargs[key_name])
+    return kwargs
@@ -22,6 +22,7 @@ setup(
     ],
     description="Implementação concreta de adapter para DynamoDB",
     install_requires=requirements,
+    extras_require={'async': ['aioboto3']},
     long_description=readme + '\n\n' + history,
     include_package_data=True,
     keywords='clean_architecture_dynamodb_adapter',
@@ -1,5 +1,6 @@
 from clean_architecture_basic_classes import BasicEntity
 from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.connection_pool import default_pool
 from collections import namedtuple
 from marshmallow import fields, post_load
 from pytest import fixture
@@ -13,6 +14,13 @@ AdapterFactory = namedtuple('Factory', 'adapter, '
                                        'db_endpoint')
 
 
+@fixture(autouse=True)
+def clear_connection_pool():
+    default_pool.clear()
+    yield
+    default_pool.clear()
+
+
 @fixture(scope='class')
 def adapter_factory(request):
     def factory(table_name=MagicMock(), db_endpoint=None):
@@ -0,0 +1,111 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    GlobalSecondaryIndex, InMemoryBackend
+from clean_architecture_dynamodb_adapter.aggregates import aggregate
+from decimal import Decimal
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+ITEMS = [dict(valor=3), dict(valor=1.5), dict(outro=1), dict(valor=None),
+         dict(valor=3)]
+
+
+@pytest.mark.parametrize('op, expected', [('sum', 7.5), ('min', 1.5),
+                                          ('max', 3), ('distinct', {3, 1.5})])
+def test_aggregate(op, expected):
+    assert aggregate(op, 'valor', iter(ITEMS)) == expected
+
+
+def test_aggregate_empty_and_invalid():
+    assert aggregate('sum', 'valor', []) == 0
+    assert aggregate('max', 'valor', []) is None
+
+    with raises(ValueError) as excinfo:
+        aggregate('avg', 'valor', [])
+    assert 'Agregação inválida: avg' == str(excinfo.value)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_count_all_pages(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(side_effect=[
+            dict(Count=2, LastEvaluatedKey=dict(entity_id='b')),
+            dict(Count=3)])
+        assert adapter.count() == 5
+
+    mock.scan.assert_called_with(Select='COUNT',
+                                 ExclusiveStartKey=dict(entity_id='b'))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_count_conditions(mock_boto3):
+    adapter = BasicDynamodbAdapter(
+        'tabela', None, MagicMock(), MagicMock(),
+        indexes=[GlobalSecondaryIndex('email-index', 'email')])
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(Count=4))
+        mock.query = MagicMock(return_value=dict(Count=1))
+        assert adapter.count(campo__eq=1) == 4
+        assert adapter.count(email__eq='a') == 1
+
+    mock.scan.assert_called_once_with(
+        Select='COUNT', FilterExpression='#f0 = :f0',
+        ExpressionAttributeNames={'#f0': 'campo'},
+        ExpressionAttributeValues={':f0': 1})
+    assert mock.query.call_args[1]['IndexName'] == 'email-index'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_count_segments(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(side_effect=lambda **kw: dict(
+            Count=kw['Segment'] + 1))
+        assert adapter.count(segments=3) == 6
+
+    assert sorted(c[1]['Segment'] for c in mock.scan.call_args_list) == \
+        [0, 1, 2]
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_aggregate_projects_attribute(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   float_storage='decimal')
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(side_effect=[
+            dict(Items=[dict(valor=Decimal('1.5')), dict(valor='Float(2)')],
+                 LastEvaluatedKey=dict(entity_id='x')),
+            dict(Items=[dict(valor=Decimal('3'))])])
+        assert adapter.aggregate('sum', 'valor', status__eq='pago') == 6.5
+
+    kwargs = mock.scan.call_args[1]
+    assert kwargs['ProjectionExpression'] == '#p0'
+    assert kwargs['ExpressionAttributeNames'] == {'#f0': 'status',
+                                                  '#p0': 'valor'}
+    adapter._class.from_json.assert_not_called()
+
+
+@pytest.mark.parametrize('float_storage', ['string', 'decimal'])
+def test_aggregate_mixed_ints_and_floats(float_storage):
+    backend = InMemoryBackend()
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   connection_pool=backend,
+                                   float_storage=float_storage)
+    adapter.save_many([dict(entity_id='a', valor=3),
+                       dict(entity_id='b', valor=1.5),
+                       dict(entity_id='c', valor=2)])
+
+    assert adapter.aggregate('sum', 'valor') == 6.5
+    assert adapter.aggregate('min', 'valor') == 1.5
+    assert adapter.aggregate('max', 'valor') == 3
+    assert adapter.aggregate('distinct', 'valor') == {3, 1.5, 2}
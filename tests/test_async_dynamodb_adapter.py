@@ -0,0 +1,171 @@
+from asyncio import gather, run, sleep
+from clean_architecture_dynamodb_adapter import AsyncDynamodbAdapter
+from decimal import Decimal
+from marshmallow import Schema, fields
+from math import pi
+from pytest import raises
+from unittest.mock import MagicMock
+
+
+class FakeTable:
+    def __init__(self):
+        self.items = {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _track(self, operation, kwargs):
+        self.calls.append((operation, kwargs))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await sleep(0)
+        self.in_flight -= 1
+
+    async def get_item(self, **kwargs):
+        await self._track('get_item', kwargs)
+        item = self.items.get(kwargs['Key']['entity_id'])
+        return {} if item is None else {'Item': item}
+
+    async def put_item(self, **kwargs):
+        await self._track('put_item', kwargs)
+        self.items[kwargs['Item']['entity_id']] = kwargs['Item']
+        return {}
+
+    async def delete_item(self, **kwargs):
+        await self._track('delete_item', kwargs)
+        self.items.pop(kwargs['Key']['entity_id'], None)
+        return {}
+
+    async def scan(self, **kwargs):
+        await self._track('scan', kwargs)
+        keys = sorted(self.items)
+        start = kwargs.get('ExclusiveStartKey')
+        if start:
+            keys = [k for k in keys if k > start['entity_id']]
+        limit = kwargs.get('Limit', len(keys))
+        response = {'Items': [self.items[k] for k in keys[:limit]]}
+        if len(keys) > limit:
+            response['LastEvaluatedKey'] = dict(entity_id=keys[limit - 1])
+        return response
+
+
+class FakeResource:
+    def __init__(self, table):
+        self.table = table
+
+    async def Table(self, name):
+        return self.table
+
+
+def adapter_for(table, **kwargs):
+    entity_cls = MagicMock()
+    entity_cls.from_json = lambda data: MagicMock(**data)
+    return AsyncDynamodbAdapter('tabela', None, entity_cls, MagicMock(),
+                                resource=FakeResource(table), **kwargs)
+
+
+def test_save_and_get_by_id():
+    table = FakeTable()
+
+    async def scenario():
+        async with adapter_for(table) as adapter:
+            entity_id = await adapter.save(dict(valor=pi, vazio=''))
+            return entity_id, await adapter.get_by_id(entity_id)
+
+    entity_id, entity = run(scenario())
+
+    assert table.items[entity_id] == dict(entity_id=entity_id,
+                                          valor=f'Float({pi})')
+    assert entity.valor == pi
+    entity.set_adapter.assert_called_once()
+
+
+def test_delete():
+    table = FakeTable()
+    table.items['a'] = dict(entity_id='a')
+
+    async def scenario():
+        async with adapter_for(table) as adapter:
+            return await adapter.delete('a')
+
+    assert run(scenario()) == 'a'
+    assert table.items == {}
+
+
+def test_iter_all_pages():
+    table = FakeTable()
+    table.items = {str(i): dict(entity_id=str(i)) for i in range(5)}
+
+    async def scenario():
+        async with adapter_for(table) as adapter:
+            iterator = adapter.iter_all(page_size=2, max_items=3)
+            result = [x.entity_id async for x in iterator]
+            return result, iterator.last_evaluated_key
+
+    result, last_key = run(scenario())
+
+    assert result == ['0', '1', '2']
+    assert last_key == dict(entity_id='2')
+    assert [c[0] for c in table.calls] == ['scan', 'scan']
+
+
+def test_filter_uses_conditions():
+    table = FakeTable()
+    table.items = {'a': dict(entity_id='a')}
+
+    async def scenario():
+        async with adapter_for(table) as adapter:
+            return await adapter.filter(campo__eq=42)
+
+    result = run(scenario())
+
+    assert len(result) == 1
+    assert 'FilterExpression' in table.calls[0][1]
+
+
+def test_concurrency_bounded():
+    table = FakeTable()
+
+    async def scenario():
+        async with adapter_for(table, max_concurrency=3) as adapter:
+            for _ in range(10):
+                await adapter.save(dict(valor=1))
+            await gather(
+                *[adapter.get_by_id(k) for k in list(table.items)])
+
+    run(scenario())
+
+    assert table.max_in_flight == 3
+
+
+def test_call_requires_open():
+    adapter = adapter_for(FakeTable())
+
+    with raises(RuntimeError):
+        run(adapter.get_by_id('a'))
+
+
+def test_decimal_storage():
+    table = FakeTable()
+
+    class Entity:
+        Schema = type('Schema', (Schema,), {'valor': fields.Float()})
+
+        @classmethod
+        def from_json(cls, data):
+            return MagicMock(**data)
+
+    async def scenario():
+        async with AsyncDynamodbAdapter('tabela', None, Entity, MagicMock(),
+                                        resource=FakeResource(table),
+                                        float_storage='decimal') as adapter:
+            entity_id = await adapter.save(dict(valor=2.0))
+            await adapter.filter(valor__gt=1.5)
+            return entity_id, await adapter.get_by_id(entity_id)
+
+    entity_id, entity = run(scenario())
+
+    assert table.items[entity_id]['valor'] == Decimal('2.0')
+    assert type(entity.valor) is float
+    condition = table.calls[1][1]['FilterExpression']
+    assert condition.get_expression()['values'][1] == Decimal('1.5')
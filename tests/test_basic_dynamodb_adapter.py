@@ -1,5 +1,6 @@
 from botocore.exceptions import ClientError
 from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.connection_pool import default_pool
 from math import pi
 from pytest import raises
 from tests.conftest import AdapterFactory
@@ -10,27 +11,30 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_basic_dynamicdb_adapter(mock_boto3):
     logger = MagicMock()
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), logger)
 
-    mock_boto3.client.assert_called_once()
-    mock_boto3.client.return_value.list_tables.assert_called_once()
-    mock_boto3.resource.assert_called_once()
-    mock_boto3.resource.assert_called_with('dynamodb', endpoint_url=None)
+    mock_session = mock_boto3.session.Session
+    mock_session.assert_called_once_with(region_name=None)
+    mock_session().resource.assert_called_once()
+    mock_session().resource.assert_called_with(
+        'dynamodb', endpoint_url=None, config=default_pool.config)
+    mock_client = mock_session().resource().meta.client
+    mock_client.describe_table.assert_called_once_with(TableName='tabela')
 
     assert adapter._table_name == 'tabela'
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_list_all(mock_boto3):
     logger = MagicMock()
     dummy_class = MagicMock()
     adapter = BasicDynamodbAdapter('tabela', None, dummy_class, logger)
 
-    scan_result = {'Items': [1, 2, 3, 4]}
+    scan_result = {'Items': [dict(entity_id=str(x)) for x in range(4)]}
     with patch.object(adapter, '_table') as mock:
         mock.scan = MagicMock(return_value=scan_result)
         result = adapter.list_all()
@@ -41,7 +45,7 @@ def test_list_all(mock_boto3):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 @patch.object(BasicDynamodbAdapter, '_instantiate_object')
 def test_get_by_id(mock_instantiate_object, mock_boto3):
     dummy_class = MagicMock()
@@ -62,7 +66,7 @@ def test_get_by_id(mock_instantiate_object, mock_boto3):
 class TestGetByIdSetAdapter(TestCase):
     def setUp(self):
         self.patch_boto3 = patch('clean_architecture_dynamodb_adapter.'
-                                 'basic_dynamodb_adapter.boto3')
+                                 'connection_pool.boto3')
         self.mock_boto3 = self.patch_boto3.start()
 
     def tearDown(self):
@@ -75,7 +79,7 @@ class TestGetByIdSetAdapter(TestCase):
         fac: AdapterFactory = self.factory()
         mock_entity_id = MagicMock()
 
-        mock_table = self.mock_boto3.resource().Table()
+        mock_table = self.mock_boto3.session.Session().resource().Table()
         mock_table.get_item = MagicMock(return_value=expected_scan_result)
 
         entity = fac.adapter.get_by_id(mock_entity_id)
@@ -90,7 +94,7 @@ class TestGetByIdSetAdapter(TestCase):
         }
         fac: AdapterFactory = self.factory()
 
-        mock_table = self.mock_boto3.resource().Table()
+        mock_table = self.mock_boto3.session.Session().resource().Table()
         mock_table.scan = MagicMock(return_value=expected_scan_result)
 
         entities = fac.adapter.list_all()
@@ -100,7 +104,7 @@ class TestGetByIdSetAdapter(TestCase):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_get_by_id_not_found(mock_boto3):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
@@ -113,7 +117,7 @@ def test_get_by_id_not_found(mock_boto3):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_save(mock_boto3):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
@@ -126,7 +130,7 @@ def test_save(mock_boto3):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_delete(mock_boto3):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
@@ -139,7 +143,7 @@ def test_delete(mock_boto3):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_delete_raising(mock_boto3):
     logger = MagicMock()
 
@@ -273,48 +277,52 @@ def test_denormalize_floats():
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
     with patch.object(adapter, '_table') as mock:
+        mock.scan.return_value = dict(Items=[])
         adapter.filter(campo__eq=42, campo2__gt=42)
 
     mock.scan.assert_called_once()
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter_between(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
     with patch.object(adapter, '_table') as mock:
+        mock.scan.return_value = dict(Items=[])
         adapter.filter(campo__between=[40, 50])
 
     mock.scan.assert_called_once()
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter_exists(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
     with patch.object(adapter, '_table') as mock:
+        mock.scan.return_value = dict(Items=[])
         adapter.filter(campo__exists=None)
 
     mock.scan.assert_called_once()
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter_projection(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
     with patch.object(adapter, '_table') as mock:
+        mock.scan.return_value = dict(Items=[])
         adapter.filter(campo__exists=None, ProjectionExpression='campo')
 
     mock.scan.assert_called_once()
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter_invalid_op(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
@@ -326,7 +334,7 @@ def test_filter_invalid_op(mock_boto):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_filter_no_conditions(mock_boto):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
 
@@ -338,13 +346,14 @@ def test_filter_no_conditions(mock_boto):
 
 
 # noinspection PyUnusedLocal
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 def test_desserialize(mock_boto3):
     adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
     mock_class = MagicMock(from_json=MagicMock())
     mock_table = MagicMock(
         scan=MagicMock(
-            return_value=dict(Items=[1, 2, 3, 4, 5])))
+            return_value=dict(Items=[dict(entity_id=str(x))
+                                     for x in range(5)])))
     with patch.multiple(adapter,
                         _class=mock_class,
                         _table=mock_table):
@@ -354,7 +363,7 @@ def test_desserialize(mock_boto3):
         r.set_adapter.assert_called()
 
 
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 @patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.Attr')
 def test_get_contitions(mock_attr, mock_boto3):
     mock_class = MagicMock()
@@ -372,7 +381,7 @@ def test_get_contitions(mock_attr, mock_boto3):
     assert result == mock_attr().eq()
 
 
-@patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.boto3')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
 @patch('clean_architecture_dynamodb_adapter.basic_dynamodb_adapter.Attr')
 def test_get_contitions_with_dot(mock_attr, mock_boto3):
     mock_class = MagicMock()
@@ -0,0 +1,140 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.batch import chunked
+from math import pi
+from pytest import raises
+from tests.conftest import AdapterFactory
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_many_chunks(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+    json_list = [dict(entity_id=str(i), valor=pi) for i in range(60)]
+
+    with patch.object(adapter, '_db') as mock:
+        mock.batch_write_item = MagicMock(return_value={})
+        result = adapter.save_many(json_list)
+
+    assert result == [str(i) for i in range(60)]
+    assert mock.batch_write_item.call_count == 3
+    sizes = sorted(len(c[1]['RequestItems']['tabela'])
+                   for c in mock.batch_write_item.call_args_list)
+    assert sizes == [10, 25, 25]
+    request = mock.batch_write_item.call_args_list[0][1]
+    item = request['RequestItems']['tabela'][0]['PutRequest']['Item']
+    assert item['valor'] == f'Float({pi})'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_many_generates_ids(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+    json_list = [dict(valor=1), dict(valor=2)]
+
+    with patch.object(adapter, '_db') as mock:
+        mock.batch_write_item = MagicMock(return_value={})
+        result = adapter.save_many(json_list, max_workers=1)
+
+    assert [x['entity_id'] for x in json_list] == result
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.batch.sleep')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_many_retries_unprocessed(mock_boto3, mock_sleep):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+    unprocessed = {'tabela': [{'PutRequest': {'Item': {'entity_id': '1'}}}]}
+
+    with patch.object(adapter, '_db') as mock:
+        mock.batch_write_item = MagicMock(side_effect=[
+            dict(UnprocessedItems=unprocessed),
+            dict(UnprocessedItems={})])
+        adapter.save_many([dict(entity_id='0'), dict(entity_id='1')])
+
+    assert mock.batch_write_item.call_count == 2
+    mock.batch_write_item.assert_called_with(RequestItems=unprocessed)
+    mock_sleep.assert_called_once()
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.batch.sleep')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_delete_many_gives_up(mock_boto3, mock_sleep):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+    unprocessed = {'tabela': [{'DeleteRequest': {'Key': {'entity_id': '1'}}}]}
+
+    with patch.object(adapter, '_db') as mock:
+        mock.batch_write_item = MagicMock(
+            return_value=dict(UnprocessedItems=unprocessed))
+        with raises(BasicDynamodbAdapter.DynamodbAdapterBatchException):
+            adapter.delete_many(['1', '1'])
+
+    assert mock.batch_write_item.call_count == adapter.BATCH_MAX_ATTEMPTS
+    first = mock.batch_write_item.call_args_list[0][1]
+    assert first['RequestItems']['tabela'] == unprocessed['tabela']
+
+
+@pytest.mark.usefixtures('adapter_factory', 'dynamo_entity')
+class TestGetMany(TestCase):
+    def setUp(self):
+        self.patch_boto3 = patch('clean_architecture_dynamodb_adapter.'
+                                 'connection_pool.boto3')
+        self.mock_boto3 = self.patch_boto3.start()
+
+    def tearDown(self):
+        self.patch_boto3.stop()
+
+    def test_get_many_order_and_misses(self):
+        fac: AdapterFactory = self.factory()
+        table = fac.table_name
+        ids = [str(i) for i in range(150)] + ['0', 'nao_existe']
+
+        def batch_get_item(RequestItems):
+            keys = RequestItems[table]['Keys']
+            items = [dict(self.dynamo_entity_factory(pi), **key)
+                     for key in keys if key['entity_id'] != 'nao_existe']
+            return dict(Responses={table: items})
+
+        mock_db = self.mock_boto3.session.Session().resource()
+        mock_db.batch_get_item = MagicMock(side_effect=batch_get_item)
+
+        result = fac.adapter.get_many(ids, consistent=False)
+
+        self.assertEqual(mock_db.batch_get_item.call_count, 2)
+        requested = [key['entity_id']
+                     for call in mock_db.batch_get_item.call_args_list
+                     for key in call[1]['RequestItems'][table]['Keys']]
+        self.assertEqual(sorted(requested), sorted(set(ids)))
+        request = mock_db.batch_get_item.call_args[1]['RequestItems']
+        self.assertFalse(request[table]['ConsistentRead'])
+
+        self.assertEqual([x.entity_id for x in result[:-1]], ids[:-1])
+        self.assertIsNone(result[-1])
+        self.assertEqual(result[0].float_value, pi)
+        self.assertEqual(result[0].adapter, fac.adapter)
+
+    @patch('clean_architecture_dynamodb_adapter.batch.sleep')
+    def test_get_many_retries_unprocessed(self, mock_sleep):
+        fac: AdapterFactory = self.factory()
+        table = fac.table_name
+        unprocessed = {table: dict(Keys=[dict(entity_id='b')],
+                                   ConsistentRead=True)}
+        mock_db = self.mock_boto3.session.Session().resource()
+        mock_db.batch_get_item = MagicMock(side_effect=[
+            dict(Responses={table: [self.dynamo_entity_factory(1)]},
+                 UnprocessedKeys=unprocessed),
+            dict(Responses={table: [dict(self.dynamo_entity_factory(2),
+                                         entity_id='b')]})])
+
+        result = fac.adapter.get_many(['meu_id', 'b'])
+
+        mock_db.batch_get_item.assert_called_with(RequestItems=unprocessed)
+        self.assertEqual([x.float_value for x in result], [1, 2])
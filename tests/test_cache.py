@@ -0,0 +1,112 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    EntityCache
+from unittest.mock import patch, MagicMock
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_lru_eviction():
+    cache = EntityCache(max_size=2, ttl=None)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == dict(hits=3, misses=1, evictions=1,
+                                 expirations=0, size=2)
+
+
+def test_cache_ttl():
+    clock = FakeClock()
+    cache = EntityCache(ttl=10, clock=clock)
+    cache.set('a', 1)
+
+    clock.now = 9.9
+    assert cache.get('a') == 1
+
+    clock.now = 10
+    assert cache.get('a') is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_get_by_id_uses_cache(mock_boto3):
+    cache = EntityCache()
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   cache=cache, cache_consistent_read=False)
+
+    with patch.object(adapter, '_table') as mock:
+        mock.get_item = MagicMock(return_value={'Item': {'entity_id': 'x'}})
+        first = adapter.get_by_id('x')
+        second = adapter.get_by_id('x')
+
+    assert first is second
+    mock.get_item.assert_called_once_with(Key=dict(entity_id='x'),
+                                          ConsistentRead=False)
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_writes_invalidate_cache(mock_boto3):
+    cache = EntityCache()
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   cache=cache)
+    for entity_id in 'abcd':
+        cache.set(entity_id, MagicMock())
+
+    with patch.object(adapter, '_table'), patch.object(adapter, '_db') as db:
+        db.batch_write_item = MagicMock(return_value={})
+        adapter.save(dict(entity_id='a'))
+        adapter.delete('b')
+        adapter.save_many([dict(entity_id='c')])
+        adapter.delete_many(['d'])
+
+    assert len(cache) == 0
+
+
+def test_cache_fill_dropped_after_invalidate():
+    cache = EntityCache()
+    generation = cache.begin_fill('a')
+    cache.invalidate('a')
+    cache.end_fill('a', generation, 'antigo')
+
+    assert cache.get('a') is None
+
+    cache.end_fill('a', cache.begin_fill('a'), 'novo')
+    assert cache.get('a') == 'novo'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_read_during_write_is_not_cached(mock_boto3):
+    cache = EntityCache()
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   cache=cache)
+
+    def get_during_save(**kwargs):
+        adapter.save(dict(entity_id='x'))
+        return {'Item': {'entity_id': 'x'}}
+
+    with patch.object(adapter, '_table') as mock:
+        mock.get_item = MagicMock(side_effect=get_during_save)
+        adapter.get_by_id('x')
+        assert len(cache) == 0
+
+        mock.get_item = MagicMock(return_value={'Item': {'entity_id': 'x'}})
+        mock.delete_item.side_effect = lambda **kwargs: adapter.get_by_id('x')
+        adapter.delete('x')
+
+    assert len(cache) == 0
@@ -0,0 +1,98 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.coalescing import BatchCoalescer, \
+    SingleFlight
+from clean_architecture_dynamodb_adapter.lazy import LazyEntity
+from concurrent.futures import ThreadPoolExecutor
+from pytest import raises
+from threading import Event, Lock
+from time import sleep
+from unittest.mock import patch, MagicMock
+
+
+def test_single_flight_shares_result():
+    single_flight = SingleFlight()
+    started = Event()
+    release = Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return object()
+
+    with ThreadPoolExecutor(8) as executor:
+        leader = executor.submit(single_flight.do, 'k', slow)
+        started.wait(1)
+        followers = [executor.submit(single_flight.do, 'k', slow)
+                     for _ in range(7)]
+        sleep(0.05)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert len({id(x) for x in results}) == 1
+
+
+def test_single_flight_propagates_errors():
+    single_flight = SingleFlight()
+
+    with raises(KeyError):
+        single_flight.do('k', MagicMock(side_effect=KeyError('oops')))
+
+    assert single_flight.do('k', lambda: 42) == 42
+
+
+def test_batch_coalescer_groups_keys():
+    lock = Lock()
+    batches = []
+
+    def fetch_many(keys):
+        with lock:
+            batches.append(sorted(keys))
+        return {k: k.upper() for k in keys if k != 'z'}
+
+    coalescer = BatchCoalescer(fetch_many, window=0.1)
+    keys = ['a', 'b', 'a', 'c', 'z']
+    with ThreadPoolExecutor(len(keys)) as executor:
+        results = list(executor.map(coalescer.get, keys))
+
+    assert results == ['A', 'B', 'A', 'C', None]
+    assert batches == [['a', 'b', 'c', 'z']]
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_get_by_id_batch_window(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   batch_window=0.1)
+
+    def batch_get_item(RequestItems):
+        keys = RequestItems['tabela']['Keys']
+        return dict(Responses=dict(tabela=keys))
+
+    with patch.object(adapter, '_db') as mock_db, \
+            patch.object(adapter, '_table') as mock_table:
+        mock_db.batch_get_item = MagicMock(side_effect=batch_get_item)
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(adapter.get_by_id, 'abcd'))
+
+    mock_db.batch_get_item.assert_called_once()
+    mock_table.get_item.assert_not_called()
+    assert all(x is not None for x in results)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_get_by_id_batch_window_lazy(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   batch_window=0.01, lazy=True)
+
+    with patch.object(adapter, '_db') as mock_db:
+        mock_db.batch_get_item = MagicMock(return_value=dict(
+            Responses=dict(tabela=[dict(entity_id='a')])))
+        entity = adapter.get_by_id('a')
+        many = adapter.get_many(['a'])
+
+    assert type(entity) is not LazyEntity
+    assert type(many[0]) is LazyEntity
@@ -0,0 +1,127 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.codec import ItemCodec, ANY, \
+    FLOAT, SCALAR, STRING, shape_from_schema
+from decimal import Decimal
+from marshmallow import Schema, fields
+from math import pi
+from unittest.mock import MagicMock
+
+import gc
+import pytest
+
+
+class Endereco(Schema):
+    rua = fields.String()
+    latitude = fields.Float()
+    numero = fields.Integer()
+
+
+class Pessoa(Schema):
+    nome = fields.String()
+    altura = fields.Float(data_key='h')
+    ativo = fields.Boolean()
+    endereco = fields.Nested(Endereco)
+    enderecos = fields.Nested(Endereco, many=True)
+    notas = fields.List(fields.Float())
+    extras = fields.Dict()
+
+
+class Entity:
+    Schema = Pessoa
+
+
+SAMPLES = [
+    {'nome': 'Ana', 'h': 1.65, 'ativo': True, 'numero': 0,
+     'endereco': {'rua': 'A', 'latitude': -22.9, 'numero': 10},
+     'enderecos': [{'rua': '', 'latitude': 0.0}, {}, {'rua': 'B'}],
+     'notas': [7.5, 0.0, 10.0],
+     'extras': {'tags': {'a', ''}, 'pesos': [1.5, [2.5, '']], 'x': ''}},
+    {'nome': '', 'h': 'Float(1.8)', 'ativo': False, 'endereco': None,
+     'enderecos': 'não é lista', 'notas': [1, 'Float(2.5)', None],
+     'extras': [], 'desconhecido': {'valor': pi, 'vazio': []}},
+    {'h': 3, 'endereco': [1.5], 'notas': {'a': 1.5}, 'numero': 2.5},
+]
+
+
+@pytest.mark.parametrize('decimals', [False, True])
+@pytest.mark.parametrize('sample', SAMPLES)
+def test_codec_encode_matches_generic(sample, decimals):
+    codec = ItemCodec.for_class(Entity, decimals)
+    expected = BasicDynamodbAdapter._normalize_nodes(sample, decimals)
+
+    assert codec.encode(sample) == expected
+
+
+@pytest.mark.parametrize('decimals', [False, True])
+@pytest.mark.parametrize('sample', SAMPLES)
+def test_codec_decode_matches_generic(sample, decimals):
+    codec = ItemCodec.for_class(Entity, decimals)
+    stored = BasicDynamodbAdapter._normalize_nodes(sample, decimals)
+    stored['numero'] = Decimal('7')
+    stored['enderecos'] = [{'latitude': Decimal('1.5'), 'rua': 'Float(2)'}]
+    expected = BasicDynamodbAdapter._denormalize_floats(stored, decimals)
+
+    assert codec.decode(stored) == expected
+
+
+def test_shape_from_schema():
+    shape = shape_from_schema(Pessoa())
+    endereco = dict(rua=STRING, latitude=FLOAT, numero=SCALAR)
+
+    assert shape == dict(nome=STRING, h=FLOAT, ativo=SCALAR,
+                         endereco=endereco, enderecos=[endereco],
+                         notas=[FLOAT], extras=ANY)
+
+
+def test_codec_from_sample():
+    codec = ItemCodec.from_sample(SAMPLES[0])
+
+    for sample in SAMPLES:
+        assert codec.encode(sample) == \
+            BasicDynamodbAdapter._normalize_nodes(sample)
+
+
+def test_codec_for_class_cached():
+    assert ItemCodec.for_class(Entity) is ItemCodec.for_class(Entity)
+    assert ItemCodec.for_class(Entity) is not \
+        ItemCodec.for_class(Entity, decimals=True)
+    assert ItemCodec.for_class(MagicMock()) is None
+
+
+def test_codec_decimals_keeps_float_fields():
+    codec = ItemCodec.for_class(Entity, decimals=True)
+    stored = BasicDynamodbAdapter._normalize_nodes(
+        {'h': 2.0, 'notas': [3.0], 'endereco': {'latitude': 1.0,
+                                                'numero': 4}}, True)
+
+    result = codec.decode(stored)
+
+    assert type(result['h']) is float
+    assert type(result['notas'][0]) is float
+    assert type(result['endereco']['latitude']) is float
+    assert type(result['endereco']['numero']) is int
+
+
+def test_codec_restore_floats():
+    codec = ItemCodec.for_class(Entity, decimals=True)
+    item = {'nome': 'x', 'h': 2, 'notas': [1, 2.5], 'ativo': True,
+            'endereco': {'latitude': 0, 'numero': 3}, 'enderecos': None}
+
+    result = codec.restore_floats(item)
+
+    assert result == item
+    assert [type(x) for x in (result['h'], result['notas'][0],
+                              result['endereco']['latitude'])] == [float] * 3
+    assert type(result['endereco']['numero']) is int
+    assert ItemCodec.from_sample({'nome': 'x'}).restore_floats is None
+
+
+def test_codec_cache_releases_classes():
+    entity_class = type('Dinamica', (), {'Schema': Pessoa})
+    ItemCodec.for_class(entity_class)
+    assert entity_class in ItemCodec._cache
+
+    del entity_class
+    gc.collect()
+
+    assert not any(x.__name__ == 'Dinamica' for x in ItemCodec._cache)
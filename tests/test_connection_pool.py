@@ -0,0 +1,89 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.connection_pool import ConnectionPool
+from threading import Thread
+from unittest.mock import patch, MagicMock
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_resource_is_shared(mock_boto3):
+    pool = ConnectionPool()
+
+    first = pool.resource('http://localhost:8000', 'us-east-1')
+    second = pool.resource('http://localhost:8000', 'us-east-1')
+
+    assert first is second
+    mock_boto3.session.Session.assert_called_once_with(region_name='us-east-1')
+    mock_boto3.session.Session().resource.assert_called_once_with(
+        'dynamodb', endpoint_url='http://localhost:8000', config=pool.config)
+    assert pool.client('http://localhost:8000', 'us-east-1') is \
+        first.meta.client
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_resource_by_endpoint_and_region(mock_boto3):
+    mock_boto3.session.Session().resource.side_effect = \
+        lambda *args, **kwargs: MagicMock()
+    pool = ConnectionPool()
+
+    resources = {id(pool.resource(endpoint, region))
+                 for endpoint in (None, 'http://localhost:8000')
+                 for region in ('us-east-1', 'sa-east-1')}
+
+    assert len(resources) == 4
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_resource_per_thread_shares_client(mock_boto3):
+    mock_boto3.session.Session().resource.side_effect = \
+        lambda *args, **kwargs: MagicMock()
+    pool = ConnectionPool()
+    results = []
+
+    def use_pool():
+        results.append((pool.resource(), pool.resource(), pool.client()))
+
+    threads = [Thread(target=use_pool) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_boto3.session.Session().resource.assert_called_once()
+    assert all(first is second for first, second, _ in results)
+    assert len({id(first) for first, _, _ in results}) == 16
+    assert len({id(client) for _, _, client in results}) == 1
+
+
+def test_config():
+    pool = ConnectionPool(max_pool_connections=10, max_attempts=7,
+                          retry_mode='standard', connect_timeout=2)
+
+    assert pool.config.max_pool_connections == 10
+    assert pool.config.retries == dict(max_attempts=7, mode='standard')
+    assert pool.config.connect_timeout == 2
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.os')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_cleared_after_fork(mock_boto3, mock_os):
+    mock_os.getpid.return_value = 1
+    mock_boto3.session.Session().resource.side_effect = \
+        lambda *args, **kwargs: MagicMock()
+    pool = ConnectionPool()
+    parent = pool.resource()
+
+    mock_os.getpid.return_value = 2
+
+    assert pool.resource() is not parent
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_adapters_share_pool(mock_boto3):
+    pool = ConnectionPool()
+    adapters = [BasicDynamodbAdapter(f'tabela{i}', None, MagicMock(),
+                                     MagicMock(), connection_pool=pool)
+                for i in range(3)]
+
+    mock_boto3.session.Session().resource.assert_called_once()
+    assert len({id(x._db) for x in adapters}) == 1
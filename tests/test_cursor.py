@@ -0,0 +1,89 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.cursor import CursorCodec
+from decimal import Decimal
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+KEY = dict(entity_id='abc', numero=Decimal('42'))
+CHAVE = 'segredo'
+
+
+def test_cursor_roundtrip():
+    codec = CursorCodec(CHAVE)
+    cursor = codec.encode(KEY, 'tabela/')
+
+    assert set(cursor) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnop'
+                              'qrstuvwxyz0123456789-_.')
+    assert CursorCodec(CHAVE.encode()).decode(cursor, 'tabela/') == KEY
+    assert codec.encode(None) is None
+    assert codec.decode(None) is None
+
+
+@pytest.mark.parametrize('tamper', [
+    lambda c: c.replace(c[0], 'A' if c[0] != 'A' else 'B', 1),
+    lambda c: c.split('.')[0],
+    lambda c: c + '.x',
+    lambda c: 'não é um cursor',
+])
+def test_cursor_tampered(tamper):
+    codec = CursorCodec(CHAVE)
+
+    with raises(ValueError) as excinfo:
+        codec.decode(tamper(codec.encode(KEY)))
+
+    assert 'Cursor inválido' == str(excinfo.value)
+
+
+def test_cursor_context_and_secret():
+    cursor = CursorCodec(CHAVE).encode(KEY, 'tabela/')
+
+    with raises(ValueError):
+        CursorCodec(CHAVE).decode(cursor, 'tabela/email-index')
+    with raises(ValueError):
+        CursorCodec('outro').decode(cursor, 'tabela/')
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_page(mock_boto3):
+    dummy_class = MagicMock()
+    adapter = BasicDynamodbAdapter('tabela', None, dummy_class, MagicMock(),
+                                   cursor_secret=CHAVE)
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(side_effect=[
+            dict(Items=[dict(entity_id='a'), dict(entity_id='b')],
+                 LastEvaluatedKey=dict(entity_id='b')),
+            dict(Items=[dict(entity_id='c')])])
+        first = adapter.page(2)
+        second = adapter.page(2, cursor=first.cursor)
+
+    assert len(first.items) == 2
+    assert first.cursor is not None
+    assert len(second.items) == 1
+    assert second.cursor is None
+    assert mock.scan.call_args_list[0][1] == dict(Limit=2)
+    assert mock.scan.call_args_list[1][1] == dict(
+        Limit=2, ExclusiveStartKey=dict(entity_id='b'))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_page_filtered(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(
+            Items=[dict(valor='Float(1.5)')],
+            LastEvaluatedKey=dict(entity_id='x')))
+        page = adapter.page(10, result='dict', campo__eq=1)
+
+        assert page.items == [dict(valor=1.5)]
+        assert mock.scan.call_args[1]['Limit'] == 10
+        assert mock.scan.call_args[1]['FilterExpression'] == '#f0 = :f0'
+
+    other = BasicDynamodbAdapter('outra', None, MagicMock(), MagicMock())
+    with raises(ValueError):
+        other.page(10, cursor=page.cursor)
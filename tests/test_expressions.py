@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from clean_architecture_dynamodb_adapter.expressions import \
+    ExpressionError, apply_update, matches, project
+from pytest import mark, raises
+
+ITEM = dict(entity_id='1', name='maria', age=Decimal(30),
+            tags={'a', 'b'}, address=dict(city='Recife'),
+            scores=[Decimal(1), Decimal(2)], active=True)
+
+
+@mark.parametrize('expression, expected', [
+    ('age = :n', False),
+    ('age <> :n', True),
+    ('age > :n', True),
+    ('age BETWEEN :n AND :m', True),
+    ('age IN (:n, :m)', False),
+    ('begins_with(#n, :s)', True),
+    ('contains(tags, :t)', True),
+    ('contains(#n, :m)', False),
+    ('attribute_exists(address.city)', True),
+    ('attribute_not_exists(missing)', True),
+    ('attribute_type(tags, :ss)', True),
+    ('size(scores) = :two', True),
+    ('scores[1] = :two', True),
+    ('missing <> :n', True),
+    ('missing < :n', False),
+    ('#n > :n', False),
+    ('NOT (age > :n) OR #n = :maria', True),
+    ('age > :n AND (active = :false OR contains(tags, :t))', True),
+])
+def test_matches(expression, expected):
+    values = {':n': 18, ':m': 40, ':s': 'ma', ':t': 'a', ':ss': 'SS',
+              ':two': 2, ':maria': 'maria', ':false': False}
+    assert matches(expression, ITEM, {'#n': 'name'}, values) is expected
+
+
+@mark.parametrize('expression', [
+    'age = ', 'age == :n', 'age = :undefined', '#undefined = :n',
+    'begins_with(age)', 'scores[x] = :n'])
+def test_invalid_conditions(expression):
+    with raises(ExpressionError):
+        matches(expression, ITEM, {}, {':n': 1})
+
+
+def test_project():
+    assert project('#n, address.city, scores[1], missing', ITEM,
+                   {'#n': 'name'}) == dict(name='maria',
+                                           address=dict(city='Recife'),
+                                           scores=[Decimal(2)])
+
+
+def test_apply_update():
+    item = dict(entity_id='1', count=Decimal(1), tags={'a'},
+                old='x', items=[Decimal(1)], nested=dict(a=1))
+
+    apply_update('SET #c = #c + :one, new_value = if_not_exists(missing, '
+                 ':zero), items = list_append(items, :list), nested.b = :one '
+                 'REMOVE old ADD tags :tags, total :one DELETE gone :a',
+                 item, {'#c': 'count'},
+                 {':one': 1, ':zero': 0, ':list': [Decimal(2)],
+                  ':tags': {'b'}, ':a': {'a'}})
+
+    assert item == dict(entity_id='1', count=2, tags={'a', 'b'}, total=1,
+                        new_value=0, items=[1, 2], nested=dict(a=1, b=1))
+
+
+def test_update_uses_original_values():
+    item = dict(a=Decimal(1), b=Decimal(2))
+    apply_update('SET a = b, b = a', item)
+    assert item == dict(a=2, b=1)
+
+
+@mark.parametrize('expression', [
+    'SET a = b + :s', 'ADD a :s', 'SET missing.child = :n', 'UPSERT a = :n',
+    'SET a = list_append(a, :n)', 'SET a = :n REMOVE #a'])
+def test_invalid_updates(expression):
+    with raises(ExpressionError):
+        apply_update(expression, dict(a=Decimal(1), b=Decimal(2)),
+                     {'#a': 'a'},
+                     {':s': 'x', ':n': 1})
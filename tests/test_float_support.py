@@ -1,3 +1,8 @@
+from botocore.exceptions import ClientError
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from decimal import Decimal
+from math import inf, pi
+from pytest import raises
 from tests.conftest import AdapterFactory
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
@@ -9,7 +14,7 @@ import pytest
 class TestFloatValue(TestCase):
     def setUp(self):
         self.patch_boto3 = patch('clean_architecture_dynamodb_adapter.'
-                                 'basic_dynamodb_adapter.boto3')
+                                 'connection_pool.boto3')
         self.mock_boto3 = self.patch_boto3.start()
 
     def tearDown(self):
@@ -25,7 +30,7 @@ class TestFloatValue(TestCase):
         entity.save()
 
         mock_uuid4.assert_called_once()
-        mock_table = self.mock_boto3.resource().Table()
+        mock_table = self.mock_boto3.session.Session().resource().Table()
         mock_table.put_item.assert_called_with(
             Item={
                 'float_value': f'Float({value})',
@@ -41,7 +46,7 @@ class TestFloatValue(TestCase):
         fac: AdapterFactory = self.factory()
         mock_entity_id = MagicMock()
 
-        mock_table = self.mock_boto3.resource().Table()
+        mock_table = self.mock_boto3.session.Session().resource().Table()
         mock_table.get_item = MagicMock(return_value=expected_scan_result)
 
         entity = fac.adapter.get_by_id(mock_entity_id)
@@ -57,10 +62,116 @@ class TestFloatValue(TestCase):
         }
         fac: AdapterFactory = self.factory()
 
-        mock_table = self.mock_boto3.resource().Table()
+        mock_table = self.mock_boto3.session.Session().resource().Table()
         mock_table.scan = MagicMock(return_value=expected_scan_result)
 
         entities = fac.adapter.list_all()
 
         self.assertEqual(entities[0].float_value, value1)
         self.assertEqual(entities[1].float_value, value2)
+
+
+# noinspection PyProtectedMember
+def test_normalize_nodes_decimals():
+    arg = {'valor': 10 / 3.0, 'lista': [0.1, 'x'], 'infinito': inf}
+    result = BasicDynamodbAdapter._normalize_nodes(arg, decimals=True)
+
+    assert result == {'valor': Decimal('3.3333333333333335'),
+                      'lista': [Decimal('0.1'), 'x'],
+                      'infinito': 'Float(inf)'}
+
+
+# noinspection PyProtectedMember
+def test_normalize_nodes_decimals_out_of_range():
+    arg = [1e300, -1e300, 1e-200, 5e-324, 1e-130, 9.99e125, 0.0]
+    result = BasicDynamodbAdapter._normalize_nodes(arg, decimals=True)
+
+    assert result == ['Float(1e+300)', 'Float(-1e+300)', 'Float(1e-200)',
+                      'Float(5e-324)', Decimal('1e-130'), Decimal('9.99e125')]
+    assert BasicDynamodbAdapter._denormalize_floats(result[:4], True) == \
+        arg[:4]
+
+
+# noinspection PyProtectedMember
+def test_denormalize_floats_reads_both_formats():
+    arg = {'novo': Decimal('3.3333333333333335'),
+           'antigo': 'Float(3.3333333333333335)',
+           'inteiro': Decimal('42'),
+           'lista': [Decimal('0.5'), 'Float(0.25)']}
+    result = BasicDynamodbAdapter._denormalize_floats(arg, decimals=True)
+
+    assert result == {'novo': 10 / 3.0,
+                      'antigo': 10 / 3.0,
+                      'inteiro': 42,
+                      'lista': [0.5, 0.25]}
+    assert type(result['inteiro']) is int
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_decimal_storage(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   float_storage='decimal')
+
+    with patch.object(adapter, '_table') as mock:
+        adapter.save(dict(entity_id='meu_id', valor=pi))
+
+    mock.put_item.assert_called_with(Item=dict(entity_id='meu_id',
+                                               valor=Decimal(repr(pi))))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_decimal_storage(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   float_storage='decimal')
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan.return_value = dict(Items=[])
+        adapter.filter(valor__between=[0.5, 1.5])
+
+    values = mock.scan.call_args[1]['ExpressionAttributeValues']
+    assert values == {':f0': Decimal('0.5'), ':f1': Decimal('1.5')}
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_rewrite_float_storage(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   float_storage='decimal')
+    items = [dict(entity_id='a', valor='Float(0.5)', nome='x'),
+             dict(entity_id='b', valor=Decimal('0.5')),
+             dict(entity_id='c', mapa=dict(valor='Float(0.25)')),
+             dict(entity_id='d', valor='Float(1.5)')]
+    conflict = ClientError(
+        error_response=dict(Error=dict(Code='ConditionalCheckFailedException',
+                                       Message='oops')),
+        operation_name='UpdateItem')
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(Items=items))
+        mock.update_item = MagicMock(side_effect=[None, None, conflict])
+        result = adapter.rewrite_float_storage(max_workers=1)
+
+    assert result == 2
+    assert mock.update_item.call_count == 3
+    first = mock.update_item.call_args_list[0][1]
+    assert first == dict(
+        Key=dict(entity_id='a'),
+        UpdateExpression='SET #a0 = :n0',
+        ConditionExpression='#a0 = :o0',
+        ExpressionAttributeNames={'#a0': 'valor'},
+        ExpressionAttributeValues={':n0': Decimal('0.5'),
+                                   ':o0': 'Float(0.5)'})
+    second = mock.update_item.call_args_list[1][1]
+    assert second['ExpressionAttributeValues'][':n0'] == \
+        dict(valor=Decimal('0.25'))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_rewrite_float_storage_requires_decimal(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with raises(ValueError):
+        adapter.rewrite_float_storage()
@@ -0,0 +1,295 @@
+from boto3.dynamodb.conditions import Key
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    GlobalSecondaryIndex, LocalSecondaryIndex, Q
+from clean_architecture_dynamodb_adapter.indexes import plan_query, \
+    table_definition
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+EMAIL = GlobalSecondaryIndex('email-index', 'email')
+STATUS = GlobalSecondaryIndex('status-index', 'status', 'criado_em',
+                              projection='KEYS_ONLY')
+DATA = LocalSecondaryIndex('data-index', 'data')
+INDEXES = (EMAIL, STATUS, DATA)
+
+
+def test_plan_single_eq_on_gsi():
+    plan = plan_query([('email', 'eq', ['a@b.c'])], INDEXES)
+
+    assert plan.is_query
+    assert plan.index is EMAIL
+    assert plan.filter_conditions == []
+
+
+def test_plan_entity_id_uses_table():
+    plan = plan_query([('entity_id', 'eq', ['x'])], INDEXES)
+
+    assert plan.is_query
+    assert plan.index_name is None
+
+
+def test_plan_or_scans():
+    plan = plan_query([('email', 'eq', ['a']), ('nome', 'eq', ['b'])],
+                      INDEXES)
+
+    assert not plan.is_query
+    assert plan.describe()['reason'] == 'condições combinadas com OU'
+
+
+def test_plan_non_key_operator_scans():
+    assert not plan_query([('email', 'begins_with', ['a'])], INDEXES).is_query
+
+
+def test_plan_conjunctive_uses_range_key():
+    conditions = [('nome', 'eq', ['x']), ('entity_id', 'eq', ['e']),
+                  ('data', 'gt', ['2020'])]
+    plan = plan_query(conditions, INDEXES, conjunctive=True)
+
+    assert plan.index is DATA
+    assert plan.describe()['key_conditions'] == ['entity_id__eq',
+                                                 'data__gt']
+    assert plan.describe()['filter_conditions'] == ['nome__eq']
+
+
+def test_plan_respects_gsi_projection():
+    conditions = [('status', 'eq', ['ativo'])]
+
+    assert not plan_query(conditions, INDEXES).is_query
+    assert not plan_query(conditions, INDEXES,
+                          fields=['status', 'nome']).is_query
+    plan = plan_query(conditions, INDEXES, fields=['status', 'entity_id'])
+    assert plan.index is STATUS
+
+
+def test_plan_merges_range_bounds_into_between():
+    conditions = [('status', 'eq', ['a']), ('criado_em', 'lte', [3]),
+                  ('criado_em', 'gte', [1])]
+    plan = plan_query(conditions, INDEXES, conjunctive=True, fields=[])
+
+    assert plan.index is STATUS
+    assert plan.key_conditions == [('status', 'eq', ['a']),
+                                   ('criado_em', 'between', (1, 3))]
+    assert plan.filter_conditions == []
+
+
+def test_plan_rejects_index_with_key_attribute_in_filter():
+    conditions = [('status', 'eq', ['a']), ('criado_em', 'gt', [1]),
+                  ('criado_em', 'lt', [3])]
+    plan = plan_query(conditions, INDEXES, conjunctive=True, fields=[])
+
+    assert not plan.is_query
+
+    conditions = [('email', 'eq', ['a']),
+                  Q._node('OR', [('email', 'eq', ['b']), ('x', 'eq', [1])])]
+    assert not plan_query(conditions, INDEXES, conjunctive=True).is_query
+
+
+def test_plan_requires_condition_attributes_in_index():
+    conditions = [('status', 'eq', ['a']), ('nome', 'eq', ['b'])]
+
+    assert not plan_query(conditions, INDEXES, conjunctive=True,
+                          fields=[]).is_query
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_count_uses_keys_only_index(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=INDEXES)
+
+    with patch.object(adapter, '_table') as mock:
+        mock.query = MagicMock(return_value=dict(Count=2))
+        assert adapter.count(status__eq='a', criado_em__gte=1,
+                             criado_em__lte=3, mode='and') == 2
+
+    kwargs = mock.query.call_args[1]
+    assert kwargs['IndexName'] == 'status-index'
+    assert 'FilterExpression' not in kwargs
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_routes_to_query(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=INDEXES)
+
+    with patch.object(adapter, '_table') as mock:
+        mock.query = MagicMock(return_value=dict(Items=[]))
+        adapter.filter(email__eq='a@b.c')
+
+    mock.scan.assert_not_called()
+    mock.query.assert_called_once_with(
+        Select='ALL_ATTRIBUTES',
+        KeyConditionExpression=Key('email').eq('a@b.c'),
+        IndexName='email-index')
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_falls_back_to_scan(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=INDEXES)
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(Items=[]))
+        adapter.filter(email__eq='a@b.c', nome__eq='x')
+
+    mock.query.assert_not_called()
+    mock.scan.assert_called_once_with(
+        Select='ALL_ATTRIBUTES',
+        FilterExpression='(#f0 = :f0 OR #f1 = :f1)',
+        ExpressionAttributeNames={'#f0': 'email', '#f1': 'nome'},
+        ExpressionAttributeValues={':f0': 'a@b.c', ':f1': 'x'})
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_query_fast_reads(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=INDEXES, fast_reads=True)
+
+    with patch.object(adapter, '_client') as mock:
+        mock.query = MagicMock(return_value=dict(Items=[]))
+        adapter.filter(email__eq='a@b.c')
+
+    mock.query.assert_called_once_with(
+        TableName='tabela',
+        Select='ALL_ATTRIBUTES',
+        IndexName='email-index',
+        KeyConditionExpression='#n0 = :v0',
+        ExpressionAttributeNames={'#n0': 'email'},
+        ExpressionAttributeValues={':v0': {'S': 'a@b.c'}})
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_explain(mock_boto3):
+    class Adapter(BasicDynamodbAdapter):
+        INDEXES = (EMAIL,)
+
+    adapter = Adapter('tabela', None, MagicMock(), MagicMock())
+
+    assert adapter.explain(email__eq='a') == dict(
+        operation='Query', index_name='email-index',
+        key_conditions=['email__eq'], filter_conditions=[],
+        reason='igualdade na chave de partição')
+    assert adapter.explain(nome__eq='a')['operation'] == 'Scan'
+
+
+def test_table_definition_default():
+    assert table_definition('tabela', (), 'PROVISIONED', dict(
+        ReadCapacityUnits=5, WriteCapacityUnits=5)) == dict(
+        TableName='tabela',
+        KeySchema=[dict(AttributeName='entity_id', KeyType='HASH')],
+        AttributeDefinitions=[dict(AttributeName='entity_id',
+                                   AttributeType='S')],
+        BillingMode='PROVISIONED',
+        ProvisionedThroughput=dict(ReadCapacityUnits=5,
+                                   WriteCapacityUnits=5))
+
+
+def test_table_definition_on_demand_with_indexes():
+    numero = GlobalSecondaryIndex('numero-index', 'numero',
+                                  hash_key_type='N', projection='INCLUDE',
+                                  non_key_attributes=['nome'])
+    definition = table_definition('tabela', (numero, DATA),
+                                  'PAY_PER_REQUEST', None)
+
+    assert definition['BillingMode'] == 'PAY_PER_REQUEST'
+    assert 'ProvisionedThroughput' not in definition
+    assert definition['AttributeDefinitions'] == [
+        dict(AttributeName='entity_id', AttributeType='S'),
+        dict(AttributeName='numero', AttributeType='N'),
+        dict(AttributeName='data', AttributeType='S')]
+    assert definition['GlobalSecondaryIndexes'] == [dict(
+        IndexName='numero-index',
+        KeySchema=[dict(AttributeName='numero', KeyType='HASH')],
+        Projection=dict(ProjectionType='INCLUDE',
+                        NonKeyAttributes=['nome']))]
+    assert definition['LocalSecondaryIndexes'] == [dict(
+        IndexName='data-index',
+        KeySchema=[dict(AttributeName='entity_id', KeyType='HASH'),
+                   dict(AttributeName='data', KeyType='RANGE')],
+        Projection=dict(ProjectionType='ALL'))]
+
+
+def test_table_definition_gsi_throughput():
+    index = GlobalSecondaryIndex('x', 'x', read_capacity=20)
+    definition = table_definition('tabela', (index,), 'PROVISIONED', dict(
+        ReadCapacityUnits=5, WriteCapacityUnits=5))
+
+    assert definition['GlobalSecondaryIndexes'][0][
+        'ProvisionedThroughput'] == dict(ReadCapacityUnits=20,
+                                         WriteCapacityUnits=5)
+
+
+def test_table_definition_invalid():
+    with raises(ValueError) as excinfo:
+        table_definition('tabela', (), 'OOPS', None)
+    assert 'billing_mode inválido: OOPS' == str(excinfo.value)
+
+    conflicting = GlobalSecondaryIndex('y', 'email', hash_key_type='N')
+    with raises(ValueError):
+        table_definition('tabela', (EMAIL, conflicting), 'PROVISIONED', None)
+
+
+def describe(*indexes, billing='PAY_PER_REQUEST'):
+    return dict(Table=dict(
+        TableStatus='ACTIVE',
+        BillingModeSummary=dict(BillingMode=billing),
+        GlobalSecondaryIndexes=[dict(IndexName=name, IndexStatus=status)
+                                for name, status in indexes]))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.indexes.sleep')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_reconcile_indexes(mock_boto3, mock_sleep):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=INDEXES)
+    new = GlobalSecondaryIndex('novo-index', 'novo')
+    adapter._indexes += (new,)
+
+    with patch.object(adapter, '_client') as mock:
+        mock.describe_table = MagicMock(side_effect=[
+            describe(('email-index', 'ACTIVE')),
+            describe(('status-index', 'CREATING')),
+            describe(('status-index', 'ACTIVE')),
+            describe(('novo-index', 'ACTIVE'))])
+        created = adapter.reconcile_indexes()
+
+    assert created == ['status-index', 'novo-index']
+    assert mock.update_table.call_count == 2
+    mock.update_table.assert_called_with(
+        TableName='tabela',
+        AttributeDefinitions=[
+            dict(AttributeName='entity_id', AttributeType='S'),
+            dict(AttributeName='novo', AttributeType='S')],
+        GlobalSecondaryIndexUpdates=[dict(Create=dict(
+            IndexName='novo-index',
+            KeySchema=[dict(AttributeName='novo', KeyType='HASH')],
+            Projection=dict(ProjectionType='ALL')))])
+    mock_sleep.assert_called_once()
+    adapter.logger.warning.assert_called_once()
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.indexes.sleep')
+@patch('clean_architecture_dynamodb_adapter.indexes.monotonic')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_reconcile_indexes_timeout(mock_boto3, mock_monotonic, mock_sleep):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   indexes=(EMAIL,))
+    mock_monotonic.side_effect = [0, 5, 11]
+
+    with patch.object(adapter, '_client') as mock:
+        responses = [describe(('email-index', 'CREATING'))] * 3
+        mock.describe_table = MagicMock(side_effect=[
+            describe(billing='PROVISIONED'), *responses])
+        with raises(BasicDynamodbAdapter.DynamodbAdapterIndexException):
+            adapter.reconcile_indexes(timeout=10)
+
+    create = mock.update_table.call_args[1][
+        'GlobalSecondaryIndexUpdates'][0]['Create']
+    assert create['ProvisionedThroughput'] == dict(ReadCapacityUnits=5,
+                                                   WriteCapacityUnits=5)
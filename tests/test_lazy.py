@@ -0,0 +1,88 @@
+from clean_architecture_basic_classes.basic_domain.basic_entity import \
+    BasicEntity
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    LazyEntity
+from clean_architecture_dynamodb_adapter.lazy import is_hydrated
+from unittest.mock import patch, MagicMock
+
+
+class Produto(BasicEntity):
+    def __init__(self, nome, preco, entity_id=None):
+        super().__init__(entity_id)
+        self.nome = nome
+        self.preco = preco
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['nome'], data['preco'], data['entity_id'])
+
+
+ITEM = dict(entity_id='p1', nome='caneta', preco='Float(2.5)')
+
+
+def _hydrate(item):
+    return Produto.from_json(BasicDynamodbAdapter._denormalize_floats(item))
+
+
+def test_lazy_entity_hydrates_on_first_access():
+    hydrate = MagicMock(side_effect=_hydrate)
+    proxy = LazyEntity(Produto, dict(ITEM), hydrate)
+
+    assert isinstance(proxy, Produto)
+    assert proxy.__class__ is Produto
+    assert proxy.entity_id == 'p1'
+    assert not is_hydrated(proxy)
+    hydrate.assert_not_called()
+
+    assert proxy.preco == 2.5
+    assert proxy.nome == 'caneta'
+    assert is_hydrated(proxy)
+    hydrate.assert_called_once()
+
+
+def test_lazy_entity_delegates():
+    proxy = LazyEntity(Produto, dict(ITEM), _hydrate)
+    other = LazyEntity(Produto, dict(ITEM), _hydrate)
+
+    assert proxy == other
+    assert proxy == _hydrate(dict(ITEM))
+    assert hash(proxy) == hash('p1')
+    proxy.nome = 'lápis'
+    assert proxy.nome == 'lápis'
+    assert 'nome' in dir(proxy)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_list_all_lazy(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, Produto, MagicMock(),
+                                   lazy=True)
+
+    with patch.object(adapter, '_table') as mock, \
+            patch.object(Produto, 'from_json',
+                         side_effect=Produto.from_json) as from_json:
+        mock.scan = MagicMock(return_value=dict(Items=[dict(ITEM)]))
+        result = adapter.list_all()
+
+        assert isinstance(result[0], Produto)
+        from_json.assert_not_called()
+        assert result[0].preco == 2.5
+        from_json.assert_called_once()
+
+    assert result[0].adapter is adapter
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_get_many_lazy(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, Produto, MagicMock(),
+                                   lazy=True)
+
+    with patch.object(adapter, '_db') as mock:
+        mock.batch_get_item = MagicMock(return_value=dict(
+            Responses=dict(tabela=[dict(ITEM)])))
+        result = adapter.get_many(['p1', 'p2'])
+
+    assert result[1] is None
+    assert not is_hydrated(result[0])
+    assert result[0].preco == 2.5
@@ -0,0 +1,94 @@
+import logging
+
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.logs import Payload, debug_enabled
+from unittest.mock import patch, MagicMock
+
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError('serializado com o debug desligado')
+
+
+def test_payload_truncates():
+    assert str(Payload(dict(a=1))) == "{'a': 1}"
+    assert str(Payload('x' * 20, limit=5)) == 'xxxxx... (20 caracteres)'
+    assert str(Payload('x' * 20, limit=None)) == 'x' * 20
+
+
+def test_debug_enabled():
+    logger = logging.getLogger('test_logs.sample')
+    logger.setLevel(logging.DEBUG)
+    assert debug_enabled(logger)
+    assert not debug_enabled(logger, sample_rate=0)
+    logger.setLevel(logging.INFO)
+    assert not debug_enabled(logger)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_skips_payload_without_debug(mock_boto3):
+    logger = logging.getLogger('test_logs.info')
+    logger.setLevel(logging.INFO)
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), logger)
+
+    with patch.object(adapter, '_table'):
+        with patch.object(adapter, '_encode', lambda x: x):
+            assert adapter.save(dict(entity_id='x', data=Unprintable())) \
+                == 'x'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_save_debug_messages(mock_boto3, caplog):
+    logger = logging.getLogger('test_logs.debug')
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), logger,
+                                   log_payload_limit=60)
+
+    with caplog.at_level(logging.DEBUG, logger='test_logs.debug'):
+        with patch.object(adapter, '_table'):
+            adapter.save(dict(entity_id='x', vazio='', texto='y' * 100))
+
+    received, cleaned, called, saved = caplog.records
+    assert "'vazio': ''" in received.getMessage()
+    assert 'caracteres' in received.getMessage()
+    assert 'vazio' not in cleaned.getMessage()
+    assert (called.table, called.duration_ms >= 0) == ('tabela', True)
+    assert (saved.operation, saved.table, saved.entity_id) == \
+        ('save', 'tabela', 'x')
+    assert saved.duration_ms >= 0
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_every_call_is_timed(mock_boto3, caplog):
+    logger = logging.getLogger('test_logs.calls')
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), logger)
+
+    with caplog.at_level(logging.DEBUG, logger='test_logs.calls'):
+        with patch.object(adapter, '_table') as mock:
+            mock.get_item.__name__ = 'get_item'
+            mock.delete_item.__name__ = 'delete_item'
+            mock.scan = MagicMock(__name__='scan', return_value=dict(Items=[]))
+            adapter.get_by_id('x')
+            adapter.delete('x')
+            adapter.list_all()
+
+    timed = [(x.operation, x.table) for x in caplog.records
+             if hasattr(x, 'duration_ms')]
+    assert timed == [('get_item', 'tabela'), ('delete_item', 'tabela'),
+                     ('scan', 'tabela')]
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_calls_not_timed_without_debug(mock_boto3):
+    logger = logging.getLogger('test_logs.quiet')
+    logger.setLevel(logging.INFO)
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), logger)
+
+    with patch.object(adapter, '_timed_call') as timed:
+        with patch.object(adapter, '_table'):
+            adapter.get_by_id('x')
+
+    timed.assert_not_called()
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from clean_architecture_basic_classes import BasicEntity
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    GlobalSecondaryIndex, InMemoryBackend, Q
+from marshmallow import fields, post_load
+from pytest import fixture, raises
+from typing import Optional
+from unittest.mock import MagicMock
+
+
+class Person(BasicEntity):
+    def __init__(self, name: str, age: int, height: float,
+                 entity_id: Optional[str] = None):
+        super().__init__(entity_id=entity_id)
+        self.name = name
+        self.age = age
+        self.height = height
+
+    class Schema(BasicEntity.Schema):
+        name = fields.String(required=True)
+        age = fields.Integer(required=True)
+        height = fields.Float(required=True)
+
+        @post_load
+        def on_load(self, data, many, partial):
+            return Person(**data)
+
+
+@fixture
+def backend():
+    return InMemoryBackend()
+
+
+@fixture
+def table(backend):
+    resource = backend.resource()
+    resource.create_table(
+        TableName='pessoas',
+        KeySchema=[dict(AttributeName='entity_id', KeyType='HASH')],
+        AttributeDefinitions=[dict(AttributeName='entity_id',
+                                   AttributeType='S')],
+        GlobalSecondaryIndexes=[dict(
+            IndexName='by_name',
+            KeySchema=[dict(AttributeName='name', KeyType='HASH'),
+                       dict(AttributeName='age', KeyType='RANGE')],
+            Projection=dict(ProjectionType='KEYS_ONLY'))],
+        BillingMode='PAY_PER_REQUEST')
+    table = resource.Table('pessoas')
+    for i in range(10):
+        table.put_item(Item=dict(entity_id=str(i), name=f'nome{i % 2}',
+                                 age=i, tags={'a'}))
+    return table
+
+
+def adapter_for(backend, **kwargs):
+    return BasicDynamodbAdapter('pessoas', None, Person, MagicMock(),
+                                connection_pool=backend, **kwargs)
+
+
+def error_code(info):
+    return info.value.response['Error']['Code']
+
+
+def test_get_put_delete(table):
+    assert table.get_item(Key=dict(entity_id='3'))['Item'] == dict(
+        entity_id='3', name='nome1', age=Decimal(3), tags={'a'})
+    assert 'Item' not in table.get_item(Key=dict(entity_id='x'))
+
+    old = table.delete_item(Key=dict(entity_id='3'), ReturnValues='ALL_OLD')
+    assert old['Attributes']['age'] == 3
+    assert 'Item' not in table.get_item(Key=dict(entity_id='3'))
+
+
+def test_items_are_copied(table):
+    item = table.get_item(Key=dict(entity_id='1'))['Item']
+    item['tags'].add('b')
+    assert table.get_item(Key=dict(entity_id='1'))['Item']['tags'] == {'a'}
+
+
+def test_validation_errors(table):
+    with raises(ClientError) as info:
+        table.get_item(Key=dict(name='x'))
+    assert error_code(info) == 'ValidationException'
+    with raises(ClientError) as info:
+        table.scan(FilterExpression='age >>')
+    assert error_code(info) == 'ValidationException'
+    with raises(TypeError):
+        table.put_item(Item=dict(entity_id='x', value=1.5))
+
+
+def test_missing_table(backend):
+    with raises(ClientError) as info:
+        backend.resource().Table('outra').scan()
+    assert error_code(info) == 'ResourceNotFoundException'
+    assert info.value.operation_name == 'Scan'
+
+
+def test_conditional_writes(table):
+    with raises(ClientError) as info:
+        table.put_item(Item=dict(entity_id='1'),
+                       ConditionExpression=Attr('entity_id').not_exists())
+    assert error_code(info) == 'ConditionalCheckFailedException'
+
+    response = table.update_item(
+        Key=dict(entity_id='1'), UpdateExpression='SET age = age + :n',
+        ConditionExpression='age = :old',
+        ExpressionAttributeValues={':n': 10, ':old': 1},
+        ReturnValues='UPDATED_NEW')
+    assert response['Attributes'] == dict(age=11)
+
+    with raises(ClientError) as info:
+        table.update_item(Key=dict(entity_id='1'),
+                          UpdateExpression='SET entity_id = :x',
+                          ExpressionAttributeValues={':x': 'y'})
+    assert error_code(info) == 'ValidationException'
+
+
+def test_scan_filter_and_pagination(table):
+    response = table.scan(FilterExpression=Attr('age').gte(4), Limit=3)
+    assert response['ScannedCount'] == 3
+    keys = [x['entity_id'] for x in response['Items']]
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(FilterExpression=Attr('age').gte(4), Limit=3,
+                              ExclusiveStartKey=response['LastEvaluatedKey'])
+        keys.extend(x['entity_id'] for x in response['Items'])
+    assert sorted(keys) == ['4', '5', '6', '7', '8', '9']
+
+    response = table.scan(Select='COUNT', FilterExpression='#n = :n',
+                          ExpressionAttributeNames={'#n': 'name'},
+                          ExpressionAttributeValues={':n': 'nome0'})
+    assert (response['Count'], response['ScannedCount']) == (5, 10)
+    assert 'Items' not in response
+
+
+def test_parallel_scan_segments(table):
+    keys = [x['entity_id']
+            for segment in range(3)
+            for x in table.scan(Segment=segment, TotalSegments=3)['Items']]
+    assert sorted(keys) == [str(i) for i in range(10)]
+
+
+def test_query_index(table):
+    key_condition = Key('name').eq('nome1') & Key('age').gt(4)
+    response = table.query(IndexName='by_name',
+                           KeyConditionExpression=key_condition,
+                           ScanIndexForward=False)
+
+    assert response['Items'] == [dict(entity_id='9', name='nome1', age=9),
+                                 dict(entity_id='7', name='nome1', age=7),
+                                 dict(entity_id='5', name='nome1', age=5)]
+
+
+def test_batch_operations(backend, table):
+    resource = backend.resource()
+    resource.batch_write_item(RequestItems=dict(pessoas=[
+        dict(PutRequest=dict(Item=dict(entity_id='x', age=1))),
+        dict(DeleteRequest=dict(Key=dict(entity_id='0')))]))
+
+    response = resource.batch_get_item(RequestItems=dict(pessoas=dict(
+        Keys=[dict(entity_id='x'), dict(entity_id='0')])))
+
+    assert response['Responses']['pessoas'] == [dict(entity_id='x', age=1)]
+    assert response['UnprocessedKeys'] == {}
+    with raises(ClientError):
+        resource.batch_write_item(RequestItems=dict(pessoas=[
+            dict(DeleteRequest=dict(Key=dict(entity_id='1'))),
+            dict(DeleteRequest=dict(Key=dict(entity_id='1')))]))
+
+
+def test_client_wire_format(backend, table):
+    client = backend.client()
+
+    response = client.get_item(TableName='pessoas',
+                               Key=dict(entity_id=dict(S='2')))
+
+    assert response['Item']['age'] == dict(N='2')
+    assert client.describe_table(TableName='pessoas')['Table'][
+        'GlobalSecondaryIndexes'][0]['IndexStatus'] == 'ACTIVE'
+
+
+def test_thread_safety(table):
+    def increment(_):
+        table.update_item(Key=dict(entity_id='counter'),
+                          UpdateExpression='ADD hits :one',
+                          ExpressionAttributeValues={':one': 1})
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(increment, range(200)))
+
+    assert table.get_item(Key=dict(entity_id='counter'))['Item']['hits'] \
+        == 200
+
+
+def test_adapter_on_memory_backend(backend):
+    adapter = adapter_for(backend, float_storage='decimal',
+                          indexes=[GlobalSecondaryIndex('by_name', 'name')])
+    # Zeros are dropped by save(), so ages start at one.
+    adapter.save_many([dict(entity_id=str(i), name=f'nome{i % 3}',
+                            age=i + 1, height=1.5 + i) for i in range(30)])
+
+    assert adapter.get_by_id('4').height == 5.5
+    assert len(adapter.list_all()) == 30
+    assert adapter.explain(name__eq='nome1')['operation'] == 'Query'
+    assert {x.entity_id for x in adapter.filter(name__eq='nome1',
+                                                age__lt=7, mode='and')} \
+        == {'1', '4'}
+    assert adapter.count(Q(age__gte=20) | Q(name__eq='nome0')) == 18
+    assert adapter.aggregate('max', 'height') == 30.5
+
+    first = adapter.page(20)
+    second = adapter.page(20, cursor=first.cursor)
+    assert len(first.items) + len(second.items) == 30
+    assert second.cursor is None
+
+    assert adapter.delete('4') == '4'
+    assert adapter.get_by_id('4') is None
+
+
+def test_adapter_decimal_storage_out_of_range(backend):
+    adapter = adapter_for(backend, float_storage='decimal')
+    adapter.save_many([dict(entity_id='1', name='a', age=1, height=1e300),
+                       dict(entity_id='2', name='b', age=2, height=5e-324)])
+
+    assert adapter.get_by_id('1').height == 1e300
+    assert adapter.get_by_id('2').height == 5e-324
+
+
+def test_adapter_fast_reads(backend):
+    adapter_for(backend).save(dict(entity_id='1', name='a', age=1,
+                                   height=1.5))
+
+    fast = adapter_for(backend, fast_reads=True)
+
+    assert fast.get_by_id('1').height == 1.5
+    assert [x.entity_id for x in fast.filter(name__eq='a')] == ['1']
@@ -0,0 +1,131 @@
+from botocore.exceptions import ClientError
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    InMemoryCollector
+from clean_architecture_dynamodb_adapter.metrics import CallMetrics, \
+    MetricsHook, PrometheusExporter, StatsdExporter, call_metrics
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+THROTTLED = ClientError(
+    error_response=dict(Error=dict(
+        Code='ProvisionedThroughputExceededException', Message='')),
+    operation_name='Scan')
+
+
+def operation(name, **kwargs):
+    func = MagicMock(**kwargs)
+    func.__name__ = name
+    return func
+
+
+def test_call_metrics():
+    metrics = call_metrics('scan', 'tabela', 0.01, dict(
+        Items=[1, 2], Count=2, ScannedCount=10,
+        ConsumedCapacity=dict(CapacityUnits=1.5)))
+    assert metrics == CallMetrics('scan', 'tabela', 0.01, 1.5, 0, 2, 10, 0,
+                                  None)
+
+    metrics = call_metrics('put_item', 'tabela', 0.01, dict(
+        ConsumedCapacity=dict(CapacityUnits=1)))
+    assert (metrics.read_units, metrics.write_units, metrics.items) == \
+        (0, 1, 0)
+
+    metrics = call_metrics('batch_get_item', 'tabela', 0.01, dict(
+        Responses=dict(tabela=[1, 2, 3])))
+    assert metrics.items == 3
+
+    metrics = call_metrics('scan', 'tabela', 0.01, dict(Count=7))
+    assert metrics.items == 7
+
+
+def test_metrics_hook_requires_record():
+    with raises(TypeError):
+        MetricsHook()
+
+    class Hook(MetricsHook):
+        def record(self, metrics):
+            pass
+
+    Hook().record(None)
+
+
+def test_collector_aggregates():
+    collector = InMemoryCollector(buckets=(0.01, 0.1))
+    collector.record(CallMetrics('scan', 't', 0.005, 1, 0, 2, 5, 0, None))
+    collector.record(CallMetrics('scan', 't', 0.05, 2, 0, 3, 5, 1, None))
+    collector.record(CallMetrics('scan', 't', 1.0, 0, 0, 0, 0, 4, 'Erro'))
+
+    stats = collector.snapshot()[('scan', 't')]
+    assert stats['calls'] == stats['pages'] == 3
+    assert stats['errors'] == 1
+    assert stats['retries'] == 5
+    assert stats['read_units'] == 3
+    assert (stats['items'], stats['scanned']) == (5, 10)
+    assert stats['latency_buckets'] == {0.01: 1, 0.1: 2, float('inf'): 3}
+
+    collector.reset()
+    assert collector.snapshot() == {}
+
+
+def test_prometheus_exporter():
+    collector = InMemoryCollector(buckets=(0.1,))
+    collector.record(CallMetrics('get_item', 't', 0.05, 1, 0, 1, 0, 0, None))
+
+    text = PrometheusExporter(collector, prefix='app').render()
+
+    assert 'app_calls_total{operation="get_item",table="t"} 1\n' in text
+    assert 'app_latency_seconds_bucket{operation="get_item",table="t",' \
+           'le="0.1"} 1\n' in text
+    assert 'le="+Inf"} 1\n' in text
+    assert 'app_latency_seconds_count{operation="get_item",table="t"} 1\n' \
+        in text
+
+
+def test_statsd_exporter():
+    lines = []
+    StatsdExporter(lines.append, prefix='app').record(
+        CallMetrics('put_item', 'minha.tabela', 0.002, 0, 1, 0, 0, 0, None))
+
+    assert lines == ['app.minha_tabela.put_item.latency:2.000|ms',
+                     'app.minha_tabela.put_item.calls:1|c',
+                     'app.minha_tabela.put_item.write_units:1|c']
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.retry.sleep')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_adapter_records_calls(mock_boto3, mock_sleep):
+    collector = InMemoryCollector()
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   metrics=collector)
+    adapter._desserialize = lambda x: x
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = operation('scan', side_effect=[
+            THROTTLED,
+            dict(Items=[dict(entity_id='1')], ScannedCount=4,
+                 ConsumedCapacity=dict(CapacityUnits=0.5))])
+        mock.delete_item = operation('delete_item', side_effect=THROTTLED)
+        assert len(adapter.list_all()) == 1
+        with raises(ClientError):
+            adapter.delete('x')
+
+    mock.scan.assert_called_with(ReturnConsumedCapacity='TOTAL')
+    scan = collector.snapshot()[('scan', 'tabela')]
+    assert (scan['calls'], scan['pages'], scan['retries']) == (1, 1, 1)
+    assert (scan['items'], scan['scanned'], scan['read_units']) == \
+        (1, 4, 0.5)
+    delete = collector.snapshot()[('delete_item', 'tabela')]
+    assert (delete['errors'], delete['retries']) == (1, 4)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_adapter_without_metrics(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.put_item = MagicMock(return_value={})
+        adapter.save(dict(entity_id='x'))
+
+    mock.put_item.assert_called_once_with(Item=dict(entity_id='x'))
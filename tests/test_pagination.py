@@ -0,0 +1,91 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.pagination import ScanIterator
+from unittest.mock import patch, MagicMock
+
+
+def fake_pages(*pages):
+    responses = []
+    for i, page in enumerate(pages):
+        response = {'Items': [dict(entity_id=x) for x in page]}
+        if i < len(pages) - 1:
+            response['LastEvaluatedKey'] = dict(entity_id=page[-1])
+        responses.append(response)
+    return MagicMock(side_effect=responses)
+
+
+def test_scan_iterator_follows_last_evaluated_key():
+    scan = fake_pages(['a', 'b'], ['c'], ['d', 'e'])
+    iterator = ScanIterator(scan, page_size=2)
+
+    result = [x['entity_id'] for x in iterator]
+
+    assert result == ['a', 'b', 'c', 'd', 'e']
+    assert scan.call_count == 3
+    scan.assert_called_with(Limit=2, ExclusiveStartKey=dict(entity_id='c'))
+    assert iterator.last_evaluated_key is None
+
+
+def test_scan_iterator_is_lazy():
+    scan = fake_pages(['a', 'b'], ['c'])
+    iterator = iter(ScanIterator(scan))
+
+    next(iterator)
+
+    scan.assert_called_once_with()
+
+
+def test_scan_iterator_max_items_resume_key():
+    scan = fake_pages(['a', 'b', 'c'], ['d'])
+    iterator = ScanIterator(scan, max_items=2)
+
+    result = [x['entity_id'] for x in iterator]
+
+    assert result == ['a', 'b']
+    scan.assert_called_once()
+    assert iterator.last_evaluated_key == dict(entity_id='b')
+
+
+def test_scan_iterator_resume_key_follows_consumer():
+    scan = fake_pages(['a', 'b', 'c'], ['d'])
+    iterator = ScanIterator(scan)
+    items = iter(iterator)
+
+    next(items)
+
+    assert iterator.last_evaluated_key == dict(entity_id='a')
+
+
+def test_scan_iterator_start_key():
+    scan = fake_pages(['c'])
+    list(ScanIterator(scan, start_key=dict(entity_id='b')))
+
+    scan.assert_called_once_with(ExclusiveStartKey=dict(entity_id='b'))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_list_all_reads_every_page(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = fake_pages(['a'], ['b'], ['c'])
+        result = adapter.list_all()
+
+    assert len(result) == 3
+    assert mock.scan.call_count == 3
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_iter_filter_pages(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = fake_pages(['a'], ['b'])
+        result = list(adapter.iter_filter(page_size=1, campo__eq=42))
+
+    assert len(result) == 2
+    kwargs = mock.scan.call_args[1]
+    assert kwargs['Limit'] == 1
+    assert kwargs['ExclusiveStartKey'] == dict(entity_id='a')
+    assert 'FilterExpression' in kwargs
@@ -0,0 +1,82 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.parallel_scan import \
+    ParallelScanIterator
+from pytest import raises
+from threading import Lock
+from unittest.mock import patch, MagicMock
+
+
+def segmented_scan(pages_per_segment):
+    lock = Lock()
+    calls = []
+
+    def scan(Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        with lock:
+            calls.append(dict(kwargs, Segment=Segment,
+                              TotalSegments=TotalSegments))
+        page = ExclusiveStartKey['page'] + 1 if ExclusiveStartKey else 0
+        response = {'Items': [f'{Segment}-{page}-{i}' for i in range(2)]}
+        if page < pages_per_segment - 1:
+            response['LastEvaluatedKey'] = {'page': page}
+        return response
+
+    scan.calls = calls
+    return scan
+
+
+def test_parallel_scan_unordered_returns_every_item():
+    scan = segmented_scan(pages_per_segment=3)
+    result = list(ParallelScanIterator(scan, total_segments=4))
+
+    assert len(result) == 4 * 3 * 2
+    assert len(set(result)) == len(result)
+    assert {c['TotalSegments'] for c in scan.calls} == {4}
+    assert {c['Segment'] for c in scan.calls} == {0, 1, 2, 3}
+
+
+def test_parallel_scan_ordered_keeps_segment_order():
+    scan = segmented_scan(pages_per_segment=2)
+    result = list(ParallelScanIterator(scan, total_segments=3,
+                                       max_workers=2, ordered=True))
+
+    assert [x.split('-')[0] for x in result] == ['0'] * 4 + ['1'] * 4 + \
+        ['2'] * 4
+
+
+def test_parallel_scan_max_items():
+    scan = segmented_scan(pages_per_segment=5)
+    result = list(ParallelScanIterator(scan, total_segments=2, max_items=3,
+                                       transform=str.upper))
+
+    assert len(result) == 3
+    assert all(x == x.upper() for x in result)
+
+
+def test_parallel_scan_propagates_errors():
+    scan = MagicMock(side_effect=RuntimeError('oops'))
+
+    with raises(RuntimeError):
+        list(ParallelScanIterator(scan, total_segments=2))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_with_segments(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = segmented_scan(pages_per_segment=1)
+        result = adapter.filter(segments=2, campo__eq=42)
+
+    assert len(result) == 4
+    assert all('FilterExpression' in c for c in mock.scan.calls)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_parallel_scan_rejects_start_key(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   scan_segments=4)
+
+    with raises(ValueError):
+        adapter.iter_all(start_key=dict(entity_id='x'))
@@ -0,0 +1,110 @@
+from boto3.dynamodb.conditions import Key
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    GlobalSecondaryIndex, Q
+from clean_architecture_dynamodb_adapter.query import _compile_shape, \
+    compile_filter
+from decimal import Decimal
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+
+def test_compile_filter_operators():
+    result = compile_filter([('a.b', 'between', [1, 2]),
+                             ('c', 'is_in', [['x', 'y']]),
+                             ('a', 'not_exists', []),
+                             ('d', 'begins_with', ['p'])], conjunctive=True)
+
+    assert result == dict(
+        FilterExpression='(#f0.#f1 BETWEEN :f0 AND :f1 AND '
+                         '#f2 IN (:f2, :f3) AND attribute_not_exists(#f0) '
+                         'AND begins_with(#f3, :f4))',
+        ExpressionAttributeNames={'#f0': 'a', '#f1': 'b', '#f2': 'c',
+                                  '#f3': 'd'},
+        ExpressionAttributeValues={':f0': 1, ':f1': 2, ':f2': 'x',
+                                   ':f3': 'y', ':f4': 'p'})
+
+
+def test_compile_filter_cached_by_shape():
+    _compile_shape.cache_clear()
+    first = compile_filter([('campo', 'eq', [1]), ('outro', 'gt', [2])])
+    second = compile_filter([('campo', 'eq', [3]), ('outro', 'gt', [4])])
+
+    assert _compile_shape.cache_info().hits == 1
+    assert first['FilterExpression'] == second['FilterExpression'] == \
+        '(#f0 = :f0 OR #f1 > :f1)'
+    assert second['ExpressionAttributeValues'] == {':f0': 3, ':f1': 4}
+
+
+def test_compile_filter_invalid_op():
+    with raises(ValueError) as excinfo:
+        compile_filter([('campo', 'size', [])])
+
+    assert 'Comparador inválido: size' == str(excinfo.value)
+
+
+def test_q_operators():
+    parse = BasicDynamodbAdapter._parse_condition
+    query = (Q(a__eq=1, b__gt=2) | ~Q(c__exists=None)) & Q(d__ne=3)
+    terms = query.resolve(parse).conjuncts()
+
+    assert len(terms) == 2
+    assert terms[1] == ('d', 'ne', [3])
+    assert compile_filter(terms, conjunctive=True)['FilterExpression'] == \
+        '(((#f0 = :f0 AND #f1 > :f1) OR NOT (attribute_exists(#f2))) ' \
+        'AND #f3 <> :f2)'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_with_q(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   float_storage='decimal')
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(Items=[]))
+        adapter.filter(Q(email__eq='a') & ~Q(status__eq='inativo'),
+                       valor__gt=0.5, projection=['nome'])
+
+    mock.scan.assert_called_once_with(
+        ProjectionExpression='#p0',
+        FilterExpression='(#f0 = :f0 AND NOT (#f1 = :f1) AND #f2 > :f2)',
+        ExpressionAttributeNames={'#f0': 'email', '#f1': 'status',
+                                  '#f2': 'valor', '#p0': 'nome'},
+        ExpressionAttributeValues={':f0': 'a', ':f1': 'inativo',
+                                   ':f2': Decimal('0.5')})
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_mode_and_uses_index(mock_boto3):
+    adapter = BasicDynamodbAdapter(
+        'tabela', None, MagicMock(), MagicMock(),
+        indexes=[GlobalSecondaryIndex('email-index', 'email')])
+
+    with patch.object(adapter, '_table') as mock:
+        mock.query = MagicMock(return_value=dict(Items=[]))
+        adapter.filter(email__eq='a', nome__begins_with='J', mode='and')
+
+    mock.query.assert_called_once_with(
+        Select='ALL_ATTRIBUTES',
+        FilterExpression='begins_with(#f0, :f0)',
+        ExpressionAttributeNames={'#f0': 'nome'},
+        ExpressionAttributeValues={':f0': 'J'},
+        KeyConditionExpression=Key('email').eq('a'),
+        IndexName='email-index')
+    assert adapter.explain(Q(email__eq='a') | Q(nome__eq='b'))[
+        'operation'] == 'Scan'
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_invalid_mode(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with raises(ValueError) as excinfo:
+        adapter.filter(campo__eq=1, mode='xor')
+    assert 'mode inválido: xor' == str(excinfo.value)
+
+    with raises(ValueError) as excinfo:
+        adapter.filter(Q())
+    assert 'Nenhuma condição no filtro.' == str(excinfo.value)
@@ -0,0 +1,118 @@
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.results import Row, compose, \
+    namedtuple_class, row_class, row_factory
+from unittest.mock import patch, MagicMock
+from pytest import raises
+
+import pytest
+
+
+def test_row_class_cached_with_slots():
+    cls = row_class(('a', 'b'))
+
+    assert cls is row_class(('a', 'b'))
+    assert cls.__slots__ == ('a', 'b')
+    row = cls(1, 2)
+    assert isinstance(row, Row)
+    assert (row.a, row.b) == (1, 2)
+    assert row._asdict() == dict(a=1, b=2)
+    assert list(row) == [1, 2]
+    assert row == cls(1, 2)
+    assert repr(row) == 'Row(a=1, b=2)'
+    assert not hasattr(row, '__dict__')
+
+
+def test_invalid_names_are_renamed():
+    row = row_class(('ok', 'com espaço', 'class', '_x'))(1, 2, 3, 4)
+    nt = namedtuple_class(('ok', 'com espaço', 'class', '_x'))(1, 2, 3, 4)
+
+    assert row._fields == nt._fields == ('ok', '_1', '_2', '_3')
+
+
+@pytest.mark.parametrize('mode', ['namedtuple', 'row'])
+def test_row_factory_fields(mode):
+    build = row_factory(mode, ['b', 'a'])
+
+    result = build(dict(a=1, b=2, c=3))
+    assert tuple(result) == (2, 1)
+    assert build(dict(a=1)).b is None
+
+
+@pytest.mark.parametrize('mode', ['namedtuple', 'row'])
+def test_row_factory_item_keys(mode):
+    build = row_factory(mode)
+
+    assert build(dict(b=2, a=1))._asdict() == dict(a=1, b=2)
+    assert type(build(dict(a=1, b=2))) is type(build(dict(b=3, a=4)))
+
+
+def test_row_factory_dict_and_compose():
+    assert row_factory('dict') is None
+    assert compose(None, None) is None
+    assert compose(str, None)(1) == '1'
+    assert compose(str, len, None)(100) == 3
+
+
+# noinspection PyUnusedLocal
+@pytest.mark.parametrize('mode', ['dict', 'namedtuple', 'row'])
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_list_all_result_modes(mock_boto3, mode):
+    dummy_class = MagicMock()
+    adapter = BasicDynamodbAdapter('tabela', None, dummy_class, MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(
+            Items=[dict(entity_id='x', valor='Float(1.5)')]))
+        result = adapter.list_all(result=mode)
+
+    dummy_class.from_json.assert_not_called()
+    item = result[0] if mode == 'dict' else result[0]._asdict()
+    assert dict(item) == dict(entity_id='x', valor=1.5)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_invalid_result_mode(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with raises(ValueError) as excinfo:
+        adapter.list_all(result='oops')
+
+    assert 'result inválido: oops' == str(excinfo.value)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_list_all_projection(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(
+            Items=[dict(valor='Float(2.5)')]))
+        result = adapter.list_all(result='row',
+                                  projection=['valor', 'name'])
+
+    mock.scan.assert_called_once_with(
+        ProjectionExpression='#p0, #p1',
+        ExpressionAttributeNames={'#p0': 'valor', '#p1': 'name'})
+    assert result[0]._asdict() == dict(valor=2.5, name=None)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_projection_expression_decodes_floats(mock_boto3):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.scan = MagicMock(return_value=dict(
+            Items=[dict(valor='Float(2.5)', x=dict(y='Float(1.0)'))]))
+        result = adapter.filter(campo__exists=None,
+                                ProjectionExpression='valor, x.y')
+        rows = adapter.filter(campo__exists=None, result='namedtuple',
+                              ProjectionExpression='valor, x.y')
+
+    assert result == [dict(valor=2.5, x=dict(y=1.0))]
+    assert rows[0]._fields == ('valor', 'x')
+    kwargs = mock.scan.call_args[1]
+    assert kwargs['ProjectionExpression'] == 'valor, x.y'
+    assert 'Select' not in kwargs
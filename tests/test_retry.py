@@ -0,0 +1,168 @@
+from botocore.exceptions import ClientError
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.rate_limiter import \
+    AdaptiveRateLimiter, consumed_units
+from clean_architecture_dynamodb_adapter.retry import RetryPolicy
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+
+def client_error(code):
+    return ClientError(error_response=dict(Error=dict(Code=code,
+                                                      Message=code)),
+                       operation_name='PutItem')
+
+
+THROTTLED = client_error('ProvisionedThroughputExceededException')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@patch('clean_architecture_dynamodb_adapter.retry.sleep')
+def test_retry_policy_retries_throttling(mock_sleep):
+    func = MagicMock(side_effect=[THROTTLED, THROTTLED, 'ok'])
+
+    assert RetryPolicy().run(func, Item=1) == 'ok'
+    assert func.call_count == 3
+    func.assert_called_with(Item=1)
+    assert mock_sleep.call_count == 2
+
+
+@patch('clean_architecture_dynamodb_adapter.retry.sleep')
+def test_retry_policy_gives_up(mock_sleep):
+    func = MagicMock(side_effect=THROTTLED)
+
+    with raises(ClientError):
+        RetryPolicy(max_attempts=3).run(func)
+    assert func.call_count == 3
+
+    func = MagicMock(side_effect=client_error('ValidationException'))
+    with raises(ClientError):
+        RetryPolicy().run(func)
+    assert func.call_count == 1
+
+
+def test_consumed_units():
+    assert consumed_units({}) == 0
+    assert consumed_units(dict(ConsumedCapacity=dict(CapacityUnits=2.5))) \
+        == 2.5
+    assert consumed_units(dict(ConsumedCapacity=[dict(CapacityUnits=1),
+                                                 dict(CapacityUnits=3)])) \
+        == 4
+
+
+@patch('clean_architecture_dynamodb_adapter.rate_limiter.sleep')
+def test_limiter_waits_for_consumed_capacity(mock_sleep):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=10, increase=0, clock=clock)
+    mock_sleep.side_effect = lambda s: setattr(clock, 'now', clock.now + s)
+
+    limiter.acquire()
+    mock_sleep.assert_not_called()
+    limiter.record(5)
+    limiter.acquire()
+    assert clock.now == 0.5
+
+
+def test_limiter_aimd():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=100, max_rate=120, min_rate=10,
+                                  increase=0.1, clock=clock)
+
+    limiter.on_throttle()
+    assert limiter.rate == 50
+    clock.now = 2.0
+    limiter.record(0)
+    assert limiter.rate == 60
+    clock.now = 100.0
+    limiter.record(0)
+    assert limiter.rate == 120
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.rate == 10
+
+
+def test_limiter_unlimited_until_throttle():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(clock=clock)
+    for _ in range(4):
+        limiter.record(10)
+        clock.now += 0.1
+
+    assert limiter.rate is None
+    limiter.on_throttle()
+    assert limiter.rate == 20
+
+
+def test_limiter_keeps_only_the_last_second():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(clock=clock)
+    for _ in range(1000):
+        limiter.record(1)
+        clock.now += 0.01
+
+    assert len(limiter._recent) <= 101
+    limiter.on_throttle()
+    limiter.record(1)
+    assert len(limiter._recent) == 0
+
+
+def test_limiter_call():
+    limiter = AdaptiveRateLimiter(rate=100, increase=0)
+    func = MagicMock(return_value=dict(
+        ConsumedCapacity=dict(CapacityUnits=1),
+        UnprocessedItems=dict(tabela=[1])))
+
+    limiter.call(func, Item=1)
+
+    func.assert_called_once_with(Item=1, ReturnConsumedCapacity='TOTAL')
+    assert limiter.rate == 50
+
+    with raises(ClientError):
+        limiter.call(MagicMock(side_effect=THROTTLED))
+    assert limiter.rate == 25
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.retry.sleep')
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_adapter_calls_retry(mock_boto3, mock_sleep):
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    with patch.object(adapter, '_table') as mock:
+        mock.put_item = MagicMock(side_effect=[THROTTLED, {}])
+        mock.delete_item = MagicMock(side_effect=THROTTLED)
+        adapter.save(dict(entity_id='x'))
+        with raises(ClientError):
+            adapter.delete('x')
+
+    assert mock.put_item.call_count == 2
+    assert mock.delete_item.call_count == 5
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_adapter_shared_rate_limiter(mock_boto3):
+    first = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                 rate_limiter=True)
+    second = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                  rate_limiter=True)
+    other = BasicDynamodbAdapter('outra', None, MagicMock(), MagicMock(),
+                                 rate_limiter=True)
+
+    assert first._rate_limiter is second._rate_limiter
+    assert first._rate_limiter is not other._rate_limiter
+
+    with patch.object(first, '_table') as mock:
+        mock.get_item = MagicMock(return_value={})
+        first.get_by_id('x')
+
+    mock.get_item.assert_called_once_with(Key=dict(entity_id='x'),
+                                          ConsistentRead=True,
+                                          ReturnConsumedCapacity='TOTAL')
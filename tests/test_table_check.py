@@ -0,0 +1,65 @@
+from botocore.exceptions import ClientError
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from pytest import raises
+from unittest.mock import patch, MagicMock
+
+
+def not_found():
+    return ClientError(
+        error_response=dict(Error=dict(Code='ResourceNotFoundException',
+                                       Message='not found')),
+        operation_name='DescribeTable')
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_table_checked_once_per_process(mock_boto3):
+    for _ in range(3):
+        BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    mock_db = mock_boto3.session.Session().resource()
+    mock_db.meta.client.describe_table.assert_called_once_with(
+        TableName='tabela')
+    mock_db.create_table.assert_not_called()
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_table_created_when_missing(mock_boto3):
+    mock_db = mock_boto3.session.Session().resource()
+    mock_db.meta.client.describe_table.side_effect = not_found()
+
+    BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock())
+
+    mock_db.create_table.assert_called_once()
+    mock_db.meta.client.get_waiter('table_exists').wait.assert_called_with(
+        TableName='tabela')
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_table_check_lazy(mock_boto3):
+    mock_client = mock_boto3.session.Session().resource().meta.client
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   table_check='lazy')
+
+    mock_client.describe_table.assert_not_called()
+
+    adapter.get_by_id('meu id')
+    adapter.get_by_id('meu id')
+
+    mock_client.describe_table.assert_called_once()
+
+
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_table_check_off(mock_boto3):
+    mock_client = mock_boto3.session.Session().resource().meta.client
+    adapter = BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                                   table_check='off')
+
+    adapter.save({})
+
+    mock_client.describe_table.assert_not_called()
+
+
+def test_table_check_invalid():
+    with raises(ValueError):
+        BasicDynamodbAdapter('tabela', None, MagicMock(), MagicMock(),
+                             table_check='sometimes')
@@ -0,0 +1,175 @@
+from clean_architecture_basic_classes import BasicEntity
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter, \
+    InMemoryBackend
+from clean_architecture_dynamodb_adapter.updates import diff_items, \
+    update_kwargs
+from marshmallow import fields, post_load
+from pytest import fixture, raises
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+
+class Person(BasicEntity):
+    def __init__(self, name: str, age: int, height: float,
+                 nickname: Optional[str] = None,
+                 entity_id: Optional[str] = None):
+        super().__init__(entity_id=entity_id)
+        self.name = name
+        self.age = age
+        self.height = height
+        self.nickname = nickname
+
+    class Schema(BasicEntity.Schema):
+        name = fields.String(required=True)
+        age = fields.Integer(required=True)
+        height = fields.Float(required=True)
+        nickname = fields.String(allow_none=True)
+
+        @post_load
+        def on_load(self, data, many, partial):
+            return Person(**data)
+
+
+@fixture
+def backend():
+    backend = InMemoryBackend()
+    resource = backend.resource()
+    resource.create_table(
+        TableName='pessoas',
+        KeySchema=[dict(AttributeName='entity_id', KeyType='HASH')],
+        AttributeDefinitions=[dict(AttributeName='entity_id',
+                                   AttributeType='S')],
+        BillingMode='PAY_PER_REQUEST')
+    return backend
+
+
+def adapter_for(backend, snapshot_size=16, **kwargs):
+    return BasicDynamodbAdapter('pessoas', None, Person, MagicMock(),
+                                connection_pool=backend,
+                                snapshot_size=snapshot_size, **kwargs)
+
+
+def stored(backend, entity_id):
+    return backend.resource().Table('pessoas').get_item(
+        Key=dict(entity_id=entity_id)).get('Item')
+
+
+def test_diff_items():
+    old = dict(entity_id='1', a='x', b='y', tags={'a'}, gone='z')
+    new = dict(entity_id='1', a='x', b='w', tags={'a', 'b'}, new='n')
+
+    assert diff_items(old, new) == (dict(b='w', new='n'), ['gone'],
+                                    dict(tags={'b'}))
+
+
+def test_update_kwargs():
+    assert update_kwargs() is None
+    assert update_kwargs(dict(a=1), ['b'], dict(c={'x'})) == dict(
+        UpdateExpression='SET #u0 = :u0 REMOVE #u1 ADD #u2 :u1',
+        ExpressionAttributeNames={'#u0': 'a', '#u1': 'b', '#u2': 'c'},
+        ExpressionAttributeValues={':u0': 1, ':u1': {'x'}})
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_partial_save_sends_update_item(mock_boto3):
+    adapter = BasicDynamodbAdapter('pessoas', None, Person, MagicMock(),
+                                   snapshot_size=16)
+    adapter._table = table = MagicMock()
+    table.get_item.return_value = dict(Item=dict(
+        entity_id='1', name='maria', age=30, height='Float(1.6)'))
+
+    person = adapter.get_by_id('1')
+    person.age = 31
+    adapter.save(person.to_json(), partial=True)
+
+    table.put_item.assert_not_called()
+    table.update_item.assert_called_once_with(
+        Key=dict(entity_id='1'), ConditionExpression='attribute_exists(#id)',
+        UpdateExpression='SET #u0 = :u0',
+        ExpressionAttributeNames={'#u0': 'age', '#id': 'entity_id'},
+        ExpressionAttributeValues={':u0': 31})
+
+
+def test_partial_save_writes_only_the_diff(backend):
+    adapter = adapter_for(backend)
+    adapter.save(dict(entity_id='1', name='maria', age=30, height=1.6,
+                      nickname='mari'))
+    person = adapter.get_by_id('1')
+    # Written by someone else after the read; must survive the update.
+    backend.resource().Table('pessoas').update_item(
+        Key=dict(entity_id='1'), UpdateExpression='SET extra = :x',
+        ExpressionAttributeValues={':x': 'y'})
+
+    person.height = 1.7
+    person.nickname = None
+    adapter.save(person.to_json(), partial=True)
+
+    assert stored(backend, '1') == dict(entity_id='1', name='maria', age=30,
+                                        height='Float(1.7)', extra='y')
+
+
+def test_partial_save_without_changes_does_not_write(backend):
+    adapter = adapter_for(backend)
+    adapter.save(dict(entity_id='1', name='maria', age=30, height=1.6))
+    adapter._table = MagicMock(wraps=adapter._table)
+
+    adapter.save(adapter.get_by_id('1').to_json(), partial=True)
+
+    adapter._table.update_item.assert_not_called()
+    adapter._table.put_item.assert_not_called()
+
+
+def test_partial_save_falls_back_to_put_item(backend):
+    adapter_for(backend).save(dict(entity_id='1', name='maria', age=30,
+                                   height=1.6))
+    adapter = adapter_for(backend)
+    data = dict(entity_id='1', name='joana', age=20, height=1.5)
+
+    # Nothing was read by this adapter yet.
+    adapter.save(data, partial=True)
+    assert stored(backend, '1')['name'] == 'joana'
+
+    # Deleted since the last read: the condition fails and the item is
+    # written again in full.
+    backend.resource().Table('pessoas').delete_item(Key=dict(entity_id='1'))
+    adapter.save(dict(data, age=21), partial=True)
+    assert stored(backend, '1') == dict(entity_id='1', name='joana', age=21,
+                                        height='Float(1.5)')
+
+
+def test_partial_save_after_fast_read(backend):
+    adapter = adapter_for(backend, fast_reads=True)
+    adapter.save(dict(entity_id='1', name='maria', age=30, height=1.6))
+    person = adapter.get_by_id('1')
+
+    person.age = 31
+    adapter.save(person.to_json(), partial=True)
+
+    assert stored(backend, '1')['age'] == 31
+
+
+def test_partial_save_is_opt_in(backend):
+    adapter = adapter_for(backend, snapshot_size=0)
+    adapter.save(dict(entity_id='1', name='maria', age=30, height=1.6))
+    adapter._table = MagicMock(wraps=adapter._table)
+
+    adapter.save(adapter.get_by_id('1').to_json(), partial=True)
+
+    adapter._table.update_item.assert_not_called()
+    adapter._table.put_item.assert_called_once()
+
+
+def test_update(backend):
+    adapter = adapter_for(backend)
+    adapter.save(dict(entity_id='1', name='maria', age=30, height=1.6,
+                      nickname='mari'))
+
+    assert adapter.update('1', dict(height=1.65, nickname=''),
+                          add=dict(age=2)) == '1'
+    assert stored(backend, '1') == dict(entity_id='1', name='maria', age=32,
+                                        height='Float(1.65)')
+    assert adapter.update('2', dict(name='x')) is None
+    assert stored(backend, '2') is None
+    with raises(ValueError):
+        adapter.update('1', dict(entity_id='2'))
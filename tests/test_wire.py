@@ -0,0 +1,123 @@
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+from clean_architecture_dynamodb_adapter import BasicDynamodbAdapter
+from clean_architecture_dynamodb_adapter.wire import client_kwargs, \
+    decode_item, decode_key
+from boto3.dynamodb.conditions import Attr
+from decimal import Decimal
+from marshmallow import Schema, fields
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+ITEM = {
+    'entity_id': 'meu_id',
+    'valor': 'Float(3.5)',
+    'numero': Decimal('42'),
+    'fracao': Decimal('0.25'),
+    'ativo': True,
+    'nada': None,
+    'mapa': {'a': 'Float(1.5)', 'b': [Decimal('1'), 'texto', {'c': False}]},
+    'nomes': {'x', 'Float(2.5)'},
+    'numeros': {Decimal('1'), Decimal('1.5')},
+    'binario': Binary(b'abc'),
+}
+
+
+@pytest.mark.parametrize('decimals', [False, True])
+def test_decode_item_matches_resource_path(decimals):
+    wire = {k: TypeSerializer().serialize(v) for k, v in ITEM.items()}
+    deserialized = {k: TypeDeserializer().deserialize(v)
+                    for k, v in wire.items()}
+    expected = BasicDynamodbAdapter._denormalize_floats(deserialized,
+                                                        decimals)
+
+    assert decode_item(wire, decimals) == expected
+
+
+def test_decode_key_keeps_strings():
+    key = dict(entity_id='Float(1.5)', numero=Decimal('7'))
+    wire = {k: TypeSerializer().serialize(v) for k, v in key.items()}
+
+    assert decode_key(wire) == key
+    assert decode_key(None) is None
+
+
+def test_client_kwargs():
+    condition = Attr('campo').eq(42) | Attr('outro.sub').gt(1)
+    result = client_kwargs('tabela', dict(
+        FilterExpression=condition,
+        Select='ALL_ATTRIBUTES',
+        Limit=10,
+        ExclusiveStartKey=dict(entity_id='x')))
+
+    assert result == dict(
+        TableName='tabela',
+        FilterExpression='(#n0 = :v0 OR #n1.#n2 > :v1)',
+        ExpressionAttributeNames={'#n0': 'campo', '#n1': 'outro',
+                                  '#n2': 'sub'},
+        ExpressionAttributeValues={':v0': {'N': '42'}, ':v1': {'N': '1'}},
+        Select='ALL_ATTRIBUTES',
+        Limit=10,
+        ExclusiveStartKey={'entity_id': {'S': 'x'}})
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_get_by_id_fast_reads(mock_boto3):
+    dummy_class = MagicMock()
+    adapter = BasicDynamodbAdapter('tabela', None, dummy_class, MagicMock(),
+                                   fast_reads=True)
+    wire_item = {'entity_id': {'S': 'x'}, 'valor': {'S': 'Float(0.5)'}}
+
+    with patch.object(adapter, '_client') as mock, \
+            patch.object(adapter, '_table') as mock_table:
+        mock.get_item = MagicMock(return_value={'Item': wire_item})
+        result = adapter.get_by_id('x')
+
+    mock.get_item.assert_called_once_with(
+        TableName='tabela', Key={'entity_id': {'S': 'x'}},
+        ConsistentRead=True)
+    mock_table.get_item.assert_not_called()
+    dummy_class.from_json.assert_called_once_with(dict(entity_id='x',
+                                                       valor=0.5))
+    result.set_adapter.assert_called_once_with(adapter)
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_filter_fast_reads_pages(mock_boto3):
+    dummy_class = MagicMock()
+    adapter = BasicDynamodbAdapter('tabela', None, dummy_class, MagicMock(),
+                                   fast_reads=True)
+    pages = [{'Items': [{'entity_id': {'S': 'a'}}],
+              'LastEvaluatedKey': {'entity_id': {'S': 'a'}}},
+             {'Items': [{'entity_id': {'S': 'b'}}]}]
+
+    with patch.object(adapter, '_client') as mock:
+        mock.scan = MagicMock(side_effect=pages)
+        result = adapter.filter(campo__eq=42)
+
+    assert len(result) == 2
+    second = mock.scan.call_args[1]
+    assert second['ExclusiveStartKey'] == {'entity_id': {'S': 'a'}}
+    assert second['FilterExpression'] == '#f0 = :f0'
+    assert second['ExpressionAttributeValues'] == {':f0': {'N': '42'}}
+    dummy_class.from_json.assert_called_with(dict(entity_id='b'))
+
+
+# noinspection PyUnusedLocal
+@patch('clean_architecture_dynamodb_adapter.connection_pool.boto3')
+def test_list_all_fast_reads_keeps_float_fields(mock_boto3):
+    class Entity:
+        Schema = type('Schema', (Schema,), {'valor': fields.Float(),
+                                            'numero': fields.Integer()})
+    adapter = BasicDynamodbAdapter('tabela', None, Entity, MagicMock(),
+                                   fast_reads=True, float_storage='decimal')
+    page = {'Items': [{'valor': {'N': '2'}, 'numero': {'N': '3'}}]}
+
+    with patch.object(adapter, '_client') as mock:
+        mock.scan = MagicMock(return_value=page)
+        result = adapter.list_all(result='dict')
+
+    assert result == [dict(valor=2.0, numero=3)]
+    assert type(result[0]['valor']) is float